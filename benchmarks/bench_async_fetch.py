@@ -0,0 +1,55 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Benchmark for the async fetch mode of data_fetcher. It starts the local
+FakeStoreServer with a fixed latency per response and measures how many user
+details per second fetch_user_details_async() retrieves as the concurrency goes up.
+
+Usage:
+- python benchmarks/bench_async_fetch.py [--users 200] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from data_fetcher import fetch_user_details_async
+from pacing import TokenBucket
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+
+
+def run_benchmark(users, latency, rate):
+    """
+    Fetches `users` user details once per concurrency level and prints the throughput.
+    """
+    user_rows = [[user_id] for user_id in range(1, users + 1)]
+    with FakeStoreServer(users=users, latency=latency) as server:
+        print(f"{'concurrency':>11} {'seconds':>8} {'req/s':>8}")
+        for concurrency in CONCURRENCY_LEVELS:
+            start = time.perf_counter()
+            client = ApiClient(server.base_url, pacer=TokenBucket(rate))
+            _, user_details = asyncio.run(
+                fetch_user_details_async(user_rows, concurrency=concurrency, client=client, bulk_threshold=None)
+            )
+            elapsed = time.perf_counter() - start
+            assert len(user_details) == users
+            print(f"{concurrency:>11} {elapsed:>8.2f} {users / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="Number of user details to fetch")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds of latency per response")
+    parser.add_argument("--rate", type=float, default=None, help="Global requests per second budget")
+    args = parser.parse_args()
+    run_benchmark(args.users, args.latency, args.rate)
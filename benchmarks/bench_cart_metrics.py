@@ -0,0 +1,72 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Benchmark for the cart aggregation of save_product_data_to_excel. It compares the
+old nested loops (a Python set of users per product) with cart_metrics.product_sales(), exact
+and with the HyperLogLog estimate, for a growing number of cart lines.
+
+Usage:
+- python benchmarks/bench_cart_metrics.py [--lines 100000 1000000 5000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from cart_metrics import cart_lines, product_sales
+
+
+def make_carts(lines, products=1000, users=100_000, per_cart=5, seed=1):
+    rng = np.random.default_rng(seed)
+    count = lines // per_cart
+    product_ids = rng.integers(1, products + 1, (count, per_cart)).tolist()
+    user_ids = rng.integers(1, users + 1, count).tolist()
+    return [
+        {'id': cart_id, 'userId': user_ids[cart_id], 'date': '2020-03-02T00:00:00.000Z',
+         'products': [{'productId': product_id, 'quantity': 1} for product_id in product_ids[cart_id]]}
+        for cart_id in range(count)
+    ]
+
+
+def loop_sales(cart_data):
+    product_sales_count = {}
+    unique_users_count = {}
+    for cart in cart_data:
+        for product in cart['products']:
+            product_id = product['productId']
+            product_sales_count[product_id] = product_sales_count.get(product_id, 0) + product['quantity']
+            unique_users_count.setdefault(product_id, set()).add(cart['userId'])
+    return product_sales_count, unique_users_count
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run_benchmark(sizes):
+    print(f"{'lines':>9} {'loops':>8} {'explode':>8} {'exact':>8} {'approx':>8}")
+    for size in sizes:
+        carts = make_carts(size)
+        loops = timed(lambda: loop_sales(carts))
+        start = time.perf_counter()
+        lines = cart_lines(carts)
+        explode = time.perf_counter() - start
+        exact = timed(lambda: product_sales(lines))
+        approx = timed(lambda: product_sales(lines, approximate=True))
+        print(f"{size:>9} {loops:>7.2f}s {explode:>7.2f}s {exact:>7.2f}s {approx:>7.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the loop based and the grouped cart aggregation.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000], help="Cart lines")
+    args = parser.parse_args()
+    run_benchmark(args.lines)
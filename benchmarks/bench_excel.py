@@ -0,0 +1,130 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Benchmark of the Excel output at report scale. For a product report of
+--rows rows it compares the time and the peak memory of:
+- write: DataFrame.to_excel() of the whole report against the constant-memory
+  XlsxSink fed with chunks of rows;
+- process: the old final_data_filtering path (read_excel, flatten, to_excel of the
+  whole file) against the chunked process_product_data().
+Every path runs in a fresh process, its peak memory is the peak RSS of that process
+(tracemalloc would slow the paths down too much at this size). 'growth' is the peak
+minus the memory of the process after its imports. Without the resource module
+(Windows) the peak Python memory of tracemalloc is reported instead.
+
+Usage:
+- python benchmarks/bench_excel.py [--rows 500000] [--chunk-size 10000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+import pandas as pd
+from final_data_filtering import flatten_product_frame, process_product_data
+from sinks import XlsxSink
+from tests.fake_server import make_product
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def product_chunks(rows, chunk_size):
+    """
+    Yields the product report in DataFrames of `chunk_size` rows.
+    """
+    for start in range(1, rows + 1, chunk_size):
+        chunk = pd.DataFrame([make_product(product_id) for product_id in range(start, min(start + chunk_size, rows + 1))])
+        chunk['total_sold'] = chunk['id'] % 7
+        chunk['unique_users_count'] = chunk['id'] % 5
+        yield chunk
+
+
+def write_full(path, rows, chunk_size):
+    pd.concat(product_chunks(rows, chunk_size), ignore_index=True).to_excel(path, index=False)
+
+
+def write_streamed(path, rows, chunk_size):
+    with XlsxSink(path) as sink:
+        for chunk in product_chunks(rows, chunk_size):
+            sink.write_frame(chunk)
+
+
+def process_full(path, rows, chunk_size):
+    df_products = flatten_product_frame(pd.read_excel(path))
+    df_products.to_excel(path, index=False)
+
+
+def process_streamed(path, rows, chunk_size):
+    process_product_data(path, chunk_size)
+
+
+PATHS = {'write_full': write_full, 'write_streamed': write_streamed,
+         'process_full': process_full, 'process_streamed': process_streamed}
+
+
+def _max_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(name, path, rows, chunk_size):
+    """
+    Runs one path (in the child process) and returns its seconds, peak MiB and growth MiB.
+    """
+    warnings.simplefilter('ignore')  # to_excel warns for every URL past the Excel limit of 65530 per sheet
+    if resource is None:
+        tracemalloc.start()
+    else:
+        before = _max_rss_mib()
+    start = time.perf_counter()
+    PATHS[name](path, rows, chunk_size)
+    elapsed = time.perf_counter() - start
+    if resource is None:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        return elapsed, peak, peak
+    peak = _max_rss_mib()
+    return elapsed, peak, peak - before
+
+
+def run_in_process(name, path, rows, chunk_size):
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(measure, (name, path, rows, chunk_size))
+
+
+def run_benchmark(rows, chunk_size):
+    with tempfile.TemporaryDirectory() as directory:
+        full_path = os.path.join(directory, "full.xlsx")
+        streamed_path = os.path.join(directory, "streamed.xlsx")
+
+        results = [("write", "to_excel") + run_in_process('write_full', full_path, rows, chunk_size),
+                   ("write", "XlsxSink") + run_in_process('write_streamed', streamed_path, rows, chunk_size)]
+        shutil.copyfile(streamed_path, full_path)  # Both processing paths start from the same file
+        results += [("process", "read_excel") + run_in_process('process_full', full_path, rows, chunk_size),
+                    ("process", "chunked") + run_in_process('process_streamed', streamed_path, rows, chunk_size)]
+
+    print(f"{rows} rows, chunks of {chunk_size}")
+    print(f"{'step':<9}{'path':<12}{'seconds':>9}{'peak MiB':>10}{'growth MiB':>12}")
+    for step, path, seconds, peak, growth in results:
+        print(f"{step:<9}{path:<12}{seconds:>9.2f}{peak:>10.1f}{growth:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000, help="Rows of the product report")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per chunk of the streaming paths")
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.chunk_size)
@@ -0,0 +1,96 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Benchmark for the flattening of final_data_filtering. It compares, for N rows
+of products and users, the old path (repr strings -> eval() per row -> one .apply() per
+field) with the vectorized flatten_product_frame() / flatten_user_frame(), both on the
+in-memory records (flatten at save time) and on the repr strings of a written file.
+
+The Excel read and write are left out of all paths: they are the same for the old
+path and for process_*_data(), and 1M rows is about the Excel row limit.
+
+Usage:
+- python benchmarks/bench_flattening.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from final_data_filtering import flatten_product_frame, flatten_user_frame
+from tests.fake_server import make_product, make_user
+
+
+def legacy_products(df_products):
+    """
+    The flattening of process_product_data before the vectorized version.
+    """
+    df_products = df_products.copy()
+    df_products['rating'] = df_products['rating'].apply(eval)
+    df_products['votes'] = df_products['rating'].apply(lambda x: x['count'])
+    df_products['rating'] = df_products['rating'].apply(lambda x: x['rate'])
+    df_products['price'] = df_products['price'].astype(float)
+    df_products['rating'] = df_products['rating'].astype(float)
+    df_products['votes'] = df_products['votes'].astype(int)
+    df_products['id'] = df_products['id'].astype(int)
+    return df_products
+
+
+def legacy_users(df_users):
+    """
+    The flattening of process_user_data before the vectorized version.
+    """
+    df_users = df_users.copy()
+    df_users['address'] = df_users['address'].apply(eval)
+    df_users['Address-latitude'] = df_users['address'].apply(lambda x: float(x['geolocation']['lat']))
+    df_users['Address-longitude'] = df_users['address'].apply(lambda x: float(x['geolocation']['long']))
+    df_users['Address-city'] = df_users['address'].apply(lambda x: x['city'])
+    df_users['city-street'] = df_users['address'].apply(lambda x: x['street'])
+    df_users['street-number'] = df_users['address'].apply(lambda x: x['number'])
+    df_users['Address-zipcode'] = df_users['address'].apply(lambda x: x['zipcode'])
+    df_users['id'] = df_users['id'].astype(int)
+    df_users.drop(columns=['address'], inplace=True)
+    df_users['name'] = df_users['name'].apply(eval)
+    df_users['full_name'] = df_users['name'].apply(lambda x: f"{x['firstname']} {x['lastname']}")
+    df_users.drop(columns=['name'], inplace=True)
+    return df_users
+
+
+def timed(function, df):
+    start = time.perf_counter()
+    function(df)
+    return time.perf_counter() - start
+
+
+def run_benchmark(rows):
+    # A few hundred distinct records repeated, like products bought by many users
+    distinct = 500
+    products = pd.DataFrame([make_product(i % distinct + 1) for i in range(rows)])
+    users = pd.DataFrame([make_user(i + 1) for i in range(rows)])
+    products_text = products.assign(rating=products['rating'].map(str))
+    users_text = users.assign(address=users['address'].map(str), name=users['name'].map(str))
+
+    print(f"{rows} rows")
+    print(f"{'data':<10}{'old (eval)':>12}{'vectorized':>12}{'from text':>12}")
+    for label, legacy, flatten, records, text in (
+        ("products", legacy_products, flatten_product_frame, products, products_text),
+        ("users", legacy_users, flatten_user_frame, users, users_text),
+    ):
+        old = timed(legacy, text)
+        new = timed(flatten, records)
+        parsed = timed(flatten, text)
+        print(f"{label:<10}{old:>11.2f}s{new:>11.2f}s{parsed:>11.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the eval based and the vectorized flattening.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows of products and of users")
+    args = parser.parse_args()
+    run_benchmark(args.rows)
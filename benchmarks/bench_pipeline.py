@@ -0,0 +1,242 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: End-to-end benchmark of main.main(). It starts the local FakeStoreServer with
+the requested dataset size, latency, error rate and throttling, runs the whole pipeline
+against it in a temporary directory and records for every stage its wall time, the
+number of records it produced (or processed, for the save stages), the throughput and
+the peak Python memory (tracemalloc) while it ran. The stages run in parallel, so the
+peak of a stage is the peak of the whole process during that stage.
+
+The results are written as JSON, so they can be kept and compared between commits:
+with --baseline, every stage that got slower than the baseline by more than
+--tolerance is reported and the benchmark exits with status 1.
+
+By default the API and page pacers are disabled so the timings measure the code and
+not the sleeps between requests; --paced keeps the adaptive pacing of main.py (use it
+together with --throttle-rate).
+
+Usage:
+- python benchmarks/bench_pipeline.py [--users 1000] [--products 200] [--carts 5000] [--output results.json]
+- python benchmarks/bench_pipeline.py --baseline results.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+import main as pipeline_main
+from data_fetcher import API_CLIENT, PAGE_CLIENT
+from pacing import TokenBucket
+from tests.fake_server import FakeStoreServer
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+SAMPLE_INTERVAL = 0.005  # Seconds between two memory samples
+DEFAULT_TOLERANCE = 0.2  # A stage is a regression if it is more than 20% slower than the baseline
+
+
+class MemorySampler(threading.Thread):
+    """
+    Samples the memory traced by tracemalloc in the background, so the peak of every
+    stage can be read afterwards with peak_between().
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            self.samples.append((time.perf_counter(), tracemalloc.get_traced_memory()[0]))
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def peak_between(self, start, end):
+        """
+        Returns the highest traced memory sampled between two perf_counter() times, in MiB.
+        """
+        sizes = [size for when, size in self.samples if start <= when <= end]
+        return round(max(sizes) / 1024 / 1024, 2) if sizes else None
+
+
+def count_records(result):
+    """
+    Returns the number of records of a stage result: (headers, rows) tuples and
+    DataFrames are counted, other results (e.g. of the save stages) are not.
+    """
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], list):
+        return len(result[1])
+    if hasattr(result, "shape"):
+        return len(result)
+    return None
+
+
+def stage_results(runner, sampler):
+    """
+    Builds the per-stage part of the results from the timings of the DagRunner.
+
+    A stage without countable output (a save stage) is credited with the records of
+    its largest input.
+    """
+    counts = {name: count_records(result) for name, result in runner.results.items()}
+    stages = {}
+    for name, timing in sorted(runner.timings.items(), key=lambda item: item[1].start):
+        records = counts.get(name)
+        if records is None:
+            inputs = [counts[dep] for dep in runner.stages[name].deps if counts.get(dep) is not None]
+            records = max(inputs) if inputs else None
+        stages[name] = {
+            "start": round(timing.start, 4),
+            "seconds": round(timing.duration, 4),
+            "records": records,
+            "records_per_second": round(records / timing.duration, 1) if records and timing.duration > 0 else None,
+            "peak_mib": sampler.peak_between(runner.started_at + timing.start, runner.started_at + timing.end)
+                        if sampler else None,
+        }
+    return stages
+
+
+def run_benchmark(config, verbose=False):
+    """
+    Runs main.main() once against a FakeStoreServer built from `config` and returns the results.
+    """
+    server = FakeStoreServer(users=config["users"], products=config["products"], carts=config["carts"],
+                             clients=config["users"], page_size=config["page_size"], latency=config["latency"],
+                             error_rate=config["error_rate"], throttle_rate=config["throttle_rate"])
+    if not config["paced"]:
+        API_CLIENT.pacer = TokenBucket(None)
+        PAGE_CLIENT.pacer = TokenBucket(None)
+
+    sampler = None
+    with server, tempfile.TemporaryDirectory() as directory:
+        previous_dir = os.getcwd()
+        os.chdir(directory)  # The outputs, the checkpoint store and the response cache of the run
+        if config["memory"]:
+            tracemalloc.start()
+            sampler = MemorySampler()
+            sampler.start()
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(sys.stdout if verbose else output):
+                runner = pipeline_main.main(formats=tuple(config["formats"]), typed=config["typed"],
+                                            flatten=config["flatten"], store_path=config["store"],
+                                            api_url=server.base_url, clients_url=server.clients_url)
+        finally:
+            if sampler:
+                sampler.stop()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            API_CLIENT.cache.close()
+            os.chdir(previous_dir)
+        server_stats = server.stats()
+
+    return {
+        "benchmark": "pipeline",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "wall_seconds": round(runner.wall_time, 4),
+        "critical_path": runner.critical_path(),
+        "peak_mib": round(peak / 1024 / 1024, 2) if sampler else None,
+        "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2) if resource else None,
+        "server": server_stats,
+        "api": {"retries": API_CLIENT.retries, "failures": len(API_CLIENT.failures)},
+        "stages": stage_results(runner, sampler),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Prints the stage times next to a baseline and returns the stages that regressed.
+    """
+    regressions = []
+    if baseline.get("config") != results["config"]:
+        print("Warning: the baseline was run with a different configuration: ", baseline.get("config"))
+    print(f"{'stage':<16}{'baseline':>10}{'now':>10}{'ratio':>8}")
+    rows = [("wall", baseline["wall_seconds"], results["wall_seconds"])]
+    rows += [(name, baseline["stages"][name]["seconds"], stage["seconds"])
+             for name, stage in results["stages"].items() if name in baseline["stages"]]
+    for name, before, now in rows:
+        ratio = now / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  slower"
+        print(f"{name:<16}{before:>10.3f}{now:>10.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'stage':<16}{'seconds':>9}{'records':>9}{'rec/s':>11}{'peak MiB':>10}")
+    for name, stage in results["stages"].items():
+        records = stage["records"] if stage["records"] is not None else "-"
+        speed = stage["records_per_second"] if stage["records_per_second"] is not None else "-"
+        peak = stage["peak_mib"] if stage["peak_mib"] is not None else "-"
+        print(f"{name:<16}{stage['seconds']:>9.3f}{records:>9}{speed:>11}{peak:>10}")
+    print(f"Wall time: {results['wall_seconds']:.2f} s, peak traced memory: {results['peak_mib']} MiB, "
+          f"max RSS: {results['max_rss_mib']} MiB")
+    print("Critical path: " + " -> ".join(results["critical_path"]))
+    print("Server: ", results["server"], " API: ", results["api"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000, help="Users, and rows of the client table")
+    parser.add_argument("--products", type=int, default=200, help="Products in the dataset")
+    parser.add_argument("--carts", type=int, default=5000, help="Carts in the dataset")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per page of the client table")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of the requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=None, help="Requests per second before 429 responses")
+    parser.add_argument("--paced", action="store_true", help="Keep the adaptive request pacing of main.py")
+    parser.add_argument("--no-memory", action="store_true", help="Do not trace the memory (tracemalloc slows the run down)")
+    parser.add_argument("--formats", nargs="+", default=["xlsx"], help="Output formats of main.py")
+    parser.add_argument("--typed", action="store_true", help="Run main.py with --typed")
+    parser.add_argument("--flatten", action="store_true", help="Run main.py with --flatten")
+    parser.add_argument("--store", metavar="PATH", help="Run main.py with --store PATH")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown per stage, 0.2 = 20%%")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of main.py")
+    args = parser.parse_args()
+
+    config = {"users": args.users, "products": args.products, "carts": args.carts, "page_size": args.page_size,
+              "latency": args.latency, "error_rate": args.error_rate, "throttle_rate": args.throttle_rate,
+              "paced": args.paced, "memory": not args.no_memory, "formats": args.formats, "typed": args.typed,
+              "flatten": args.flatten, "store": args.store}
+    results = run_benchmark(config, args.verbose)
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            sys.exit(1)
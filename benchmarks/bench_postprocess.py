@@ -0,0 +1,98 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Benchmark of the parallel post-processing of final_data_filtering.process_files().
+It writes --runs historical runs (a product_data.xlsx and a combined_user_data.xlsx of --rows
+rows each) and flattens all of them with 1, 2, 4 ... --max-workers worker processes, then
+a single product report with the same worker counts. In both modes every file is split in
+ranges of --chunk-size rows that the workers read, flatten and write. Every measurement
+starts from fresh copies of the unprocessed files.
+
+The speedup is bounded by the number of cores of the machine (printed first).
+
+Usage:
+- python benchmarks/bench_postprocess.py [--runs 8] [--rows 20000] [--max-workers 8]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+import pandas as pd
+from final_data_filtering import process_files
+from sinks import XlsxSink
+from tests.fake_server import make_product, make_user
+
+
+def write_report(path, make_record, rows, chunk_size=10000):
+    with XlsxSink(path) as sink:
+        for start in range(1, rows + 1, chunk_size):
+            chunk = pd.DataFrame([make_record(record_id) for record_id in range(start, min(start + chunk_size, rows + 1))])
+            if make_record is make_user:
+                chunk['Last Login'] = '2024-08-01 10:00:00'
+            sink.write_frame(chunk)
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def timed(source_dir, work_dir, inputs, workers, chunk_size):
+    """
+    Copies the unprocessed files to `work_dir` and returns the seconds process_files() takes on them.
+    """
+    shutil.rmtree(work_dir, ignore_errors=True)
+    shutil.copytree(source_dir, work_dir)
+    start = time.perf_counter()
+    process_files([os.path.join(work_dir, pattern) for pattern in inputs], workers, chunk_size)
+    return time.perf_counter() - start
+
+
+def run_benchmark(runs, rows, max_workers, chunk_size):
+    print(f"{os.cpu_count()} cores, {runs} runs of 2 reports with {rows} rows, chunks of {chunk_size}")
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir = os.path.join(directory, "source")
+        os.makedirs(os.path.join(source_dir, "run1"))
+        write_report(os.path.join(source_dir, "run1", "product_data.xlsx"), make_product, rows)
+        write_report(os.path.join(source_dir, "run1", "combined_user_data.xlsx"), make_user, rows)
+        for run in range(2, runs + 1):
+            shutil.copytree(os.path.join(source_dir, "run1"), os.path.join(source_dir, f"run{run}"))
+        work_dir = os.path.join(directory, "work")
+
+        sys.stdout = open(os.devnull, 'w')  # process_files() prints one line per file
+        try:
+            results = []
+            for mode, inputs in (("files", ["**"]), ("one file", [os.path.join("run1", "product_data.xlsx")])):
+                baseline = None
+                for workers in worker_counts(max_workers):
+                    seconds = timed(source_dir, work_dir, inputs, workers, chunk_size)
+                    baseline = baseline or seconds
+                    results.append((mode, workers, seconds, baseline / seconds))
+        finally:
+            sys.stdout.close()
+            sys.stdout = sys.__stdout__
+
+    print(f"{'mode':<10}{'workers':>8}{'seconds':>10}{'speedup':>9}")
+    for mode, workers, seconds, speedup in results:
+        print(f"{mode:<10}{workers:>8}{seconds:>10.2f}{speedup:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=8, help="Historical runs to process")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows of every report")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest worker count")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per chunk")
+    args = parser.parse_args()
+    run_benchmark(args.runs, args.rows, args.max_workers, args.chunk_size)
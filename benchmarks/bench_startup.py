@@ -0,0 +1,64 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Benchmark of the startup time of the entry points. Every entry is measured in
+--runs fresh interpreters and the median is reported:
+- import: the seconds spent importing the modules an entry point needs;
+- process: the wall time of the whole process (interpreter startup included) for
+  'python cli.py --help' and 'python main.py --help'.
+
+Usage:
+- python benchmarks/bench_startup.py [--runs 7]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+# Entry point -> modules it imports
+IMPORTS = {
+    "main.py (all tasks)": "main",
+    "cli.py scrape/carts/users/products": "cli, data_fetcher, response_cache",
+    "cli.py save-users/save-products": "cli, save_data",
+    "cli.py postprocess": "cli, final_data_filtering",
+}
+HELP_COMMANDS = {
+    "python cli.py --help": "cli.py",
+    "python main.py --help": "main.py",
+}
+
+
+def import_seconds(modules):
+    code = f"import time\nstart = time.perf_counter()\nimport {modules}\nprint(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    return float(result.stdout)
+
+
+def process_seconds(script):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, script, "--help"], cwd=SRC_DIR, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def run_benchmark(runs):
+    print(f"Median of {runs} fresh processes")
+    print(f"{'entry point':<40}{'import s':>10}")
+    for name, modules in IMPORTS.items():
+        print(f"{name:<40}{statistics.median(import_seconds(modules) for _ in range(runs)):>10.3f}")
+    print(f"{'command':<40}{'process s':>10}")
+    for name, script in HELP_COMMANDS.items():
+        print(f"{name:<40}{statistics.median(process_seconds(script) for _ in range(runs)):>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Fresh processes per entry")
+    args = parser.parse_args()
+    run_benchmark(args.runs)
@@ -0,0 +1,65 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Benchmark for the streaming fetch mode. For a growing number of users it
+compares the peak Python memory (tracemalloc) of fetch_user_details(), which builds the
+whole list, with iter_user_details() piped into a JsonLinesSink, which should stay flat.
+The users are served by the local FakeStoreServer.
+
+Usage:
+- python benchmarks/bench_streaming.py [--sizes 500 2000 8000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from data_fetcher import fetch_user_details, iter_user_details
+from http_client import ApiClient
+from sinks import JsonLinesSink
+from tests.fake_server import FakeStoreServer
+
+
+def peak_memory(function):
+    """
+    Runs `function` and returns the peak memory it allocated, in MiB.
+    """
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def run_benchmark(sizes, chunk_size):
+    print(f"{'users':>7} {'list MiB':>9} {'stream MiB':>11}")
+    for size in sizes:
+        users = [[user_id] for user_id in range(1, size + 1)]
+        with FakeStoreServer(users=size) as server, tempfile.TemporaryDirectory() as directory:
+            client = ApiClient(server.base_url)
+
+            def as_list():
+                fetch_user_details(users, client=client, bulk_threshold=None)
+
+            def as_stream():
+                with JsonLinesSink(os.path.join(directory, "users.jsonl"), chunk_size) as sink:
+                    sink.write_all(iter_user_details(users, client=client))
+
+            list_peak = peak_memory(as_list)
+            stream_peak = peak_memory(as_stream)
+        print(f"{size:>7} {list_peak:>9.2f} {stream_peak:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 8000], help="Numbers of users")
+    parser.add_argument("--chunk-size", type=int, default=100, help="Records written per chunk")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.chunk_size)
@@ -0,0 +1,73 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Benchmark for the table extraction modes of data_fetcher.get_data_from_table.
+It loads the static fixture tests/fixtures/user_table.html (50 rows x 6 columns) in
+headless Chrome and measures the time per page of the 'elements' (one WebDriver call per
+row and cell), 'script' (one execute_script call) and 'html' (page_source + table_parser)
+modes. The pure parsing time of table_parser is measured as well, it does not need Chrome.
+
+Usage:
+- python benchmarks/bench_table_extraction.py [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from data_fetcher import get_data_from_table
+from table_parser import parse_user_table
+
+FIXTURE_PATH = os.path.join(ROOT_DIR, "tests", "fixtures", "user_table.html")
+MODES = ["elements", "script", "html"]
+
+
+def time_per_call(function, repeat):
+    """
+    Returns the average seconds per call of `function` over `repeat` calls.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def run_benchmark(repeat):
+    with open(FIXTURE_PATH) as file:
+        html = file.read()
+    parse_seconds = time_per_call(lambda: parse_user_table(html), repeat)
+    print(f"table_parser only: {parse_seconds * 1000:.2f} ms/page")
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    try:
+        driver = webdriver.Chrome(options=chrome_options)
+    except WebDriverException as error:
+        print(f"Headless Chrome is not available, skipping the browser modes: {error.msg}")
+        return
+
+    try:
+        driver.get("file://" + FIXTURE_PATH)
+        timings = {mode: time_per_call(lambda: get_data_from_table(driver, mode), repeat) for mode in MODES}
+    finally:
+        driver.quit()
+
+    print(f"{'mode':>9} {'ms/page':>9} {'speedup':>8}")
+    for mode in MODES:
+        print(f"{mode:>9} {timings[mode] * 1000:>9.1f} {timings['elements'] / timings[mode]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Extractions per mode")
+    args = parser.parse_args()
+    run_benchmark(args.repeat)
@@ -0,0 +1,323 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains an embedded analytical store for the fetched data, backed by
+SQLite (or DuckDB when it is installed and asked for).
+
+The clients, users, carts and products are bulk-loaded into indexed tables in chunks, and the
+reports are SQL views over those tables:
+- combined_user_data: users joined with the clients and their cart count (Task 5).
+- product_data: products with total_sold, unique_users_count and revenue (Task 6).
+
+The joins run inside the database, so they are not limited by the memory of the process and
+the tables stay available for ad-hoc queries. The views are exported in chunks with export_view()
+to the formats of save_data (Excel, Parquet, Arrow).
+
+Nested fields (address, name, rating, the cart products) are stored as JSON text and decoded
+again when rows are read back.
+"""
+
+import json
+import os
+import sqlite3
+import pandas as pd
+from save_data import to_arrow_table, DEFAULT_FORMATS
+from cart_metrics import LINE_COLUMNS
+from models import Record
+from metrics import METRICS
+from sinks import ParquetSink, ArrowIpcSink, XlsxSink, partition_path, DEFAULT_CHUNK_SIZE, DEFAULT_COMPRESSION
+
+# Constants
+DEFAULT_STORE_PATH = 'analytics.sqlite'
+BACKENDS = ('sqlite', 'duckdb')
+CLIENT_ID_COLUMN = 'ID'
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class AnalyticsStore:
+    """
+    Tables and report views of one run of the pipeline.
+
+    Args:
+        path (str): Path of the database file, ':memory:' for a store that lives only in this process.
+        backend (str): 'sqlite' or 'duckdb' (needs the optional duckdb package).
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, backend='sqlite'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', use one of {BACKENDS}")
+        self.path = path
+        self.backend = backend
+        if backend == 'duckdb':
+            try:
+                import duckdb
+            except ImportError as error:
+                raise ImportError("The DuckDB backend needs the duckdb package: pip install duckdb") from error
+            self._conn = duckdb.connect(path)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS nested_columns (table_name TEXT, column_name TEXT)")
+        self.nested_columns = {row[1] for row in self._conn.execute("SELECT * FROM nested_columns").fetchall()}
+
+    def _columns(self, table):
+        cursor = self._conn.execute(f"SELECT * FROM {_quote(table)} LIMIT 0")
+        return [description[0] for description in cursor.description]
+
+    def _create_table(self, table, headers, types):
+        """
+        Replaces a table and returns its INSERT statement.
+        """
+        columns = ', '.join(f"{_quote(header)} {column_type}" for header, column_type in zip(headers, types))
+        self._conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+        self._conn.execute(f"CREATE TABLE {_quote(table)} ({columns})")
+        return f"INSERT INTO {_quote(table)} VALUES ({', '.join('?' for _ in headers)})"
+
+    def _create_indexes(self, table, key=None, indexes=()):
+        if key is not None:
+            self._conn.execute(f"CREATE UNIQUE INDEX {_quote(table + '_' + key)} ON {_quote(table)} ({_quote(key)})")
+        for column in indexes:
+            self._conn.execute(f"CREATE INDEX {_quote(table + '_' + column)} ON {_quote(table)} ({_quote(column)})")
+
+    def load_records(self, table, records, headers=None, key=None, indexes=(), chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Replaces a table with the given records, inserted in chunks.
+
+        Args:
+            table (str): Name of the table.
+            records (iterable): Dicts, or lists in the order of `headers`. Can be a generator.
+            headers (list): Column names, default the keys of the first dict record.
+            key (str): Column with a unique index.
+            indexes (tuple): Other columns to index.
+            chunk_size (int): Records inserted per executemany() call.
+
+        Returns:
+            - The number of loaded records
+        """
+        records = iter(records)
+        first = next(records, None)
+        if headers is None:
+            headers = list(first.keys()) if isinstance(first, dict) else []
+        headers = list(headers)
+        if not headers:
+            return 0
+
+        count = 0
+        nested = set()
+        insert = None
+        chunk = []
+        for record in _chain_first(first, records):
+            if isinstance(record, Record):
+                record = record.to_dict()
+            values = [record.get(header) for header in headers] if isinstance(record, dict) else list(record)
+            for position, value in enumerate(values):
+                if isinstance(value, (dict, list)):
+                    values[position] = json.dumps(value)
+                    nested.add(headers[position])
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                insert = insert or self._create_table(table, headers, _column_types(chunk, len(headers)))
+                self._conn.executemany(insert, chunk)
+                count += len(chunk)
+                chunk = []
+        # The column types are taken from the first chunk
+        insert = insert or self._create_table(table, headers, _column_types(chunk, len(headers)))
+        if chunk:
+            self._conn.executemany(insert, chunk)
+            count += len(chunk)
+
+        # Indexing after the inserts is faster than keeping the indexes up to date
+        self._create_indexes(table, key, indexes)
+        self._conn.execute("DELETE FROM nested_columns WHERE table_name = ?", (table,))
+        for column in sorted(nested):
+            self._conn.execute("INSERT INTO nested_columns VALUES (?, ?)", (table, column))
+        self.nested_columns |= nested
+        self._conn.commit()
+        return count
+
+    def load_clients(self, client_headers, client_data, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Loads the scraped client table. The values are kept as the scraped text.
+        """
+        return self.load_records('clients', client_data, client_headers, key=CLIENT_ID_COLUMN, chunk_size=chunk_size)
+
+    def load_users(self, user_headers, user_details, chunk_size=DEFAULT_CHUNK_SIZE):
+        return self.load_records('users', user_details, user_headers, key='id', chunk_size=chunk_size)
+
+    def load_products(self, product_headers, product_details, chunk_size=DEFAULT_CHUNK_SIZE):
+        return self.load_records('products', product_details, product_headers, key='id', chunk_size=chunk_size)
+
+    def load_carts(self, cart_data, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Loads the carts, and one row per cart line into cart_lines, in a single pass.
+
+        Args:
+            cart_data (iterable): Cart records. Can be a generator, e.g. iter_json_lines().
+        """
+        insert_line = self._create_table('cart_lines', LINE_COLUMNS, ['BIGINT', 'BIGINT', 'TEXT', 'BIGINT', 'BIGINT'])
+        lines = []
+
+        def carts():
+            for cart in cart_data:
+                for product in cart.get('products') or ():
+                    lines.append((cart.get('id'), cart.get('userId'), cart.get('date'),
+                                  product['productId'], product['quantity']))
+                if len(lines) >= chunk_size:
+                    self._conn.executemany(insert_line, lines)
+                    lines.clear()
+                yield cart
+
+        count = self.load_records('carts', carts(), ['id', 'userId', 'date', 'products'], key='id',
+                                  indexes=('userId',), chunk_size=chunk_size)
+        if lines:
+            self._conn.executemany(insert_line, lines)
+        self._create_indexes('cart_lines', indexes=('productId', 'userId'))
+        self._conn.commit()
+        return count
+
+    def create_views(self):
+        """
+        (Re)creates the report views from the loaded tables.
+        """
+        user_columns = self._columns('users')
+        client_columns = [column for column in self._columns('clients') if column != CLIENT_ID_COLUMN]
+        client_id = f"CAST(c.{_quote(CLIENT_ID_COLUMN)} AS TEXT)"  # Scraped as text, typed clients as integer
+        user_select = ', '.join(
+            f"COALESCE(CAST(u.id AS TEXT), {client_id}) AS id" if column == 'id' else f"u.{_quote(column)}"
+            for column in user_columns
+        )
+        client_select = ', '.join(f"c.{_quote(column)}" for column in client_columns)
+        selected = ', '.join(part for part in (user_select, client_select) if part)
+
+        # Users with their client row, then clients without a user (a portable full outer join)
+        self._conn.execute("DROP VIEW IF EXISTS combined_user_data")
+        self._conn.execute(f"""
+            CREATE VIEW combined_user_data AS
+            WITH cart_counts AS (SELECT CAST(userId AS TEXT) AS user_id, COUNT(*) AS cart_count FROM carts GROUP BY userId),
+            combined AS (
+                SELECT {selected} FROM users u LEFT JOIN clients c ON {client_id} = CAST(u.id AS TEXT)
+                UNION ALL
+                SELECT {selected} FROM clients c LEFT JOIN users u ON {client_id} = CAST(u.id AS TEXT)
+                WHERE u.id IS NULL
+            )
+            SELECT combined.*, COALESCE(cart_counts.cart_count, 0) AS cart_count
+            FROM combined LEFT JOIN cart_counts ON cart_counts.user_id = combined.id
+        """)
+
+        self._conn.execute("DROP VIEW IF EXISTS product_data")
+        self._conn.execute("""
+            CREATE VIEW product_data AS
+            SELECT p.*, s.total_sold, COALESCE(s.unique_users_count, 0) AS unique_users_count,
+                   ROUND(COALESCE(s.total_sold, 0) * p.price, 2) AS revenue
+            FROM products p LEFT JOIN (
+                SELECT productId, SUM(quantity) AS total_sold, COUNT(DISTINCT userId) AS unique_users_count
+                FROM cart_lines GROUP BY productId
+            ) s ON s.productId = p.id
+        """)
+        self._conn.commit()
+
+    def iter_frames(self, sql, params=(), chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Runs a query and yields the result as DataFrames of at most `chunk_size` rows,
+        with the nested columns decoded.
+        """
+        cursor = self._conn.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            frame = pd.DataFrame(rows, columns=columns)
+            for column in self.nested_columns.intersection(columns):
+                frame[column] = frame[column].map(lambda value: json.loads(value) if isinstance(value, str) else value)
+            yield frame
+
+    def query(self, sql, params=()):
+        """
+        Runs an ad-hoc query and returns the whole result as a DataFrame.
+        """
+        frames = list(self.iter_frames(sql, params))
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+        cursor = self._conn.execute(sql, params)
+        return pd.DataFrame(columns=[description[0] for description in cursor.description])
+
+    def export_view(self, view, formats=DEFAULT_FORMATS, output_dir='.', compression=DEFAULT_COMPRESSION,
+                    run_date=None, chunk_size=DEFAULT_CHUNK_SIZE, transform=None):
+        """
+        Exports a view (or table) in the formats of save_data.save_frame().
+
+        Every format is written chunk by chunk while the rows are read (Excel through the
+        constant-memory XlsxSink), so the result does not have to fit in memory.
+
+        Args:
+            transform (callable): Applied to every DataFrame before it is written,
+                e.g. final_data_filtering.flatten_user_frame.
+
+        Returns:
+            - The paths of the written files
+        """
+        sql = f"SELECT * FROM {_quote(view)}"
+        paths = []
+        sinks = {}
+        if 'xlsx' in formats:
+            os.makedirs(output_dir, exist_ok=True)
+            sinks['xlsx'] = XlsxSink(os.path.join(output_dir, f"{view}.xlsx"))
+        if 'parquet' in formats:
+            sinks['parquet'] = ParquetSink(partition_path(output_dir, view, 'parquet', run_date), compression=compression)
+        if 'arrow' in formats:
+            arrow_compression = compression if compression in ('zstd', 'lz4', 'none') else 'lz4'
+            sinks['arrow'] = ArrowIpcSink(partition_path(output_dir, view, 'arrow', run_date), compression=arrow_compression)
+        if sinks:
+            for frame in self.iter_frames(sql, chunk_size=chunk_size):
+                frame = transform(frame) if transform else frame
+                table = to_arrow_table(frame) if 'parquet' in sinks or 'arrow' in sinks else None
+                for output_format, sink in sinks.items():
+                    if output_format == 'xlsx':
+                        sink.write_frame(frame)
+                    else:
+                        sink.write_table(table)
+            for output_format, sink in sinks.items():
+                sink.close()
+                METRICS.inc('rows_processed_total', sink.rows_written, step='save', dataset=view, format=output_format)
+                paths.append(sink.path)
+        return paths
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _chain_first(first, records):
+    if first is not None:
+        yield first
+    yield from records
+
+
+def _column_types(rows, width):
+    """
+    SQL type of every column, from the first value that is not None. Nested values are JSON text.
+    """
+    types = []
+    for position in range(width):
+        value = next((row[position] for row in rows if row[position] is not None), None)
+        if isinstance(value, bool):
+            types.append('BOOLEAN')
+        elif any(isinstance(row[position], float) for row in rows):
+            types.append('DOUBLE')
+        elif isinstance(value, int):
+            types.append('BIGINT')
+        else:
+            types.append('TEXT')
+    return types
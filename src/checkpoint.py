@@ -0,0 +1,342 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains a durable checkpoint store for the fetched records, backed by SQLite.
+
+Every fetched user, product and cart is stored by kind and ID together with a hash of
+its content, as soon as it arrives. This makes two things possible:
+
+- Resume: if a run dies, the next run continues the same run and only fetches the
+  records that were not stored yet.
+- Incremental runs: only IDs that were never fetched by a successful run are fetched,
+  the other records are reused from the store.
+
+Records are written in batches: save() commits once every `batch_size` records, and the
+fetchers call flush() at the end of their stage (also when it fails), so a crash loses at
+most the last uncommitted batch, which the resumed run fetches again.
+
+Only one process can run on a store at a time: start_run() takes a lock on the file
+`<path>.lock` that the operating system releases when the process ends, so the run of
+a process that died is resumed, but a run that another live process is still running
+raises RunLockedError.
+
+The pages of the scraped client table are stored per run as well (see table_snapshot.py),
+so the next run can compare its pages with the ones of the last successful run.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Constants
+DEFAULT_CHECKPOINT_PATH = 'checkpoint.sqlite'
+DEFAULT_BATCH_SIZE = 500  # Records saved per commit
+
+# Result of CheckpointStore.save()
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+
+class RunLockedError(RuntimeError):
+    """
+    Raised by start_run() when another live process holds the lock of the checkpoint store.
+    """
+
+
+def content_hash(record):
+    """
+    Returns a stable hash of a JSON serialisable record.
+    """
+    return hashlib.sha256(json.dumps(record, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Stores fetched records by kind ('user', 'product', 'cart') and ID.
+
+    Args:
+        path (str): Path of the SQLite file, ':memory:' for a store that lives only in this process.
+        batch_size (int): Records saved per commit, see flush().
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self._pending = 0  # Records saved since the last commit
+        self.run_id = None
+        self.resumed = False
+        self.counts = {}  # (kind, NEW / CHANGED / UNCHANGED) -> records saved by this process
+        self._lock_file = None  # Held from start_run() until finish_run() or close()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                status TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                kind TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                data TEXT NOT NULL,
+                run_id INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (kind, record_id)
+            );
+            CREATE INDEX IF NOT EXISTS records_run ON records (kind, run_id);
+            CREATE TABLE IF NOT EXISTS table_pages (
+                url TEXT NOT NULL,
+                run_id INTEGER NOT NULL,
+                page_index INTEGER NOT NULL,
+                quick TEXT,
+                ids TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (url, run_id, page_index)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def start_run(self):
+        """
+        Starts a new run, or resumes the last one if it did not finish.
+
+        Returns:
+            - The ID of the run
+
+        Raises:
+            RunLockedError: If another live process is running on this store.
+        """
+        self._acquire()
+        with self._lock:
+            row = self._conn.execute("SELECT run_id, status FROM runs ORDER BY run_id DESC LIMIT 1").fetchone()
+            if row is not None and row[1] == 'running':
+                self.run_id, self.resumed = row[0], True
+            else:
+                cursor = self._conn.execute(
+                    "INSERT INTO runs (started_at, status) VALUES (?, 'running')", (time.time(),)
+                )
+                self.run_id, self.resumed = cursor.lastrowid, False
+            self._commit()
+        return self.run_id
+
+    def finish_run(self, success=True):
+        """
+        Marks the current run as finished. A failed run is not resumed by the next run.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ? WHERE run_id = ?",
+                (time.time(), 'success' if success else 'failed', self.run_id),
+            )
+            self._commit()
+        self._release()
+
+    def _acquire(self):
+        if self.path == ':memory:' or self._lock_file is not None:
+            return
+        lock_file = open(f"{self.path}.lock", 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            try:
+                lock_file.seek(0)
+                owner = lock_file.read().strip() or 'unknown'
+            except OSError:  # Windows does not let other processes read a locked range
+                owner = 'unknown'
+            lock_file.close()
+            raise RunLockedError(f"The checkpoint store {self.path} is used by another run (process {owner})") from None
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+
+    def _release(self):
+        if self._lock_file is not None:
+            self._lock_file.close()  # Closing the file releases the lock
+            self._lock_file = None
+
+    def last_successful_run(self):
+        """
+        Returns the ID of the last successful run, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(run_id) FROM runs WHERE status = 'success'"
+            ).fetchone()
+        return row[0]
+
+    def save(self, kind, record_id, record):
+        """
+        Stores a record for the current run.
+
+        Returns:
+            - NEW, CHANGED or UNCHANGED compared with the stored version of the record
+        """
+        digest = content_hash(record)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM records WHERE kind = ? AND record_id = ?", (kind, str(record_id))
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO records (kind, record_id, content_hash, data, run_id, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, str(record_id), digest, json.dumps(record), self.run_id, time.time()),
+            )
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._commit()
+            if row is None:
+                status = NEW
+            else:
+                status = UNCHANGED if row[0] == digest else CHANGED
+            self.counts[(kind, status)] = self.counts.get((kind, status), 0) + 1
+        return status
+
+    def flush(self):
+        """
+        Commits the records saved since the last commit.
+        """
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        self._pending = 0
+
+    def get(self, kind, record_id):
+        """
+        Returns the stored record, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM records WHERE kind = ? AND record_id = ?", (kind, str(record_id))
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def ids_fetched_in_run(self, kind, run_id=None):
+        """
+        Returns the IDs of the records stored by a run (default: the current run).
+        """
+        run_id = self.run_id if run_id is None else run_id
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record_id FROM records WHERE kind = ? AND run_id = ?", (kind, run_id)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def known_ids(self, kind):
+        """
+        Returns the IDs of all stored records of a kind that were fetched by a successful
+        run or by the current run.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record_id FROM records WHERE kind = ? AND "
+                "(run_id = ? OR run_id IN (SELECT run_id FROM runs WHERE status = 'success'))",
+                (kind, self.run_id),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def ids_to_skip(self, kind, incremental=False):
+        """
+        Returns the IDs that do not have to be fetched again.
+
+        A resumed run skips what it already stored; an incremental run also skips
+        everything a previous successful run fetched.
+        """
+        if incremental:
+            return self.known_ids(kind)
+        return self.ids_fetched_in_run(kind)
+
+    def save_table_page(self, url, page_index, page):
+        """
+        Stores a page of a scraped table for the current run.
+
+        Args:
+            url (str): The page with the table.
+            page_index (int): Index of the page in the pagination, from 0.
+            page (dict): The page as built by table_snapshot: 'headers', 'rows', 'ids',
+                'hash' and the optional 'quick' fingerprint.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO table_pages (url, run_id, page_index, quick, ids, content_hash, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, self.run_id, page_index, page.get('quick'), json.dumps(page['ids']), page['hash'],
+                 json.dumps({'headers': page['headers'], 'rows': page['rows']})),
+            )
+            self._commit()
+
+    def table_pages(self, url, run_id):
+        """
+        Returns the stored pages of a table scraped by a run, as {page index: page}.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_index, quick, ids, content_hash, data FROM table_pages WHERE url = ? AND run_id = ?",
+                (url, run_id),
+            ).fetchall()
+        pages = {}
+        for page_index, quick, ids, digest, data in rows:
+            pages[page_index] = dict(json.loads(data), quick=quick, ids=json.loads(ids), hash=digest)
+        return pages
+
+    def last_table_run(self, url):
+        """
+        Returns the ID of the last successful run that stored pages of the table, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(run_id) FROM table_pages WHERE url = ? AND "
+                "run_id IN (SELECT run_id FROM runs WHERE status = 'success')",
+                (url,),
+            ).fetchone()
+        return row[0]
+
+    def reset_table_pages(self, url, keep_run_id=None):
+        """
+        Deletes the stored pages of the table, except the ones of `keep_run_id`.
+        The pages of the current run are deleted too, a resumed run scrapes the table again.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM table_pages WHERE url = ? AND run_id IS NOT ?", (url, keep_run_id)
+            )
+            self._commit()
+
+    def stats(self):
+        """
+        Returns how many records of every kind were new, changed or unchanged in this process.
+        """
+        summary = {}
+        for (kind, status), count in sorted(self.counts.items()):
+            summary.setdefault(kind, {NEW: 0, CHANGED: 0, UNCHANGED: 0})[status] = count
+        return summary
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
+        self._release()
@@ -0,0 +1,251 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Command line interface with one subcommand per task, for runs that only need
+some of the tasks, e.g. a cron job that refreshes the carts.
+
+Every subcommand reads its inputs from and writes its outputs to an intermediate store:
+a directory (--data-dir) with the files of the streaming mode of main.py. A file is only
+replaced once it was written completely, so a failed command leaves the previous
+version in place.
+
+- scrape          Task 1: the client table               -> clients.csv
+- carts           Task 2: all carts                      -> carts.jsonl
+- users           Task 3: clients.csv                    -> users.jsonl
+- products        Task 4: carts.jsonl                    -> products.jsonl
+- save-users      Task 5: clients, carts and users       -> combined_user_data
+- save-products   Task 6: carts and products             -> product_data
+- save-metrics    Task 7: carts and products             -> user_basket_sizes, daily_sales
+- postprocess     final_data_filtering on the saved Excel files
+
+The heavy dependencies are imported by the subcommands that need them: the fetch
+subcommands never import pandas and only the browser fallback of 'scrape' imports
+Selenium, so the API subcommands start in a fraction of the time of main.py.
+
+Usage:
+- python cli.py carts [--data-dir data] [--api-url URL]
+- python cli.py save-products [--data-dir data] [--output-dir .] [--formats xlsx parquet]
+"""
+
+import argparse
+import os
+import time
+from sinks import (CsvSink, JsonLinesSink, iter_csv_rows, iter_json_lines, DEFAULT_CHUNK_SIZE, DEFAULT_COMPRESSION,
+                   PARQUET_COMPRESSIONS, OUTPUT_FORMATS, DEFAULT_FORMATS)
+
+# Constants
+DEFAULT_DATA_DIR = 'data'
+
+# Files of the intermediate store, the same as the streaming mode of main.py
+CLIENTS_FILE = 'clients.csv'
+CARTS_FILE = 'carts.jsonl'
+USERS_FILE = 'users.jsonl'
+PRODUCTS_FILE = 'products.jsonl'
+
+
+def _output(args, name):
+    """
+    Returns the path of a file of the intermediate store and the temporary path it is written to.
+    """
+    os.makedirs(args.data_dir, exist_ok=True)
+    path = os.path.join(args.data_dir, name)
+    return path, f"{path}.partial"
+
+def _input(args, name, command):
+    """
+    Returns the path of an input file of the intermediate store.
+
+    Raises:
+        SystemExit: If the file does not exist yet.
+    """
+    path = os.path.join(args.data_dir, name)
+    if not os.path.exists(path):
+        raise SystemExit(f"{path} does not exist, run 'python cli.py {command}' first")
+    return path
+
+def _read_records(path):
+    """
+    Reads a JSON Lines file of the store, with the keys of the first record as headers.
+    """
+    records = list(iter_json_lines(path))
+    return (list(records[0].keys()) if records else []), records
+
+def _api_client(args):
+    """
+    Returns the API client of data_fetcher, pointed to --api-url and with the response cache of main.py
+    (unless --no-cache).
+    """
+    from data_fetcher import API_CLIENT
+    from response_cache import ResponseCache, DEFAULT_CACHE_PATH
+
+    if args.api_url:
+        API_CLIENT.base_url = args.api_url.rstrip('/')
+    if API_CLIENT.cache is None and not args.no_cache:
+        API_CLIENT.cache = ResponseCache(DEFAULT_CACHE_PATH)
+    return API_CLIENT
+
+
+# Task 1: Fetch store clients
+def scrape(args):
+    from data_fetcher import fetch_store_clients_lightweight, STORE_CLIENTS_URL
+
+    client_headers, store_clients, scrape_path = fetch_store_clients_lightweight(args.clients_url or STORE_CLIENTS_URL)
+    path, partial = _output(args, CLIENTS_FILE)
+    with CsvSink(partial, client_headers, args.chunk_size) as sink:
+        sink.write_all(store_clients)
+    os.replace(partial, path)
+    print(f"Task 1 complited ({scrape_path}), {sink.rows_written} clients written to {path}")
+
+# Task 2: Fetch all carts for users
+def carts(args):
+    from data_fetcher import fetch_user_carts
+
+    _, user_carts = fetch_user_carts(_api_client(args))
+    path, partial = _output(args, CARTS_FILE)
+    with JsonLinesSink(partial, args.chunk_size) as sink:
+        sink.write_all(user_carts)
+    os.replace(partial, path)
+    print(f"Task 2 complited, {sink.rows_written} carts written to {path}")
+
+# Task 3: Fetch extra data for each user
+def users(args):
+    from data_fetcher import iter_user_details
+
+    _, client_rows = iter_csv_rows(_input(args, CLIENTS_FILE, 'scrape'))
+    path, partial = _output(args, USERS_FILE)
+    with JsonLinesSink(partial, args.chunk_size) as sink:
+        sink.write_all(iter_user_details(client_rows, client=_api_client(args)))
+    os.replace(partial, path)
+    print(f"Task 3 complited, {sink.rows_written} users written to {path}")
+
+# Task 4: Fetch product details for products in carts
+def products(args):
+    from data_fetcher import iter_product_details
+
+    user_carts = iter_json_lines(_input(args, CARTS_FILE, 'carts'))
+    path, partial = _output(args, PRODUCTS_FILE)
+    with JsonLinesSink(partial, args.chunk_size) as sink:
+        sink.write_all(iter_product_details(user_carts, client=_api_client(args)))
+    os.replace(partial, path)
+    print(f"Task 4 complited, {sink.rows_written} products written to {path}")
+
+# Task 5: Save user data
+def save_users(args):
+    from save_data import save_user_data_to_excel
+
+    client_headers, client_rows = iter_csv_rows(_input(args, CLIENTS_FILE, 'scrape'))
+    cart_headers, user_carts = _read_records(_input(args, CARTS_FILE, 'carts'))
+    user_headers, user_details = _read_records(_input(args, USERS_FILE, 'users'))
+    save_user_data_to_excel(list(client_rows), client_headers, user_carts, cart_headers, user_details, user_headers,
+                            formats=tuple(args.formats), output_dir=args.output_dir, compression=args.compression,
+                            flatten=args.flatten)
+
+# Task 6: Save product data
+def save_products(args):
+    from save_data import save_product_data_to_excel
+
+    _, user_carts = _read_records(_input(args, CARTS_FILE, 'carts'))
+    product_headers, product_details = _read_records(_input(args, PRODUCTS_FILE, 'products'))
+    save_product_data_to_excel(user_carts, product_details, product_headers, formats=tuple(args.formats),
+                               output_dir=args.output_dir, compression=args.compression, flatten=args.flatten,
+                               approximate_distinct=args.approx_distinct)
+
+# Task 7: Save basket sizes and daily sales
+def save_metrics(args):
+    from save_data import save_cart_metrics
+
+    _, user_carts = _read_records(_input(args, CARTS_FILE, 'carts'))
+    product_headers, product_details = _read_records(_input(args, PRODUCTS_FILE, 'products'))
+    save_cart_metrics(user_carts, product_details, product_headers, formats=tuple(args.formats),
+                      output_dir=args.output_dir, compression=args.compression)
+
+# Split the nested fields of the saved Excel files into columns
+def postprocess(args):
+    from final_data_filtering import process_files
+
+    paths = []
+    for name, command in (("product_data", 'save-products'), ("combined_user_data", 'save-users')):
+        path = os.path.join(args.output_dir, f"{name}.xlsx")
+        if not os.path.exists(path):
+            raise SystemExit(f"{path} does not exist, run 'python cli.py {command}' first")
+        paths.append(path)
+    process_files(paths, args.workers)
+
+
+# Subcommand -> (function, help)
+COMMANDS = {
+    'scrape': (scrape, "Task 1: scrape the client table"),
+    'carts': (carts, "Task 2: fetch all carts"),
+    'users': (users, "Task 3: fetch the users of the scraped clients"),
+    'products': (products, "Task 4: fetch the products in the carts"),
+    'save-users': (save_users, "Task 5: save the combined user data"),
+    'save-products': (save_products, "Task 6: save the product data"),
+    'save-metrics': (save_metrics, "Task 7: save the basket sizes and the daily sales"),
+    'postprocess': (postprocess, "Split the nested fields of the saved Excel files into columns"),
+}
+FETCH_COMMANDS = ('scrape', 'carts', 'users', 'products')
+SAVE_COMMANDS = ('save-users', 'save-products', 'save-metrics')
+
+
+def build_parser():
+    """
+    Returns the argument parser with one subparser per command.
+    """
+    parser = argparse.ArgumentParser(description="Run single tasks of the store data pipeline.")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory of the intermediate store")
+    parser.add_argument("--metrics", metavar="DIR", help="Write the run metrics to DIR (Prometheus textfile and JSON)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, (function, text) in COMMANDS.items():
+        command = subparsers.add_parser(name, help=text, description=text)
+        command.set_defaults(function=function)
+        if name in FETCH_COMMANDS:
+            command.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records written per chunk")
+            command.add_argument("--api-url", help="Root URL of the store API, e.g. the local server of tests/fake_server.py")
+            command.add_argument("--no-cache", action="store_true", help="Do not keep the API responses in http_cache.sqlite")
+        if name == 'scrape':
+            command.add_argument("--clients-url", help="The page with the client table, defaults to the assignment page")
+        if name in SAVE_COMMANDS:
+            command.add_argument("--formats", nargs="+", choices=OUTPUT_FORMATS, default=list(DEFAULT_FORMATS),
+                                 help="Output formats")
+            command.add_argument("--compression", choices=PARQUET_COMPRESSIONS, default=DEFAULT_COMPRESSION,
+                                 help="Compression of the Parquet and Arrow files")
+        if name in ('save-users', 'save-products'):
+            command.add_argument("--flatten", action="store_true",
+                                 help="Split address, name and rating into columns before saving")
+        if name == 'save-products':
+            command.add_argument("--approx-distinct", action="store_true",
+                                 help="Estimate the unique users of every product (for very large inputs)")
+        if name in SAVE_COMMANDS + ('postprocess',):
+            command.add_argument("--output-dir", default=".", help="Directory of the saved files")
+        if name == 'postprocess':
+            command.add_argument("--workers", type=int, default=2, help="Worker processes, 1 to process the files one by one")
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs the subcommand given in `argv` (default: the command line).
+
+    Returns:
+        - The parsed arguments
+    """
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        from metrics import METRICS
+        METRICS.enable()
+
+    start = time.perf_counter()
+    try:
+        args.function(args)
+    finally:
+        if args.metrics:
+            METRICS.set('stage_duration_seconds', round(time.perf_counter() - start, 4), stage=args.command)
+            print("Metrics written to: " + ", ".join(METRICS.write(args.metrics)))
+    print(f"{args.command} took {time.perf_counter() - start:.2f}s")
+    return args
+
+
+if __name__ == "__main__":
+    main()
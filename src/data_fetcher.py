@@ -10,21 +10,59 @@ source 2: https://fakestoreapi.com
 
 The script solves the first 4 tasks of the assignment, the other 2 are going to be solved in the save_data.py
 
+Selenium is only imported by the functions that start or drive a browser, so the API
+fetchers (and the HTTP scrape of the client table) do not pay for importing it.
+
 '''
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+from pacing import AdaptiveRateController, TokenBucket
+from http_client import ApiClient
+from lookup_cache import LookupCache
+from metrics import METRICS
+from models import Cart, Product, User, Record, RecordError, decode
+from table_parser import (TABLE_EXTRACT_SCRIPT, TABLE_FINGERPRINT_SCRIPT, TABLE_ID, parse_user_table, parse_pagination_links,
+                          result_from_script)
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from collections import deque
+from urllib.parse import urljoin
+import asyncio
+import queue
+import threading
 import time
 import requests
 
 # Constants
-WAIT_TIME = 7
+WAIT_TIME = 7  # Slowest pace (seconds between requests) the API pacer backs off to
+API_BASE_URL = 'https://fakestoreapi.com'
+STORE_CLIENTS_URL = 'https://bigdatalab.ai/assignment_pd001_data/'
+DEFAULT_EXTRACTION = 'script'  # How fetch_store_clients() reads the table, see get_data_from_table()
+DEFAULT_CONCURRENCY = 8  # Requests in flight at the same time in the async fetchers
+BULK_THRESHOLD = 10  # From this many IDs the whole collection is fetched instead of one request per ID
+PAGE_LOAD_TIMEOUT = 10
+DEFAULT_SCRAPE_WORKERS = 4  # Browsers used by fetch_store_clients_parallel()
+
+# Shared pacing for every call to the store API and for the page switches of the scraper.
+# Both start slow, ramp up while the upstream is healthy and back off when it throttles.
+API_PACER = AdaptiveRateController(initial_rate=1.0, min_rate=1 / WAIT_TIME, max_rate=20.0)
+PAGE_PACER = AdaptiveRateController(initial_rate=0.5, min_rate=0.2, max_rate=5.0)
+
+# Shared pooled client for the store API, see http_client.ApiClient
+API_CLIENT = ApiClient(API_BASE_URL, pacer=API_PACER)
+
+# Pooled client for the browserless scraping of the client table
+PAGE_CLIENT = ApiClient(STORE_CLIENTS_URL, pacer=PAGE_PACER)
+
+# In-process memo of the /users/{id} and /products/{id} lookups, see lookup_cache.py.
+# Repeated IDs within a run or across the runs of a long-lived process are fetched once.
+LOOKUP_CACHE = LookupCache()
+
+# Typed record model of every kind of API record, see models.py
+MODELS = {'cart': Cart, 'user': User, 'product': Product}
+DECODERS = {kind: partial(decode, model) for kind, model in MODELS.items()}
 
 # Task 1: Fetch store clients using Selenium
-def fetch_store_clients():
+def fetch_store_clients(url=STORE_CLIENTS_URL, extraction=DEFAULT_EXTRACTION, snapshot=None):
     '''
     Fetches client data from a web page using Selenium.
     
@@ -32,155 +70,869 @@ def fetch_store_clients():
     extracts client information from a table, and handles pagination 
     to retrieve data from multiple pages. 
 
+    Args:
+        url (str): The page with the client table.
+        extraction (str): How each page of the table is read:
+            - 'script': the whole table in one execute_script() call (default)
+            - 'html': parse driver.page_source with table_parser
+            - 'elements': one WebDriver call per row and cell
+        snapshot (TableSnapshot): Compares every page with the last successful scrape and
+            skips the extraction of the pages that did not change, see table_snapshot.py.
+
     Returns:
         - Headers of the data
         - The actual data
     '''
-    # Set up Chrome options
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    driver = webdriver.Chrome(options=chrome_options)
+    # Set up headless Chrome
+    driver = _start_driver()
 
     # Open the webpage
-    driver.get("https://bigdatalab.ai/assignment_pd001_data/")
+    driver.get(url)
+
+    # Fetch data from the first page
+    all_headers, all_clients = _read_page(driver, 0, extraction, snapshot)
+
+    # Extract pagination elements and ignore the first page (already scraped)
+    needed_pages = len(_find_page_links(driver)) - 1
+
+    # Iterate over the remaining pages
+    for page_index in range(1, needed_pages + 1):
+        _open_page(driver, page_index)  # Click on each page link
+        _, clients_on_page = _read_page(driver, page_index, extraction, snapshot)  # Get data from the new page
+        all_clients.extend(clients_on_page)  # Add the new data to the list
+
+    # Close the WebDriver
+    driver.quit()
 
-    # Function to extract data from the table
-    def get_data_from_table():
-        # Wait for the table to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "userTable"))
-        )
+    #return the data
+    return all_headers, all_clients
 
-        # Extract table rows
-        table = driver.find_element(By.ID, "userTable")
-        rows = table.find_elements(By.TAG_NAME, "tr")
+def fetch_store_clients_parallel(url=STORE_CLIENTS_URL, workers=DEFAULT_SCRAPE_WORKERS, reuse_drivers=True,
+                                 extraction=DEFAULT_EXTRACTION, snapshot=None):
+    '''
+    Fetches client data like fetch_store_clients(), but spreads the pages over a pool of browsers.
 
-        # Initialize lists for headers and data
-        headers = []
-        clients = []
+    The first browser reads the first page and the list of pages. The remaining pages
+    are scraped by up to `workers` headless browsers in parallel, each with its own
+    session, and the rows are merged back in page order.
 
-        # Extract headers from the first row
-        headers = [header.text for header in rows[0].find_elements(By.TAG_NAME, "th")]
+    Args:
+        url (str): The page with the client table.
+        workers (int): Number of browsers scraping pages at the same time.
+        reuse_drivers (bool): Keep each browser open for the next page instead of
+            starting a new one per page.
+        extraction (str): How each page of the table is read, see get_data_from_table().
+        snapshot (TableSnapshot): Skips the extraction of unchanged pages, see fetch_store_clients().
 
-        # Iterate over the remaining rows to extract data
-        for row in rows[1:]:  # Start from the second row
-            cols = row.find_elements(By.TAG_NAME, "td")
-            if cols:  # Only add rows with data
-                data = [col.text for col in cols]
-                clients.append(data)
+    Returns:
+        - Headers of the data
+        - The actual data
+    '''
+    pool = _DriverPool(max(1, workers), reuse_drivers)
+    try:
+        # Read the first page and the page list once
+        driver = pool.acquire()
+        driver.get(url)
+        all_headers, first_page = _read_page(driver, 0, extraction, snapshot)
+        page_count = len(_find_page_links(driver))
+        pool.release(driver, url)
+
+        def scrape_page(page_index):
+            driver = pool.acquire()
+            try:
+                if pool.current_url(driver) != url:
+                    driver.get(url)
+                _open_page(driver, page_index)
+                _, clients_on_page = _read_page(driver, page_index, extraction, snapshot)
+            except Exception:
+                pool.discard(driver)
+                raise
+            pool.release(driver, url)
+            return clients_on_page
+
+        # map() keeps the results in page order
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            pages = list(executor.map(scrape_page, range(1, page_count)))
+    finally:
+        pool.close()
+
+    all_clients = list(first_page)
+    for clients_on_page in pages:
+        all_clients.extend(clients_on_page)
+    return all_headers, all_clients
 
-        return headers, clients
+def fetch_store_clients_lightweight(url=STORE_CLIENTS_URL, feed_url=None, client=None, fallback=None, snapshot=None):
+    '''
+    Fetches the client data without a browser when possible.
 
-    # Fetch data from the first page
-    all_headers, all_clients = get_data_from_table()
+    The paths are tried from cheapest to most expensive:
+    - 'feed': the JSON feed behind the table, if `feed_url` is given.
+    - 'html': the page is fetched with a plain HTTP request and the table is parsed
+      locally. The other pages are fetched the same way through the hrefs of the
+      pagination links. This path is only used when the table is in the HTML and
+      every page link points to a real URL.
+    - 'selenium': otherwise the browser based `fallback` is used.
+
+    With a `snapshot`, the pages are compared with the last successful scrape: over HTTP a
+    page is requested with the ETag it had, and a 304 (or the same ETag) reuses its stored
+    rows instead of parsing it again. The feed and a custom fallback are recorded as one page.
+
+    Args:
+        url (str): The page with the client table.
+        feed_url (str): Optional URL of a JSON feed with the client rows.
+        client (ApiClient): The HTTP client to use, defaults to PAGE_CLIENT.
+        fallback (callable): Called with `url` when the HTTP paths fail, defaults to fetch_store_clients.
+        snapshot (TableSnapshot): Tracks the pages against the last successful scrape, see table_snapshot.py.
+
+    Returns:
+        - Headers of the data
+        - The actual data
+        - The path that was used: 'feed', 'html' or 'selenium'
+    '''
+    client = client or PAGE_CLIENT
+    fallback = fallback or partial(fetch_store_clients, snapshot=snapshot)
+
+    result, path = None, None
+    if feed_url:
+        feed = client.get_json(feed_url)
+        if feed:
+            result, path = _clients_from_feed(feed), 'feed'
+
+    if result is None:
+        result, path = _fetch_store_clients_html(client, url, snapshot), 'html'
+        if result is None and snapshot is not None:
+            snapshot.discard()  # Pages recorded before the HTTP path gave up
+
+    if result is None:
+        result, path = fallback(url), 'selenium'
+
+    headers, clients = result
+    if snapshot is not None and not snapshot.recorded:
+        snapshot.record(0, headers, clients)
+    METRICS.inc('records_fetched_total', len(clients), kind='client', source=path)
+    return headers, clients, path
+
+def _fetch_store_clients_html(client, url, snapshot=None):
+    '''
+    Fetches every page of the client table with plain HTTP requests.
+
+    Returns:
+        - (headers, clients), or None if the table or the page links cannot be read without a browser
+    '''
+    try:
+        response = client.get(url)  # Not conditional, the pagination links of the first page are needed
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+
+    try:
+        all_headers, all_clients = _parse_page_response(response, 0, snapshot)
+    except ValueError:
+        return None  # The table is rendered by JavaScript
+    if not all_headers:
+        return None
+
+    # Ignore the first page (already fetched), like the browser scraper does
+    links = parse_pagination_links(response.text)[1:]
+    page_urls = []
+    for href in links:
+        if not href or href.startswith(('#', 'javascript:')):
+            return None  # Pagination is handled by JavaScript
+        page_urls.append(urljoin(response.url, href))
+
+    for page_index, page_url in enumerate(page_urls, start=1):
+        etag = snapshot.validator(page_index) if snapshot is not None else None
+        try:
+            response = client.get(page_url, headers={'If-None-Match': etag} if etag else None)
+            if response.status_code not in (200, 304):
+                return None
+            _, clients_on_page = _parse_page_response(response, page_index, snapshot)
+        except (requests.RequestException, ValueError):
+            return None
+        all_clients.extend(clients_on_page)
+
+    return all_headers, all_clients
+
+def _parse_page_response(response, page_index, snapshot=None):
+    '''
+    Returns the headers and rows of a fetched page of the client table.
+
+    With a snapshot, the ETag is the quick fingerprint of the page: the stored rows are
+    returned when the server answered 304 or sent the same ETag as in the last scrape.
+
+    Raises:
+        ValueError: If the page has no client table.
+    '''
+    if snapshot is None:
+        return parse_user_table(response.text)
+
+    quick = snapshot.validator(page_index) if response.status_code == 304 else response.headers.get('ETag')
+    stored = snapshot.reuse(page_index, quick)
+    if stored is not None:
+        return stored
+    if response.status_code == 304:
+        raise ValueError("Not modified, but the page is not in the snapshot")
+    headers, rows = parse_user_table(response.text)
+    snapshot.record(page_index, headers, rows, quick)
+    return headers, rows
+
+def _clients_from_feed(feed):
+    '''
+    Converts a JSON feed of client rows into (headers, clients) with the same text values as the table.
+
+    The feed can either be a list of objects or an object with 'headers' and 'rows'.
+    '''
+    if isinstance(feed, dict):
+        return feed['headers'], [[str(value) for value in row] for row in feed['rows']]
+    headers = list(feed[0].keys())
+    return headers, [[str(row.get(header, '')) for header in headers] for row in feed]
+
+class _DriverPool:
+    '''
+    Hands out headless browsers to the scraping threads.
+
+    With `reuse` the released browsers are kept open for the next page, otherwise every
+    page gets a new browser that is closed again after the page was read.
+    '''
+
+    def __init__(self, size, reuse):
+        self.reuse = reuse
+        self._idle = queue.Queue()
+        self._slots = threading.Semaphore(size)
+        self._lock = threading.Lock()
+        self._drivers = {}  # Open driver -> URL it last loaded
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            driver = _start_driver()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._drivers[driver] = None
+        return driver
+
+    def current_url(self, driver):
+        with self._lock:
+            return self._drivers.get(driver)
+
+    def release(self, driver, loaded_url):
+        if self.reuse:
+            with self._lock:
+                self._drivers[driver] = loaded_url
+            self._idle.put(driver)
+            self._slots.release()
+        else:
+            self.discard(driver)
+
+    def discard(self, driver):
+        with self._lock:
+            self._drivers.pop(driver, None)
+        driver.quit()
+        self._slots.release()
+
+    def close(self):
+        with self._lock:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+        for driver in drivers:
+            driver.quit()
+
+def _start_driver():
+    '''
+    Starts a headless Chrome WebDriver.
+    '''
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    return webdriver.Chrome(options=chrome_options)
+
+def _find_page_links(driver):
+    '''
+    Waits for the pagination and returns its page links.
+    '''
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
 
-    # Wait for the pagination to load
     WebDriverWait(driver, 10).until(
         EC.presence_of_element_located((By.ID, "pagination"))
     )
-
-    # Extract pagination elements and ignore the first page (already scraped)
     pagination = driver.find_element(By.ID, "pagination")
-    all_pages = pagination.find_elements(By.TAG_NAME, 'a')
-    needed_pages = all_pages[1:]
+    return pagination.find_elements(By.TAG_NAME, 'a')
 
-    # Iterate over the remaining pages
-    for page in needed_pages:
-        page.click()  # Click on each page link
-        time.sleep(2)  # Small delay to load the new page
-        _, clients_on_page = get_data_from_table()  # Get data from the new page
-        all_clients.extend(clients_on_page)  # Add the new data to the list
-        time.sleep(3)  # Small delay between page clicks
+def _open_page(driver, page_index):
+    '''
+    Clicks the page link with the given index and waits until the table shows the new page.
+    '''
+    from selenium.webdriver.common.by import By
 
-    # Close the WebDriver
-    driver.quit()
+    PAGE_PACER.acquire()  # Paced delay between page clicks
+    old_cell = driver.find_element(By.CSS_SELECTOR, "#userTable td")
+    old_text = old_cell.text
+    start = time.monotonic()
+    _find_page_links(driver)[page_index].click()
+    loaded = _wait_for_page_change(driver, old_cell, old_text)  # Wait for the new page to load
+    PAGE_PACER.record(200 if loaded else 504, time.monotonic() - start)
 
-    #return the data
-    return all_headers, all_clients
+def _read_page(driver, page_index, extraction, snapshot=None):
+    '''
+    Reads the client table on the current page.
+
+    With a snapshot, the quick fingerprint of the table is computed in the browser first
+    (TABLE_FINGERPRINT_SCRIPT); if it did not change since the last scrape the stored rows
+    are returned, otherwise the table is extracted and recorded.
+
+    Returns:
+        - Headers of the table
+        - The data rows
+    '''
+    if snapshot is None:
+        return get_data_from_table(driver, extraction)
+
+    _wait_for_table(driver)
+    quick = driver.execute_script(TABLE_FINGERPRINT_SCRIPT, TABLE_ID)
+    stored = snapshot.reuse(page_index, quick)
+    if stored is not None:
+        return stored
+    headers, rows = get_data_from_table(driver, extraction)
+    snapshot.record(page_index, headers, rows, quick)
+    return headers, rows
+
+def _wait_for_table(driver):
+    '''
+    Waits until the client table is on the page.
+    '''
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.ID, TABLE_ID))
+    )
+
+def get_data_from_table(driver, extraction=DEFAULT_EXTRACTION):
+    '''
+    Extracts the headers and rows of the client table on the current page.
+
+    Args:
+        driver: The WebDriver showing the page.
+        extraction (str): 'script', 'html' or 'elements', see fetch_store_clients().
+
+    Returns:
+        - Headers of the table
+        - The data rows
+    '''
+    # Wait for the table to load
+    _wait_for_table(driver)
+
+    if extraction == 'script':
+        # One round-trip for the whole table
+        return result_from_script(driver.execute_script(TABLE_EXTRACT_SCRIPT, TABLE_ID))
+    if extraction == 'html':
+        # One round-trip for the page source, parsed locally
+        return parse_user_table(driver.page_source)
+    if extraction == 'elements':
+        return _get_data_from_table_elements(driver)
+    raise ValueError(f"Unknown table extraction mode: {extraction}")
+
+def _get_data_from_table_elements(driver):
+    '''
+    Extracts the client table with one WebDriver call per row and per cell.
+    '''
+    from selenium.webdriver.common.by import By
+
+    # Extract table rows
+    table = driver.find_element(By.ID, TABLE_ID)
+    rows = table.find_elements(By.TAG_NAME, "tr")
+
+    # Initialize lists for headers and data
+    headers = []
+    clients = []
+
+    # Extract headers from the first row
+    headers = [header.text for header in rows[0].find_elements(By.TAG_NAME, "th")]
+
+    # Iterate over the remaining rows to extract data
+    for row in rows[1:]:  # Start from the second row
+        cols = row.find_elements(By.TAG_NAME, "td")
+        if cols:  # Only add rows with data
+            data = [col.text for col in cols]
+            clients.append(data)
+
+    return headers, clients
+
+def _wait_for_page_change(driver, old_cell, old_text):
+    '''
+    Waits until the first cell of the table was replaced or shows a different value.
+
+    Returns:
+        - True if the table changed, False if PAGE_LOAD_TIMEOUT passed without a change
+    '''
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+    def page_changed(_):
+        try:
+            return old_cell.text != old_text
+        except StaleElementReferenceException:
+            return True
+
+    try:
+        WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(page_changed)
+        return True
+    except TimeoutException:
+        return False
 
 # Task 2: Fetch all carts for users
-def fetch_user_carts():
+def fetch_user_carts(client=None, typed=False):
     '''
     Fetches all user carts from the specified API.
 
     This function sends a GET request to the carts endpoint of the Fake Store API.
     If the response is successful, it extracts the cart data and returns it along
-    with headers. If the request fails, it raises an exception with the
-    appropriate status code.
+    with headers. If the request fails, it raises a FetchError with the status
+    code of this request.
+
+    Args:
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        typed (bool): Decode the carts into models.Cart records instead of dicts.
+
+    Raises:
+        FetchError: If the carts could not be fetched.
 
     '''
-    url = 'https://fakestoreapi.com/carts'
-    response = requests.get(url)
-    if response.status_code == 200:
-        carts = response.json()
-        # Extract headers from the first cart for consistency
-        headers = ["id", "userId", "date", "products"]
-        return headers, carts
-    else:
-        raise Exception(f"Failed to fetch carts. Status code: {response.status_code}")
+    client = client or API_CLIENT
+    carts = client.get_json('/carts', decoder=_decoder('cart', typed), raise_errors=True)
+    # Extract headers from the first cart for consistency
+    headers = list(Cart.HEADERS) if typed else ["id", "userId", "date", "products"]
+    METRICS.inc('records_fetched_total', len(carts), kind='cart', source='api')
+    return headers, carts
 
 # Task 3: Fetch extra data for each user
-def fetch_user_details(users):
+def fetch_user_details(users, client=None, bulk_threshold=BULK_THRESHOLD, typed=False):
     '''
     Fetches detailed user information based on user IDs.
 
     This function iterates over a list of users, sending a GET request to the
     Fake Store API for each user's details. It collects the user data in a list
-    and returns the headers and the data. The function
-    implements a delay between requests to avoid overwhelming the server.
+    and returns the headers and the data. The requests go through the paced
+    API client to avoid overwhelming the server.
+
+    When at least `bulk_threshold` users are requested, the whole /users collection
+    is fetched once and filtered locally instead of making one request per user.
+    Otherwise every distinct user ID is looked up once through LOOKUP_CACHE, and
+    duplicate client rows get the same record.
 
     Args:
         users (list): A list of users that the fetch_store_clients() function scraped.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        bulk_threshold (int): Number of users from which bulk mode is used, None to disable it.
+        typed (bool): Decode the users into models.User records instead of dicts.
 
     '''
-    user_details = []
-    for user in users:
-        user_id = user[0]  # Assuming the first element is user ID
-        url = f'https://fakestoreapi.com/users/{user_id}'
-        response = requests.get(url)
-        if response.status_code == 200:
-            user_details.append(response.json())
-        time.sleep(WAIT_TIME)  # Wait between requests
+    client = client or API_CLIENT
+    user_ids = [user[0] for user in users]  # Assuming the first element is user ID
+    decoder = _decoder('user', typed)
 
-    # Extract headers from the first user details
-    if user_details:
-        headers = list(user_details[0].keys())
+    if _use_bulk(user_ids, bulk_threshold):
+        user_details = _fetch_from_collection(client, '/users', user_ids, decoder)
     else:
-        headers = []
+        by_id = {user_id: _lookup(client, f'/users/{user_id}', decoder) for user_id in dict.fromkeys(user_ids)}
+        user_details = [by_id[user_id] for user_id in user_ids if by_id[user_id] is not None]
 
-    return headers, user_details
+    METRICS.inc('records_fetched_total', len(user_details), kind='user', source='api')
+    return _extract_headers(user_details), user_details
 
 # Task 4: Fetch product details for products in carts
-def fetch_product_details(carts):
+def fetch_product_details(carts, client=None, bulk_threshold=BULK_THRESHOLD, typed=False):
     '''
     Fetches detailed product information based on product IDs in user carts.
 
     This function gathers unique product IDs from all user carts, sends GET
     requests to the Fake Store API for each product's details, and returns
-    the headers and product details. A delay is implemented between requests
-    to ensure the server is not overloaded.
+    the headers and product details. The requests go through the paced
+    API client to ensure the server is not overloaded.
+
+    When at least `bulk_threshold` products are requested, the whole /products
+    collection is fetched once and filtered locally. Otherwise every product is
+    looked up through LOOKUP_CACHE.
 
     Args:
         carts (list): A list of carts, where each cart contains product details.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        bulk_threshold (int): Number of products from which bulk mode is used, None to disable it.
+        typed (bool): Decode the products into models.Product records instead of dicts.
 
+    '''
+    client = client or API_CLIENT
+    product_ids = list(_collect_product_ids(carts))
+    decoder = _decoder('product', typed)
+
+    if _use_bulk(product_ids, bulk_threshold):
+        product_details = _fetch_from_collection(client, '/products', product_ids, decoder)
+    else:
+        product_details = []
+        for product_id in product_ids:
+            product = _lookup(client, f'/products/{product_id}', decoder)
+            if product is not None:
+                product_details.append(product)
+
+    METRICS.inc('records_fetched_total', len(product_details), kind='product', source='api')
+    return _extract_headers(product_details), product_details
+
+
+def _collect_product_ids(carts):
+    '''
+    Returns the unique product IDs found in the given carts.
     '''
     product_ids = set()
     for cart in carts:
         for product in cart['products']:
             product_ids.add(product['productId'])
+    return product_ids
+
+def _extract_headers(records):
+    '''
+    Returns the keys of the first record as headers, or an empty list if there are no records.
+    Typed records always have the headers of their model.
+    '''
+    if records and isinstance(records[0], Record):
+        return list(records[0].HEADERS)
+    if records:
+        return list(records[0].keys())
+    return []
+
+def _decoder(kind, typed):
+    '''
+    Returns the body decoder of ApiClient.get_json() for a kind of record: the typed
+    model decoder, or None for plain JSON.
+    '''
+    return DECODERS[kind] if typed else None
+
+def _lookup(client, path, decoder=None, fresh=False):
+    '''
+    Fetches one ID-keyed resource through LOOKUP_CACHE: a result still in memory, or the
+    request for the same path that is already in flight, is used instead of a new request.
+    With `fresh`, a result still in memory is dropped first and the resource is requested again.
+
+    Returns:
+        - The decoded body, or None if the request failed
+    '''
+    key = (client.base_url, path, decoder)
+    if fresh:
+        LOOKUP_CACHE.discard(key)
+    return LOOKUP_CACHE.get(key, partial(client.get_json, path, decoder=decoder))
+
+def _use_bulk(ids, bulk_threshold):
+    '''
+    Returns True if the requested ID set is large enough to fetch the whole collection instead.
+    '''
+    return bulk_threshold is not None and len(set(ids)) >= bulk_threshold
+
+def _fetch_from_collection(client, collection_path, ids, decoder=None):
+    '''
+    Fetches a whole collection endpoint once and picks the requested IDs from it.
+
+    Returns:
+        - The records of the requested IDs in the same order as `ids`. IDs missing
+          from the collection are recorded as failures of the client.
+    '''
+    records = client.get_json(collection_path, decoder=decoder)
+    if records is None:
+        return []
+
+    # Scraped IDs are strings while the API uses integers, so match on the string form
+    by_id = {str(record['id']): record for record in records}
+    found = []
+    for record_id in ids:
+        record = by_id.get(str(record_id))
+        if record is None:
+            client.record_failure(f'{collection_path}/{record_id}', 404, 'Not in collection')
+        else:
+            found.append(record)
+    return found
+
+# Async fetch mode for Tasks 3 and 4
+async def _fetch_records_async(client, paths, concurrency, bucket, decoder=None):
+    '''
+    Fetches the JSON body of every distinct path concurrently, through LOOKUP_CACHE.
+
+    At most `concurrency` requests are in flight at the same time. Every request
+    waits for a slot of `bucket` before it is sent and then goes through the pacer
+    of the client, so the request rate never exceeds the stricter of the two. The
+    blocking requests calls run in a thread pool sized to the concurrency, so the
+    default executor does not cap it.
+
+    Returns:
+        - The decoded records in the same order as the paths, failed requests are skipped
+    '''
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    unique_paths = list(dict.fromkeys(paths))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        async def fetch(path):
+            async with semaphore:
+                await bucket.acquire_async()
+                return await loop.run_in_executor(executor, _lookup, client, path, decoder)
+
+        results = dict(zip(unique_paths, await asyncio.gather(*(fetch(path) for path in unique_paths))))
+    return [results[path] for path in paths if results[path] is not None]
+
+async def _fetch_from_collection_async(client, collection_path, ids, bucket, decoder=None):
+    '''
+    Async version of _fetch_from_collection(), paced by `bucket`.
+    '''
+    await bucket.acquire_async()
+    return await asyncio.to_thread(_fetch_from_collection, client, collection_path, ids, decoder)
+
+async def fetch_user_details_async(users, concurrency=DEFAULT_CONCURRENCY, rate=None, client=None,
+                                   bulk_threshold=BULK_THRESHOLD, typed=False):
+    '''
+    Async version of fetch_user_details().
+
+    The requests are issued concurrently under the requests-per-second budget of the
+    client's pacer and, if `rate` is given, of a token bucket with that rate. The
+    returned headers and user details have the same shape and order as fetch_user_details().
+
+    Args:
+        users (list): A list of users that the fetch_store_clients() function scraped.
+        concurrency (int): Maximum number of requests in flight.
+        rate (float): Maximum requests per second of this fetch, None to rely on the client's pacer only.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        bulk_threshold (int): Number of users from which bulk mode is used, None to disable it.
+        typed (bool): Decode the users into models.User records instead of dicts.
 
-    product_details = []
-    for product_id in product_ids:
-        url = f'https://fakestoreapi.com/products/{product_id}'
-        response = requests.get(url)
-        if response.status_code == 200:
-            product_details.append(response.json())
-        time.sleep(WAIT_TIME)  # Wait between requests
-
-    # Extract headers from the first product details
-    if product_details:
-        headers = list(product_details[0].keys())
+    '''
+    client = client or API_CLIENT
+    bucket = TokenBucket(rate)
+    user_ids = [user[0] for user in users]
+    decoder = _decoder('user', typed)
+
+    if _use_bulk(user_ids, bulk_threshold):
+        user_details = await _fetch_from_collection_async(client, '/users', user_ids, bucket, decoder)
     else:
-        headers = []
+        paths = [f'/users/{user_id}' for user_id in user_ids]
+        user_details = await _fetch_records_async(client, paths, concurrency, bucket, decoder)
+
+    METRICS.inc('records_fetched_total', len(user_details), kind='user', source='api')
+    return _extract_headers(user_details), user_details
+
+async def fetch_product_details_async(carts, concurrency=DEFAULT_CONCURRENCY, rate=None, client=None,
+                                      bulk_threshold=BULK_THRESHOLD, typed=False):
+    '''
+    Async version of fetch_product_details().
+
+    The unique product IDs of the carts are fetched concurrently under the
+    requests-per-second budget of the client's pacer and, if `rate` is given, of a
+    token bucket with that rate. The returned headers and product details have the
+    same shape and order as fetch_product_details().
 
-    return headers, product_details
+    Args:
+        carts (list): A list of carts, where each cart contains product details.
+        concurrency (int): Maximum number of requests in flight.
+        rate (float): Maximum requests per second of this fetch, None to rely on the client's pacer only.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        bulk_threshold (int): Number of products from which bulk mode is used, None to disable it.
+        typed (bool): Decode the products into models.Product records instead of dicts.
+
+    '''
+    client = client or API_CLIENT
+    bucket = TokenBucket(rate)
+    product_ids = list(_collect_product_ids(carts))
+    decoder = _decoder('product', typed)
+
+    if _use_bulk(product_ids, bulk_threshold):
+        product_details = await _fetch_from_collection_async(client, '/products', product_ids, bucket, decoder)
+    else:
+        paths = [f'/products/{product_id}' for product_id in product_ids]
+        product_details = await _fetch_records_async(client, paths, concurrency, bucket, decoder)
+
+    METRICS.inc('records_fetched_total', len(product_details), kind='product', source='api')
+    return _extract_headers(product_details), product_details
+
+# Streaming mode for Tasks 3 and 4
+def _iter_records(client, paths, concurrency, kind=None, fresh=False):
+    '''
+    Fetches the JSON body of every path and yields the records in order as they arrive.
+
+    At most `concurrency` requests run at the same time and at most twice as many
+    responses are buffered, so the memory used does not depend on the number of paths.
+    Failed requests are skipped (and recorded as failures of the client). The records
+    are counted in the run metrics under `kind`. The lookups go through LOOKUP_CACHE,
+    so a repeated path is served from memory or joins the request already in flight;
+    with `fresh` the results kept in memory are not used (see _lookup()).
+    '''
+    concurrency = max(1, concurrency)
+    window = concurrency * 2
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for path in paths:
+            pending.append(executor.submit(_lookup, client, path, fresh=fresh))
+            if len(pending) >= window:
+                record = pending.popleft().result()
+                if record is not None:
+                    METRICS.inc('records_fetched_total', kind=kind, source='api')
+                    yield record
+        while pending:
+            record = pending.popleft().result()
+            if record is not None:
+                METRICS.inc('records_fetched_total', kind=kind, source='api')
+                yield record
+
+def iter_user_details(users, concurrency=DEFAULT_CONCURRENCY, client=None):
+    '''
+    Streaming version of fetch_user_details().
+
+    Yields the user details one by one, in the order of `users`, while the next
+    requests are already in flight. `users` can be any iterable, e.g. a generator
+    reading the scraped clients from a file, and is consumed lazily.
+
+    Args:
+        users (iterable): Client rows whose first element is the user ID.
+        concurrency (int): Maximum number of requests in flight.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+
+    '''
+    client = client or API_CLIENT
+    paths = (f'/users/{user[0]}' for user in users)
+    yield from _iter_records(client, paths, concurrency, 'user')
+
+def iter_product_details(carts, concurrency=DEFAULT_CONCURRENCY, client=None):
+    '''
+    Streaming version of fetch_product_details().
+
+    Yields the details of every product found in the carts once, in the order in
+    which the products first appear. `carts` can be any iterable and is consumed lazily.
+
+    Args:
+        carts (iterable): Carts, where each cart contains product details.
+        concurrency (int): Maximum number of requests in flight.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+
+    '''
+    client = client or API_CLIENT
+
+    def product_paths():
+        seen = set()
+        for cart in carts:
+            for product in cart['products']:
+                product_id = product['productId']
+                if product_id not in seen:
+                    seen.add(product_id)
+                    yield f'/products/{product_id}'
+
+    yield from _iter_records(client, product_paths(), concurrency, 'product')
+
+# Checkpointed mode for Tasks 2, 3 and 4
+def fetch_user_carts_checkpointed(checkpoint, client=None, typed=False):
+    '''
+    Fetches all user carts like fetch_user_carts() and stores every cart in the checkpoint store.
+
+    Args:
+        checkpoint (CheckpointStore): The store of the current run.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        typed (bool): Return models.Cart records instead of dicts.
+
+    '''
+    headers, carts = fetch_user_carts(client, typed)
+    try:
+        for cart in carts:
+            checkpoint.save('cart', cart['id'], cart.to_dict() if typed else cart)
+    finally:
+        checkpoint.flush()
+    return headers, carts
+
+def fetch_user_details_checkpointed(users, checkpoint, incremental=False, concurrency=DEFAULT_CONCURRENCY, client=None,
+                                    typed=False, refetch=()):
+    '''
+    Fetches user details like fetch_user_details(), storing every user as soon as it arrives.
+
+    Users the checkpoint store says can be skipped (already stored by this run when it
+    is resumed, or known from a previous successful run in incremental mode) are not
+    fetched again; their stored record is reused. The users in `refetch` (e.g. the clients
+    whose row changed since the last scrape, see TableSnapshot.changed_ids()) are fetched
+    again unless this run already fetched them.
+
+    Args:
+        users (list): A list of users that the fetch_store_clients() function scraped.
+        checkpoint (CheckpointStore): The store of the current run.
+        incremental (bool): Only fetch users that no successful run fetched before.
+        concurrency (int): Maximum number of requests in flight.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        typed (bool): Return models.User records instead of dicts.
+        refetch (iterable): IDs of users that are fetched again even if they are known.
+
+    '''
+    user_ids = [str(user[0]) for user in users]
+    return _fetch_checkpointed('user', '/users', user_ids, checkpoint, incremental, concurrency, client, typed, refetch)
+
+def fetch_product_details_checkpointed(carts, checkpoint, incremental=False, concurrency=DEFAULT_CONCURRENCY, client=None,
+                                       typed=False):
+    '''
+    Fetches product details like fetch_product_details(), storing every product as soon as it arrives.
+
+    In incremental mode only the product IDs that are new since the last successful
+    run are fetched, the other products are reused from the checkpoint store.
+
+    Args:
+        carts (list): A list of carts, where each cart contains product details.
+        checkpoint (CheckpointStore): The store of the current run.
+        incremental (bool): Only fetch products that no successful run fetched before.
+        concurrency (int): Maximum number of requests in flight.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        typed (bool): Return models.Product records instead of dicts.
+
+    '''
+    product_ids = [str(product_id) for product_id in _collect_product_ids(carts)]
+    return _fetch_checkpointed('product', '/products', product_ids, checkpoint, incremental, concurrency, client, typed)
+
+def _fetch_checkpointed(kind, collection_path, ids, checkpoint, incremental, concurrency, client, typed=False, refetch=()):
+    '''
+    Fetches the IDs the checkpoint store cannot skip and the IDs in `refetch` this run did
+    not fetch yet, stores them one by one and returns the headers and the records of all
+    IDs in input order.
+
+    In typed mode every fetched record is checked against its model before it is
+    stored; a malformed record is recorded as a failure of the client and not stored.
+
+    The IDs are fetched because the store has no current record of them (e.g. a refetched
+    client whose row changed), so a record LOOKUP_CACHE still keeps from earlier in the
+    process is not used.
+    '''
+    client = client or API_CLIENT
+    model = MODELS[kind]
+    skip = checkpoint.ids_to_skip(kind, incremental)
+    if refetch:
+        skip -= {str(record_id) for record_id in refetch} - checkpoint.ids_fetched_in_run(kind)
+    paths = [f'{collection_path}/{record_id}' for record_id in dict.fromkeys(ids) if record_id not in skip]
+
+    fetched = 0
+    try:
+        for record in _iter_records(client, paths, concurrency, kind, fresh=True):
+            if typed:
+                try:
+                    model.from_dict(record)
+                except RecordError as error:
+                    record_id = record.get('id') if isinstance(record, dict) else None
+                    client.record_failure(f"{collection_path}/{record_id}", 200, f"Malformed response: {error}")
+                    continue
+            checkpoint.save(kind, record['id'], record)
+            fetched += 1
+    finally:
+        checkpoint.flush()  # Also when the stage is interrupted, so a resumed run skips what arrived
+
+    records = [checkpoint.get(kind, record_id) for record_id in ids]
+    records = [model.from_dict(record) if typed else record for record in records if record is not None]
+    METRICS.inc('records_fetched_total', len(records) - fetched, kind=kind, source='checkpoint')
+    return _extract_headers(records), records
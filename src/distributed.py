@@ -0,0 +1,284 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This script runs Tasks 3 and 4 sharded over several worker processes, on this
+host or on others sharing the store, which share a work queue file (see work_queue.py).
+
+Steps:
+- enqueue: the coordinator scrapes the store clients (Task 1) and fetches the carts (Task 2),
+  stores both in the queue and enqueues one task per user ID and per product ID.
+- work: a worker claims batches of tasks under a lease, fetches them with the same
+  fetch_user_details() / fetch_product_details() logic as main.py and writes the records
+  back. Tasks of a worker that died are claimed again once their lease expires.
+- merge: once every task is done or failed, the records are read back from the queue and
+  saved like main.py does (Tasks 5 to 7).
+- run: the three steps on this host, with --workers local worker processes.
+
+The workers share one request budget instead of getting one each: 'run' gives every worker
+an adaptive pacer (see pacing.AdaptiveRateController) capped at --rate / --workers requests
+per second. A worker started with 'work' is capped at --rate, so workers started on other
+hosts should be given their share of the budget.
+
+Usage:
+- python distributed.py run --queue work_queue.sqlite --workers 4 [--rate 20]
+- python distributed.py enqueue --queue /mnt/shared/work_queue.sqlite
+- python distributed.py work --queue /mnt/shared/work_queue.sqlite --rate 5      (on as many hosts as needed)
+- python distributed.py merge --queue /mnt/shared/work_queue.sqlite
+"""
+
+from data_fetcher import (fetch_store_clients_lightweight, fetch_user_carts, fetch_user_details, fetch_product_details,
+                          API_CLIENT, API_PACER, STORE_CLIENTS_URL, WAIT_TIME)
+from save_data import save_user_data_to_excel, save_product_data_to_excel, save_cart_metrics, OUTPUT_FORMATS, DEFAULT_FORMATS
+from cart_metrics import cart_lines
+from sinks import DEFAULT_COMPRESSION, PARQUET_COMPRESSIONS
+from work_queue import WorkQueue, DEFAULT_QUEUE_PATH, DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, DEFAULT_BATCH_SIZE
+from pacing import AdaptiveRateController
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+
+# Constants
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = API_PACER.max_rate  # Requests per second of all workers together, the budget of one process
+POLL_INTERVAL = 1.0  # Seconds an idle worker waits for the leases of the other workers to finish or expire
+
+
+def _fetch_users(ids, client):
+    # Batches are small, fetching the whole collection for every batch would cost more than it saves
+    return fetch_user_details([[user_id] for user_id in ids], client, bulk_threshold=None)
+
+def _fetch_products(ids, client):
+    # fetch_product_details() collects the product IDs from carts, so the batch is passed as one cart
+    cart = {'products': [{'productId': product_id} for product_id in ids]}
+    return fetch_product_details([cart], client, bulk_threshold=None)
+
+# Fetch function of every task kind
+FETCHERS = {'user': _fetch_users, 'product': _fetch_products}
+
+
+def enqueue_tasks(queue, clients_url=STORE_CLIENTS_URL, client=None):
+    """
+    Coordinator step: runs Tasks 1 and 2, stores their results in the queue for the merge
+    step and enqueues the users of the scraped clients and the products of the carts.
+
+    Args:
+        queue (WorkQueue): The work queue.
+        clients_url (str): The page with the client table.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+
+    Returns:
+        - The number of user tasks and product tasks added
+    """
+    client_headers, store_clients, scrape_path = fetch_store_clients_lightweight(clients_url)
+    print(f"Task 1 complited ({scrape_path}), Found {len(store_clients)} clients")
+    cart_headers, user_carts = fetch_user_carts(client)
+    print(f"Task 2 complited, Found {len(user_carts)} carts")
+
+    queue.put_input('clients', {'headers': client_headers, 'rows': store_clients})
+    queue.put_input('carts', {'headers': cart_headers, 'rows': user_carts})
+    product_ids = sorted({line['productId'] for cart in user_carts for line in cart['products']})
+    users_added = queue.enqueue('user', [row[0] for row in store_clients])
+    products_added = queue.enqueue('product', product_ids)
+    print(f"Enqueued {users_added} user tasks and {products_added} product tasks")
+    return users_added, products_added
+
+
+def worker_pacer(rate):
+    """
+    Returns the adaptive pacer of a worker whose share of the request budget is `rate`
+    requests per second. It backs off on throttling like API_PACER but never exceeds `rate`.
+    """
+    return AdaptiveRateController(initial_rate=min(API_PACER.rate, rate), min_rate=min(1 / WAIT_TIME, rate),
+                                  max_rate=rate)
+
+
+def run_worker(queue_path=DEFAULT_QUEUE_PATH, worker_id=None, api_url=None, batch_size=DEFAULT_BATCH_SIZE,
+               lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS, poll_interval=POLL_INTERVAL,
+               client=None, rate=None):
+    """
+    Worker step: claims batches of tasks and fetches them until no task is pending or leased.
+
+    A record that was not returned is released with the reason of the failed request,
+    so another claim retries it. A worker whose lease expired while it was fetching
+    cannot overwrite the task any more.
+
+    Args:
+        queue_path (str): Path of the work queue.
+        worker_id (str): ID of the worker in the leases, defaults to <hostname>-<pid>.
+        api_url (str): Root URL of the store API, defaults to the Fake Store API.
+        batch_size (int): Tasks claimed at a time.
+        lease_seconds (float): How long a claimed batch belongs to this worker.
+        max_attempts (int): How many times a task is claimed before it is marked as failed.
+        poll_interval (float): Seconds to wait while only other workers hold tasks.
+        client (ApiClient): The API client to use, defaults to API_CLIENT.
+        rate (float): Share of the request budget of this worker in requests per second. The
+            pacer of the client is replaced by worker_pacer(rate). None keeps the pacer of the client.
+
+    Returns:
+        - The number of tasks this worker completed
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    client = client or API_CLIENT
+    if api_url:
+        client.base_url = api_url.rstrip('/')
+    if rate:
+        client.pacer = worker_pacer(rate)
+    queue = WorkQueue(queue_path, lease_seconds, max_attempts)
+
+    completed = 0
+    try:
+        while True:
+            tasks = queue.claim(worker_id, batch_size)
+            if not tasks:
+                if queue.unfinished() == 0:
+                    break
+                time.sleep(poll_interval)  # The leases of the other workers may still expire
+                continue
+
+            for kind in FETCHERS:
+                ids = [task_id for task_kind, task_id in tasks if task_kind == kind]
+                if ids:
+                    completed += _run_batch(queue, worker_id, kind, ids, client)
+    finally:
+        queue.close()
+    print(f"Worker {worker_id} completed {completed} tasks")
+    return completed
+
+def _run_batch(queue, worker_id, kind, ids, client):
+    """
+    Fetches one batch of leased tasks of a kind and writes the results back.
+
+    Returns:
+        - The number of tasks completed
+    """
+    try:
+        _, records = FETCHERS[kind](ids, client)
+    except Exception as error:
+        for task_id in ids:
+            queue.fail(kind, task_id, worker_id, error)
+        return 0
+
+    by_id = {str(record['id']): record for record in records}
+    completed = 0
+    for task_id in ids:
+        record = by_id.get(task_id)
+        if record is None:
+            queue.fail(kind, task_id, worker_id, _failure_reason(client, task_id))
+        elif queue.complete(kind, task_id, worker_id, record):
+            completed += 1
+    return completed
+
+def _failure_reason(client, task_id):
+    """
+    Returns the status and reason of the last failed request for a task ID.
+    """
+    for failure in reversed(client.failures):
+        if failure['path'].endswith(f'/{task_id}'):
+            return f"{failure['status']}: {failure['reason']}"
+    return 'Not returned by the API'
+
+
+def run_workers(queue_path=DEFAULT_QUEUE_PATH, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, **options):
+    """
+    Runs `workers` worker processes on this host until the queue is drained.
+
+    Args:
+        queue_path (str): Path of the work queue.
+        workers (int): Number of worker processes.
+        rate (float): Requests per second of all workers together, every worker gets an equal share.
+        options: Passed on to run_worker().
+
+    Returns:
+        - The number of tasks the workers completed
+    """
+    # Spawned, not forked: every worker starts with its own connections, pacer and queue handle
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(run_worker, queue_path, rate=rate / workers, **options) for _ in range(workers)]
+        return sum(future.result() for future in futures)
+
+
+def merge_results(queue, formats=DEFAULT_FORMATS, output_dir='.', compression=DEFAULT_COMPRESSION, flatten=False):
+    """
+    Merge step: reads the clients, carts, users and products back from the queue and saves
+    them like main.py (Tasks 5 to 7). Failed tasks are reported and left out.
+
+    Args:
+        queue (WorkQueue): The work queue.
+        formats, output_dir, compression, flatten: See save_data.save_user_data_to_excel().
+
+    Returns:
+        - The failed tasks (see WorkQueue.failures())
+
+    Raises:
+        RuntimeError: If the queue was not filled yet or tasks are still pending or leased.
+    """
+    clients = queue.get_input('clients')
+    carts = queue.get_input('carts')
+    if clients is None or carts is None:
+        raise RuntimeError(f"Nothing was enqueued in {queue.path}, run the enqueue step first")
+    unfinished = queue.unfinished()
+    if unfinished:
+        raise RuntimeError(f"{unfinished} tasks are not finished yet, run workers before merging")
+
+    user_details = queue.results('user')
+    product_details = queue.results('product')
+    user_headers = list(user_details[0].keys()) if user_details else []
+    product_headers = list(product_details[0].keys()) if product_details else []
+    user_carts = carts['rows']
+    lines = cart_lines(user_carts)
+
+    # Task 5: Save user data
+    save_user_data_to_excel(clients['rows'], clients['headers'], user_carts, carts['headers'], user_details, user_headers,
+                            formats=formats, output_dir=output_dir, compression=compression, flatten=flatten)
+    # Task 6: Save product data
+    save_product_data_to_excel(user_carts, product_details, product_headers, formats=formats, output_dir=output_dir,
+                               compression=compression, flatten=flatten, lines=lines)
+    # Task 7: Save basket sizes and daily sales
+    save_cart_metrics(user_carts, product_details, product_headers, formats=formats, output_dir=output_dir,
+                      compression=compression, lines=lines)
+
+    failures = queue.failures()
+    if failures:
+        print(f"{len(failures)} tasks failed and were left out: ", failures)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch the store data with several worker processes sharing a work queue.")
+    parser.add_argument("step", choices=("enqueue", "work", "merge", "run"), help="The step to run, 'run' runs all of them")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, help="Path of the work queue")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes started by 'run'")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Tasks a worker claims at a time")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="Seconds a claimed batch belongs to its worker")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="Claims of a task before it is marked as failed")
+    parser.add_argument("--rate", type=float, help=f"Requests per second of all workers of 'run' together (default "
+                                                   f"{DEFAULT_RATE:g}), or of this worker for 'work'")
+    parser.add_argument("--api-url", help="Root URL of the store API, e.g. the local server of tests/fake_server.py")
+    parser.add_argument("--clients-url", default=STORE_CLIENTS_URL, help="The page with the client table")
+    parser.add_argument("--formats", nargs="+", choices=OUTPUT_FORMATS, default=list(DEFAULT_FORMATS),
+                        help="Output formats of the merge step")
+    parser.add_argument("--compression", choices=PARQUET_COMPRESSIONS, default=DEFAULT_COMPRESSION,
+                        help="Compression of the Parquet and Arrow files")
+    parser.add_argument("--flatten", action="store_true", help="Split address, name and rating into columns before saving")
+    args = parser.parse_args()
+
+    worker_options = dict(api_url=args.api_url, batch_size=args.batch_size, lease_seconds=args.lease,
+                          max_attempts=args.max_attempts)
+    queue = WorkQueue(args.queue, args.lease, args.max_attempts)
+    if args.api_url:
+        API_CLIENT.base_url = args.api_url.rstrip('/')
+    if args.step in ("enqueue", "run"):
+        enqueue_tasks(queue, args.clients_url)
+    if args.step == "work":
+        run_worker(args.queue, rate=args.rate, **worker_options)
+    if args.step == "run":
+        completed = run_workers(args.queue, args.workers, args.rate or DEFAULT_RATE, **worker_options)
+        print(f"{completed} tasks completed by {args.workers} workers")
+    if args.step in ("merge", "run"):
+        merge_results(queue, tuple(args.formats), compression=args.compression, flatten=args.flatten)
+    print("Work queue: ", queue.counts())
+    queue.close()
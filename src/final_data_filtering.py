@@ -11,85 +11,383 @@ to a datetime format. The updated data is then saved back to the respective Exce
 This is an additional and optional script, it is not run in main with others. It can be used 
 after main finishes and converts the excel files into more detailed by spliting columns.
 
+The same flattening is available on the in-memory records at save time (flatten_product_frame(),
+flatten_user_frame(), used by save_data with flatten=True). The nested fields are expanded
+column-wise in one pass instead of one Python call per row and field, and values that were
+written as text are parsed with parse_literal() (JSON or Python literals only, never eval).
+
+The Excel files are processed in bounded memory: they are read in chunks of rows
+(sinks.iter_xlsx_frames), every chunk is flattened and written to a new workbook in
+constant memory (sinks.XlsxSink), which then replaces the original file.
+
+process_files() processes many report files (paths, directories or glob patterns, e.g.
+the reports of historical runs) in a process pool. Every file is split into ranges of rows
+and every range is read, flattened and written to a part file by a worker; the parts of a
+file are then joined into the new file, so a large file is spread over all the workers too.
+Files that were already flattened are skipped.
+
+Usage:
+- python final_data_filtering.py [files, directories or globs ...] [--workers N] [--chunk-size N]
 """
 
+import argparse
+import ast
+import glob
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+from metrics import METRICS
+from sinks import XlsxSink, iter_xlsx_frames, iter_xlsx_range, merge_xlsx_parts, xlsx_row_ranges
+
+# Constants
+CHUNK_SIZE = 10000  # Rows read, flattened and written at a time
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_INPUTS = ('product_data.xlsx', 'combined_user_data.xlsx')
+
+# Flattened columns: output column -> path inside the nested value
+RATING_FIELDS = {'rating': ('rate',), 'votes': ('count',)}
+ADDRESS_FIELDS = {
+    'Address-latitude': ('geolocation', 'lat'),
+    'Address-longitude': ('geolocation', 'long'),
+    'Address-city': ('city',),
+    'city-street': ('street',),
+    'street-number': ('number',),
+    'Address-zipcode': ('zipcode',),
+}
+
+_PYTHON_KEYWORDS = re.compile(r'True|False|None')
+
+
+def parse_literal(value):
+    """
+    Safely parses a nested value that was written as text.
+
+    JSON (as written by the CSV sink) and Python literals (the repr strings written to
+    Excel) are accepted; anything else raises instead of being executed.
+
+    Args:
+        value: A string, or a value that is already parsed (returned as it is).
+
+    Returns:
+        - The parsed value, None for missing values
+
+    Raises:
+        ValueError: If the string is not a JSON or Python literal.
+    """
+    if not isinstance(value, str):
+        return None if _is_missing(value) else value
+    # A Python repr without double quotes, backslashes or True/False/None only differs
+    # from JSON by its quotes, and the JSON parser is much faster than literal_eval
+    text = value
+    if '"' not in value and '\\' not in value and not _PYTHON_KEYWORDS.search(value):
+        text = value.replace("'", '"')
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError) as error:
+        raise ValueError(f"Not a literal value: {value[:80]!r}") from error
+
+
+def parse_literal_column(series):
+    """
+    Parses a column with parse_literal(). Every distinct string is parsed only once.
+    """
+    if series.dtype != object:
+        return series
+    is_text = series.map(type).eq(str)
+    if not is_text.any():
+        return series
+    parsed = {text: parse_literal(text) for text in series[is_text].unique()}
+    return series.map(lambda value: parsed[value] if isinstance(value, str) else parse_literal(value))
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _expand(series, fields):
+    """
+    Expands a column of dicts into one column per field.
+
+    Every level of nesting is converted into a DataFrame at once, so the number of
+    Python steps depends on the nesting depth and not on the number of rows and fields.
+
+    Args:
+        series (Series): Dicts, literal strings or missing values.
+        fields (dict): Output column -> path of keys inside the dict.
+
+    Returns:
+        - A DataFrame with one column per field and the index of `series`
+    """
+    columns = _expand_level(parse_literal_column(series).tolist(), fields, series.index)
+    return pd.DataFrame({column: columns[column] for column in fields}, index=series.index)
+
+
+def _expand_level(values, fields, index):
+    frame = pd.DataFrame([value if isinstance(value, dict) else {} for value in values], index=index)
+    columns = {}
+    nested = {}
+    for column, path in fields.items():
+        if len(path) > 1:
+            nested.setdefault(path[0], {})[column] = path[1:]
+        elif path[0] in frame:
+            columns[column] = frame[path[0]]
+        else:
+            columns[column] = pd.Series(None, index=index, dtype=object)
+    for key, sub_fields in nested.items():
+        sub_values = frame[key].tolist() if key in frame else [None] * len(index)
+        columns.update(_expand_level(sub_values, sub_fields, index))
+    return columns
+
+
+def flatten_product_frame(df_products):
+    """
+    Splits the rating of the products into rating and votes and fixes the column types.
+
+    Args:
+        df_products (DataFrame): Product data with a 'rating' column of dicts (or literal strings).
+
+    Returns:
+        - A new DataFrame
+    """
+    df_products = df_products.copy()
+    expanded = _expand(df_products['rating'], RATING_FIELDS)
+    df_products['rating'] = pd.to_numeric(expanded['rating']).astype(float)
+    df_products['votes'] = pd.to_numeric(expanded['votes']).astype('Int64')
+    df_products['price'] = df_products['price'].astype(float)
+    df_products['id'] = pd.to_numeric(df_products['id']).astype('Int64')
+    METRICS.inc('rows_processed_total', len(df_products), step='flatten', dataset='products')
+    return df_products
+
+
+def flatten_user_frame(df_users):
+    """
+    Splits the address of the users into columns, joins the name into full_name and
+    converts 'Last Login' to datetime.
+
+    Args:
+        df_users (DataFrame): User data with 'address' and 'name' columns of dicts (or literal strings).
 
-def process_product_data(file_path):
+    Returns:
+        - A new DataFrame
+    """
+    df_users = df_users.copy()
+    address = _expand(df_users['address'], ADDRESS_FIELDS)
+    address['Address-latitude'] = pd.to_numeric(address['Address-latitude'])
+    address['Address-longitude'] = pd.to_numeric(address['Address-longitude'])
+    name = _expand(df_users['name'], {'firstname': ('firstname',), 'lastname': ('lastname',)})
+
+    df_users = df_users.drop(columns=['address', 'name'])
+    df_users[list(address.columns)] = address
+    df_users['id'] = pd.to_numeric(df_users['id']).astype('Int64')
+    df_users['full_name'] = name['firstname'].str.cat(name['lastname'], sep=' ')
+    if 'Last Login' in df_users:
+        df_users['Last Login'] = pd.to_datetime(df_users['Last Login'])
+    METRICS.inc('rows_processed_total', len(df_users), step='flatten', dataset='users')
+    return df_users
+
+
+def process_excel_file(file_path, transform, chunk_size=CHUNK_SIZE):
+    """
+    Applies `transform` to an Excel file chunk by chunk and replaces the file with the result.
+
+    At most `chunk_size` rows are in memory at a time. The result is written to a
+    temporary file first, so the original file stays intact if the processing fails.
+
+    Args:
+        file_path (str): The Excel file.
+        transform (callable): Transforms one DataFrame chunk.
+        chunk_size (int): Rows per chunk.
+
+    Returns:
+        - The number of rows processed
+    """
+    temporary_path = f"{file_path}.partial"
+    try:
+        with XlsxSink(temporary_path) as sink:
+            for frame in iter_xlsx_frames(file_path, chunk_size):
+                sink.write_frame(transform(frame))
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, file_path)
+    return sink.rows_written
+
+def process_product_data(file_path, chunk_size=CHUNK_SIZE):
     """
     Process product data from an Excel file.
 
     This function performs the following operations:
-    - Loads product data from the specified file.
+    - Loads product data from the specified file, `chunk_size` rows at a time.
     - Splits the rating into separate columns for rating and votes.
     - Ensures the correct data types for relevant columns.
     - Saves the updated product data back to the Excel file.
 
     Args:
         file_path (str): Path to the Excel file containing product data.
+        chunk_size (int): Rows kept in memory at a time.
     """
-    # Load the product data
-    df_products = pd.read_excel(file_path)
-    
-    # Split rating into separate columns: rating and votes
-    df_products['rating'] = df_products['rating'].apply(eval)
-    df_products['votes'] = df_products['rating'].apply(lambda x: x['count'])
-    df_products['rating'] = df_products['rating'].apply(lambda x: x['rate'])
-    
-    # Ensure data types are correct
-    df_products['price'] = df_products['price'].astype(float)
-    df_products['rating'] = df_products['rating'].astype(float)
-    df_products['votes'] = df_products['votes'].astype(int)
-    df_products['id'] = df_products['id'].astype(int)
-    
-    # Save the updated product data back to the Excel file
-    df_products.to_excel(file_path, index=False)
+    # The ratings are parsed safely from their text form
+    process_excel_file(file_path, flatten_product_frame, chunk_size)
     print(f"Product data updated and saved to {file_path}")
 
-def process_user_data(file_path):
+def process_user_data(file_path, chunk_size=CHUNK_SIZE):
     """
     Process user data from an Excel file.
 
     This function performs the following operations:
-    - Loads user data from the specified file.
+    - Loads user data from the specified file, `chunk_size` rows at a time.
     - Splits address information into separate columns.
     - Converts the 'Last Login' field to a datetime format.
     - Saves the updated user data back to the Excel file.
 
     Args:
         file_path (str): Path to the Excel file containing user data.
+        chunk_size (int): Rows kept in memory at a time.
     """
-    # Load the user data
-    df_users = pd.read_excel(file_path)
-    
-    # Split address into separate columns
-    df_users['address'] = df_users['address'].apply(eval)
-    df_users['Address-latitude'] = df_users['address'].apply(lambda x: float(x['geolocation']['lat']))
-    df_users['Address-longitude'] = df_users['address'].apply(lambda x: float(x['geolocation']['long']))
-    df_users['Address-city'] = df_users['address'].apply(lambda x: x['city'])
-    df_users['city-street'] = df_users['address'].apply(lambda x: x['street'])
-    df_users['street-number'] = df_users['address'].apply(lambda x: x['number'])
-    df_users['Address-zipcode'] = df_users['address'].apply(lambda x: x['zipcode'])
-    df_users['id'] = df_users['id'].astype(int)
-    # Drop the original address column
-    df_users.drop(columns=['address'], inplace=True)
-    
-    # Split name into full name
-    df_users['name'] = df_users['name'].apply(eval)
-    df_users['full_name'] = df_users['name'].apply(lambda x: f"{x['firstname']} {x['lastname']}")
-    
-    # Drop the original name column
-    df_users.drop(columns=['name'], inplace=True)
-    # Convert 'Last Login' to datetime
-    df_users['Last Login'] = pd.to_datetime(df_users['Last Login'])
-    
-    # Save the updated user data back to the Excel file
-    df_users.to_excel(file_path, index=False)
+    # The address and name are parsed safely from their text form
+    process_excel_file(file_path, flatten_user_frame, chunk_size)
     print(f"User data updated and saved to {file_path}")
 
-if __name__ == "__main__":
-    product_file = 'product_data.xlsx'  # Path to your product data file
-    user_file = 'combined_user_data.xlsx'  # Path to your user data file
 
-    process_product_data(product_file)
-    process_user_data(user_file)
+# Report name -> (transform, column that only the flattened report has, dataset of the metrics)
+REPORTS = {
+    'product_data': (flatten_product_frame, 'votes', 'products'),
+    'combined_user_data': (flatten_user_frame, 'full_name', 'users'),
+}
+
+def report_of(path):
+    """
+    Returns the report name of an Excel file from its file name, e.g. 'product_data' for
+    'runs/2024-08-09/product_data.xlsx' or 'product_data_2024-08-09.xlsx', or None.
+    """
+    name = os.path.basename(path)
+    if not name.endswith('.xlsx'):
+        return None
+    return next((report for report in REPORTS if name.startswith(report)), None)
+
+def find_report_files(inputs):
+    """
+    Expands file paths, directories (searched recursively) and glob patterns into the
+    sorted list of report files they contain. Other files are left out.
+    """
+    paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '**', '*.xlsx')
+        paths.update(glob.glob(pattern, recursive=True))
+    return sorted(path for path in paths if os.path.isfile(path) and report_of(path) is not None)
+
+def needs_flattening(path):
+    """
+    Returns True if a report file has rows and was not flattened yet.
+    """
+    first = next(iter_xlsx_frames(path, 1), None)
+    return first is not None and REPORTS[report_of(path)][1] not in first.columns
+
+def process_report(path, chunk_size=CHUNK_SIZE):
+    """
+    Flattens one report file in place, unless it was already flattened.
+
+    Returns:
+        - The number of rows processed, 0 if the file was skipped
+    """
+    if not needs_flattening(path):
+        return 0
+    return process_excel_file(path, REPORTS[report_of(path)][0], chunk_size)
+
+def process_range(path, sheet_index, first_row, last_row, part_path):
+    """
+    Flattens the rows `first_row` to `last_row` of one sheet of a report file (see
+    sinks.xlsx_row_ranges()) into a part file that keeps their row numbers.
+
+    Returns:
+        - The number of rows processed
+    """
+    transform = REPORTS[report_of(path)][0]
+    with XlsxSink(part_path, first_row=first_row - 1) as sink:
+        for frame in iter_xlsx_range(path, sheet_index, first_row, last_row, last_row - first_row + 1):
+            sink.write_frame(transform(frame))
+    return sink.rows_written
+
+def merge_report(path, parts):
+    """
+    Joins the part files of a report (see process_range()) into the new file, which replaces
+    the original, and deletes the parts.
+    """
+    temporary_path = f"{path}.partial"
+    try:
+        merge_xlsx_parts(parts, temporary_path)
+        os.replace(temporary_path, path)
+    finally:
+        for part in [temporary_path] + [part for _, part in parts]:
+            if os.path.exists(part):
+                os.remove(part)
+
+def process_files(inputs=DEFAULT_INPUTS, workers=DEFAULT_WORKERS, chunk_size=CHUNK_SIZE):
+    """
+    Flattens every report file found in `inputs` (see find_report_files()) in a process pool.
+
+    Every file is split into ranges of `chunk_size` rows. A worker reads a range, flattens it
+    and writes it to a part file (process_range()), and once all the ranges of a file are done
+    a worker joins its parts into the new file (merge_report()). Reading, flattening and
+    writing are all spread over the workers, for one large file as for many files.
+
+    Args:
+        inputs (list): File paths, directories and glob patterns.
+        workers (int): Worker processes, 1 to process everything in this process.
+        chunk_size (int): Rows per chunk.
+
+    Returns:
+        - A dict of the rows processed per file, 0 for the files that were already flattened
+    """
+    paths = find_report_files(inputs)
+    if workers <= 1 or not paths:
+        rows = {path: process_report(path, chunk_size) for path in paths}
+    else:
+        rows = dict.fromkeys(paths, 0)
+        ranges = {path: xlsx_row_ranges(path, chunk_size) for path in paths if needs_flattening(path)}
+        # Spawned, not forked: the workers do not inherit the locks of this process
+        context = multiprocessing.get_context('spawn')
+        parts = {path: [(sheet_index, f"{path}.part{index}") for index, (sheet_index, _, _) in enumerate(path_ranges)]
+                 for path, path_ranges in ranges.items()}
+        try:
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                futures = {path: [pool.submit(process_range, path, *path_range, part)
+                                  for path_range, (_, part) in zip(path_ranges, parts[path])]
+                           for path, path_ranges in ranges.items()}
+                # A file is merged as soon as its ranges are done, while the ranges of the next files run
+                merges = []
+                for path, path_futures in futures.items():
+                    rows[path] = sum(future.result() for future in path_futures)
+                    merges.append(pool.submit(merge_report, path, parts[path]))
+                for merge in merges:
+                    merge.result()
+        finally:
+            # The parts of a file that failed, the merged files removed their own
+            for part in (part for path_parts in parts.values() for _, part in path_parts):
+                if os.path.exists(part):
+                    os.remove(part)
+        # The flatten functions counted the rows in the worker processes
+        for path, count in rows.items():
+            METRICS.inc('rows_processed_total', count, step='flatten', dataset=REPORTS[report_of(path)][2])
+
+    for path, count in rows.items():
+        print(f"{path}: {count} rows flattened" if count else f"{path}: already flattened, skipped")
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split the nested fields of the saved Excel reports into columns.")
+    parser.add_argument("inputs", nargs="*", default=list(DEFAULT_INPUTS),
+                        help="Report files, directories or glob patterns (default: the reports of main.py)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per chunk")
+    args = parser.parse_args()
+    process_files(args.inputs, args.workers, args.chunk_size)
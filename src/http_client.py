@@ -0,0 +1,222 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains the ApiClient used by data_fetcher to talk to the store API.
+
+The client keeps one pooled requests.Session, so connections are reused (keep-alive)
+instead of opening a new TCP/TLS connection per request. Every request goes through
+a pacer (see pacing.py) and is retried a bounded number of times with jittered
+exponential backoff. Requests that still fail are recorded in `failures` instead
+of being dropped silently; get_json(raise_errors=True) raises the failure of the call
+as a FetchError. With a ResponseCache (see response_cache.py) attached,
+get_json() serves fresh responses from the cache and revalidates stale ones. The cache is
+keyed by the full URL, so clients of different hosts can share one cache file, and a body
+is only cached once it decoded successfully.
+
+Every request, retry, failure and cache lookup is counted in the run metrics (see metrics.py).
+"""
+
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from pacing import TokenBucket
+from metrics import METRICS, endpoint_of
+
+# Constants
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # Seconds, doubled after every failed attempt
+BACKOFF_MAX = 30
+POOL_SIZE = 32
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """
+    Raised by get_json(raise_errors=True) when a request failed.
+
+    Args:
+        failure (dict): The recorded failure: path, status (None without a response) and reason.
+    """
+
+    def __init__(self, failure):
+        super().__init__(f"GET {failure['path']} failed. Status code: {failure['status']} ({failure['reason']})")
+        self.failure = failure
+        self.status = failure['status']
+
+
+class ApiClient:
+    """
+    Pooled HTTP client for a JSON API with pacing and bounded retries.
+
+    Args:
+        base_url (str): Root URL of the API, paths are appended to it.
+        pacer: The pacing component every request goes through (see pacing.py).
+               Defaults to no pacing.
+        max_retries (int): How many times a failed request is retried.
+        pool_size (int): Maximum number of pooled connections to the API host.
+        timeout (float): Timeout of a single request in seconds.
+        cache (ResponseCache): Optional response cache used by get_json().
+    """
+
+    def __init__(self, base_url, pacer=None, max_retries=MAX_RETRIES, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT,
+                 cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.pacer = pacer if pacer is not None else TokenBucket(None)
+        self.cache = cache
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.retries = 0
+        self.failures = []
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, path, headers=None):
+        """
+        Sends a paced GET request, retrying connection errors and retryable status codes.
+
+        Args:
+            path (str): Path of the resource, e.g. '/users/1', or an absolute URL.
+            headers (dict): Extra request headers.
+
+        Returns:
+            - The last response received
+
+        Raises:
+            requests.RequestException: If the request could not be sent after all retries.
+        """
+        url = self.url_of(path)
+        endpoint = endpoint_of(path)
+        for attempt in range(self.max_retries + 1):
+            self.pacer.acquire()
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException:
+                self.pacer.record(599, time.monotonic() - start)
+                METRICS.inc('http_requests_total', endpoint=endpoint, status='error')
+                if attempt == self.max_retries:
+                    raise
+            else:
+                latency = time.monotonic() - start
+                self.pacer.record(response.status_code, latency, response.headers.get('Retry-After'))
+                METRICS.inc('http_requests_total', endpoint=endpoint, status=str(response.status_code))
+                METRICS.observe('http_request_duration_seconds', latency, endpoint=endpoint)
+                METRICS.inc('http_response_bytes_total', len(response.content), endpoint=endpoint)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+            with self._lock:
+                self.retries += 1
+            METRICS.inc('http_retries_total', endpoint=endpoint)
+            time.sleep(self._backoff(attempt))
+
+    def url_of(self, path):
+        """
+        Returns the full URL of a path below the base URL; absolute URLs are returned unchanged.
+        """
+        return path if path.startswith(('http://', 'https://')) else f'{self.base_url}{path}'
+
+    def path_of(self, url):
+        """
+        Returns the path of a URL below the base URL, e.g. '/products/1' for f'{base_url}/products/1'.
+
+        Paths are returned unchanged, URLs of other hosts as their path.
+        """
+        if url == self.base_url or url.startswith(self.base_url + '/'):
+            return url[len(self.base_url):] or '/'
+        return urlsplit(url).path if url.startswith(('http://', 'https://')) else url
+
+    def get_json(self, path, decoder=None, raise_errors=False):
+        """
+        Fetches a resource and decodes its JSON body.
+
+        If a cache is attached, a fresh cached body is returned without a request and
+        a stale one is revalidated with a conditional request.
+
+        Args:
+            path (str): Path below the base URL, or an absolute URL.
+            decoder (callable): Decodes the raw body (bytes), e.g. a typed model decoder.
+                A ValueError raised by it is recorded as a failure. Defaults to json.loads.
+            raise_errors (bool): Raise the failure of this call instead of returning None.
+
+        Returns:
+            - The decoded body, or None if the request failed (the failure is recorded in `failures`)
+
+        Raises:
+            FetchError: If the request failed and raise_errors is True.
+        """
+        try:
+            return self._get_json(path, decoder)
+        except FetchError:
+            if raise_errors:
+                raise
+            return None
+
+    def _get_json(self, path, decoder):
+        key = self.url_of(path)
+        entry = self.cache.lookup(key, self.path_of(key)) if self.cache is not None else None
+        if entry is not None and entry.fresh:
+            METRICS.inc('cache_lookups_total', result='hit')
+            return self._decode(path, 200, entry.body, decoder)
+        if self.cache is not None:
+            METRICS.inc('cache_lookups_total', result='miss')
+
+        try:
+            response = self.get(path, headers=entry.validators() if entry is not None else None)
+        except requests.RequestException as error:
+            raise FetchError(self.record_failure(path, None, str(error))) from error
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.mark_revalidated(key)
+            METRICS.inc('cache_lookups_total', result='revalidated')
+            return self._decode(path, 200, entry.body, decoder)
+        if response.status_code != 200:
+            raise FetchError(self.record_failure(path, response.status_code, response.reason))
+        result = self._decode(path, response.status_code, response.content, decoder)
+        if self.cache is not None:  # A malformed body raised in _decode() and is not cached
+            self.cache.store(key, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return result
+
+    def _decode(self, path, status_code, body, decoder):
+        try:
+            return (decoder or json.loads)(body)
+        except ValueError as error:
+            raise FetchError(self.record_failure(path, status_code, f"Malformed response: {error}")) from error
+
+    def record_failure(self, path, status_code, reason):
+        """
+        Records a request that could not be completed, so the caller can report or retry it.
+
+        Returns:
+            - The recorded failure
+        """
+        failure = {"path": path, "status": status_code, "reason": reason}
+        with self._lock:
+            self.failures.append(failure)
+        METRICS.inc('http_failures_total', endpoint=endpoint_of(path))
+        return failure
+
+    @staticmethod
+    def _backoff(attempt):
+        """
+        Exponential backoff with full jitter, so retrying clients do not hit the API in lockstep.
+        """
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
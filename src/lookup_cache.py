@@ -0,0 +1,138 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains an in-process memo for ID-keyed lookups, used by data_fetcher
+for the /users/{id} and /products/{id} requests.
+
+- Coalescing: while a lookup of a key is in flight, other threads asking for the same key
+  wait for its result instead of sending their own request.
+- Memoization: successful results are kept in memory for `ttl` seconds, so a long-lived
+  process (a scheduler, a notebook) does not fetch the same ID again on every run.
+  The memo is bounded to `max_entries` and evicts the least recently used entry first.
+- Failed lookups (None) are not kept, the next lookup of the key tries again.
+- discard() drops the kept result of a key, for callers that know it may have changed
+  (e.g. the checkpointed fetchers of data_fetcher, which only fetch what they need fresh).
+
+The lookups (hit, miss or coalesced) and the evictions are counted in the run metrics.
+
+Unlike the ResponseCache of response_cache.py, which persists response bytes and
+revalidates them over HTTP, this memo lives only as long as the process and returns the
+decoded records themselves. The records are shared, so callers must not modify them.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from metrics import METRICS
+
+# Constants
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL = 600  # Seconds
+
+
+class LookupCache:
+    """
+    Thread-safe LRU memo with a TTL that coalesces concurrent lookups of the same key.
+
+    Args:
+        max_entries (int): Maximum number of results kept, 0 to only coalesce.
+        ttl (float): Seconds a result is served from memory.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (stored at, result), least recently used first
+        self._in_flight = {}  # key -> Future of the lookup that is loading it
+        self._lock = threading.Lock()
+
+    def get(self, key, load):
+        """
+        Returns the result for `key`: from memory, from the lookup of the key that is
+        already in flight, or by calling `load()`.
+
+        Args:
+            key: Hashable key of the lookup, e.g. (base URL, path).
+            load (callable): Loads the result, returns None if the lookup failed.
+
+        Returns:
+            - The result of the lookup, None if it failed
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    METRICS.inc('id_lookups_total', result='hit')
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        METRICS.inc('id_lookups_total', result='miss' if leader else 'coalesced')
+        if not leader:
+            return future.result()
+
+        try:
+            result = load()
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(error)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if result is not None and self.max_entries > 0:
+                self._entries[key] = (time.monotonic(), result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+                    METRICS.inc('id_lookup_evictions_total')
+        future.set_result(result)
+        return result
+
+    def discard(self, key):
+        """
+        Drops the kept result of `key`, so the next lookup loads it again. A lookup in flight is not affected.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Drops every kept result, lookups in flight are not affected.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns the hit, miss, coalesced, eviction and expiration counters, the number of
+        kept results and the hit ratio: the share of lookups served without a request of their own.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'hit_ratio': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
@@ -6,23 +6,226 @@ Description: This script orchestrates the fetching of store clients, user carts,
 then saves the combined data into Excel files. It coordinates tasks by calling functions from data_fetcher and save_data modules.
 
 Tasks:
-- Task 1: Fetch store clients using Selenium.
+- Task 1: Fetch store clients over plain HTTP, or with Selenium when the page needs a browser.
 - Task 2: Fetch all carts for users via API.
 - Task 3: Fetch additional data for each user.
 - Task 4: Fetch product details for products in the carts.
-- Task 5: Save combined user data to an Excel file.
-- Task 6: Save product data to an Excel file.
+- Task 5: Save combined user data to an Excel file (and/or Parquet and Arrow files).
+- Task 6: Save product data to an Excel file (and/or Parquet and Arrow files).
+- Task 7: Save the basket size of every user and the sales of every day.
 """
 
 
-from data_fetcher import fetch_store_clients, fetch_user_carts, fetch_user_details, fetch_product_details
-from save_data import save_user_data_to_excel, save_product_data_to_excel
-import time
+from data_fetcher import (fetch_store_clients_lightweight, fetch_user_carts, fetch_user_carts_checkpointed,
+                          fetch_user_details_checkpointed, fetch_product_details_checkpointed,
+                          iter_user_details, iter_product_details, API_CLIENT, API_PACER, LOOKUP_CACHE,
+                          STORE_CLIENTS_URL)
+from save_data import (save_user_data_to_excel, save_product_data_to_excel, save_cart_metrics,
+                       OUTPUT_FORMATS, DEFAULT_FORMATS)
+from cart_metrics import cart_lines
+from models import Client, clients_from_rows
+from response_cache import ResponseCache, DEFAULT_CACHE_PATH
+from pipeline import DagRunner, Stage
+from sinks import (CsvSink, JsonLinesSink, iter_csv_rows, iter_json_lines, DEFAULT_CHUNK_SIZE,
+                   DEFAULT_COMPRESSION, PARQUET_COMPRESSIONS)
+from checkpoint import CheckpointStore, RunLockedError, DEFAULT_CHECKPOINT_PATH
+from table_snapshot import TableSnapshot
+from analytics_store import AnalyticsStore, BACKENDS
+from final_data_filtering import flatten_user_frame, flatten_product_frame
+from metrics import METRICS
+import argparse
+import os
 
-# Constants
-WAIT_TIME = 3
+def build_stages(checkpoint, incremental=False, formats=DEFAULT_FORMATS, compression=DEFAULT_COMPRESSION, flatten=False,
+                 approximate_distinct=False, store_path=None, store_backend='sqlite', typed=False,
+                 clients_url=STORE_CLIENTS_URL):
+    """
+    Builds the stages of the default mode: the seven tasks and the tasks whose results they need.
+    Tasks 5 to 7 write every output format in `formats` (see save_data.save_frame()), with
+    the nested fields split into columns if `flatten` is set. The carts are exploded into
+    cart lines once and shared by tasks 6 and 7.
+
+    With `store_path`, the fetched data is loaded into an analytical store (see analytics_store.py)
+    and tasks 5 and 6 export its report views instead of merging DataFrames in memory.
+
+    With `typed`, the clients, carts, users and products are kept as the typed records of
+    models.py, which are validated when they are decoded and need less memory than dicts.
+
+    The client table is scraped from `clients_url`.
+
+    Carts, users and products are stored in the checkpoint store as soon as they arrive,
+    so a crashed run resumes where it stopped. In incremental mode only users and
+    products that are new since the last successful run are fetched, and the users of
+    the clients whose row changed in the client table since then.
+
+    The pages of the client table are compared with the last successful scrape (see
+    table_snapshot.py): the pages that did not change are not extracted again.
+    """
+    snapshot = TableSnapshot(checkpoint, clients_url)
+
+    # Task 1: Fetch store clients
+    def scrape():
+        client_headers, store_clients, scrape_path = fetch_store_clients_lightweight(clients_url, snapshot=snapshot)
+        if typed:
+            store_clients = clients_from_rows(client_headers, store_clients)
+            client_headers = list(Client.HEADERS)
+        diff = snapshot.diff()
+        print(f"Task 1 complited ({scrape_path}), Found {len(store_clients)} clients "
+              f"({len(diff['added'])} added, {len(diff['changed'])} changed, {len(diff['removed'])} removed, "
+              f"{snapshot.skipped} unchanged pages skipped)")
+        return client_headers, store_clients
+
+    # Task 2: Fetch all carts for users
+    def carts():
+        cart_headers, user_carts = fetch_user_carts_checkpointed(checkpoint, typed=typed)
+        print(f"Task 2 complited, Found {len(user_carts)} carts")
+        return cart_headers, user_carts
+
+    # Task 3: Fetch extra data for each user
+    def users(clients):
+        _, store_clients = clients
+        user_headers, user_details = fetch_user_details_checkpointed(store_clients, checkpoint, incremental, typed=typed,
+                                                                     refetch=snapshot.changed_ids())
+        print(f"Task 3 complited, Found {len(user_details)} users")
+        return user_headers, user_details
+
+    # Task 4: Fetch product details for products in carts
+    def products(carts):
+        _, user_carts = carts
+        product_headers, product_details = fetch_product_details_checkpointed(user_carts, checkpoint, incremental, typed=typed)
+        print(f"Task 4 complited, Found {len(product_details)} products")
+        return product_headers, product_details
+
+    # Task 5: Save user data to Excel
+    def save_users(clients, carts, users):
+        client_headers, store_clients = clients
+        cart_headers, user_carts = carts
+        user_headers, user_details = users
+        save_user_data_to_excel(store_clients, client_headers, user_carts, cart_headers, user_details, user_headers,
+                                formats=formats, compression=compression, flatten=flatten)
+
+    # One row per cart line, for the metrics of tasks 6 and 7
+    def lines(carts):
+        _, user_carts = carts
+        return cart_lines(user_carts)
+
+    # Task 6: Save product data to Excel
+    def save_products(carts, products, lines):
+        _, user_carts = carts
+        product_headers, product_details = products
+        save_product_data_to_excel(user_carts, product_details, product_headers,
+                                   formats=formats, compression=compression, flatten=flatten,
+                                   lines=lines, approximate_distinct=approximate_distinct)
+
+    # Task 7: Save basket sizes and daily sales
+    def save_metrics(carts, products, lines):
+        _, user_carts = carts
+        product_headers, product_details = products
+        save_cart_metrics(user_carts, product_details, product_headers,
+                          formats=formats, compression=compression, lines=lines)
+
+    # Load everything into the analytical store
+    def store(clients, carts, users, products):
+        analytics = AnalyticsStore(store_path, store_backend)
+        analytics.load_clients(*clients)
+        analytics.load_carts(carts[1])
+        analytics.load_users(*users)
+        analytics.load_products(*products)
+        analytics.create_views()
+        print(f"Data loaded into the {store_backend} store {store_path}")
+        return analytics
+
+    # Tasks 5 and 6 from the report views of the store
+    def save_reports(analytics):
+        for view, flatten_frame in (("combined_user_data", flatten_user_frame), ("product_data", flatten_product_frame)):
+            paths = analytics.export_view(view, formats, compression=compression,
+                                          transform=flatten_frame if flatten else None)
+            print(f"{view} saved to: " + ", ".join(paths))
+        analytics.close()
+
+    stages = [
+        Stage("scrape", scrape),
+        Stage("carts", carts),
+        Stage("users", users, deps=["scrape"]),
+        Stage("products", products, deps=["carts"]),
+        Stage("lines", lines, deps=["carts"]),
+        Stage("save_metrics", save_metrics, deps=["carts", "products", "lines"]),
+    ]
+    if store_path:
+        stages += [
+            Stage("store", store, deps=["scrape", "carts", "users", "products"]),
+            Stage("save_reports", save_reports, deps=["store"]),
+        ]
+    else:
+        stages += [
+            Stage("save_users", save_users, deps=["scrape", "carts", "users"]),
+            Stage("save_products", save_products, deps=["carts", "products", "lines"]),
+        ]
+    return stages
+
+def streaming_stages(output_dir, chunk_size=DEFAULT_CHUNK_SIZE, clients_url=STORE_CLIENTS_URL):
+    """
+    Builds the stages of the streaming mode.
 
-def main():
+    Instead of keeping every dataset in memory, each stage writes its records to a
+    file in `output_dir` in chunks of `chunk_size` and the next stage reads that file
+    back lazily. The user and product details are written while they are fetched.
+
+    Files: clients.csv, carts.jsonl, users.jsonl, products.jsonl
+    """
+    clients_path = os.path.join(output_dir, "clients.csv")
+    carts_path = os.path.join(output_dir, "carts.jsonl")
+    users_path = os.path.join(output_dir, "users.jsonl")
+    products_path = os.path.join(output_dir, "products.jsonl")
+
+    def scrape():
+        client_headers, store_clients, scrape_path = fetch_store_clients_lightweight(clients_url)
+        with CsvSink(clients_path, client_headers, chunk_size) as sink:
+            sink.write_all(store_clients)
+        print(f"Task 1 complited ({scrape_path}), {sink.rows_written} clients written to {clients_path}")
+
+    def carts():
+        _, user_carts = fetch_user_carts()
+        with JsonLinesSink(carts_path, chunk_size) as sink:
+            sink.write_all(user_carts)
+        print(f"Task 2 complited, {sink.rows_written} carts written to {carts_path}")
+
+    def users(_):
+        _, client_rows = iter_csv_rows(clients_path)
+        with JsonLinesSink(users_path, chunk_size) as sink:
+            sink.write_all(iter_user_details(client_rows))
+        print(f"Task 3 complited, {sink.rows_written} users written to {users_path}")
+
+    def products(_):
+        with JsonLinesSink(products_path, chunk_size) as sink:
+            sink.write_all(iter_product_details(iter_json_lines(carts_path)))
+        print(f"Task 4 complited, {sink.rows_written} products written to {products_path}")
+
+    return [
+        Stage("scrape", scrape),
+        Stage("carts", carts),
+        Stage("users", users, deps=["scrape"]),
+        Stage("products", products, deps=["carts"]),
+    ]
+
+def _run_with_metrics(runner, metrics_dir=None):
+    """
+    Runs the stages and, with `metrics_dir`, writes the run metrics with the wall time
+    of every stage that ran, whether the run succeeded or not.
+    """
+    try:
+        runner.run()
+    finally:
+        if metrics_dir:
+            for name, timing in runner.timings.items():
+                METRICS.set('stage_duration_seconds', round(timing.duration, 4), stage=name)
+            paths = METRICS.write(metrics_dir)
+            print("Metrics written to: " + ", ".join(paths))
+
+def main(stream_dir=None, chunk_size=DEFAULT_CHUNK_SIZE, incremental=False, checkpoint_path=DEFAULT_CHECKPOINT_PATH,
+         formats=DEFAULT_FORMATS, compression=DEFAULT_COMPRESSION, flatten=False, approximate_distinct=False,
+         store_path=None, store_backend='sqlite', typed=False, api_url=None, clients_url=STORE_CLIENTS_URL,
+         metrics_dir=None, cache_path=DEFAULT_CACHE_PATH):
     """
     Main function to orchestrate the data fetching and saving process.
 
@@ -33,38 +236,117 @@ def main():
     - Fetches product details based on user carts.
     - Saves the aggregated user data into an Excel file.
     - Saves product data into another Excel file.
-    """
-    # Task 1: Fetch store clients
-    client_headers, store_clients = fetch_store_clients()
-    print("Task 1 complited, Found data: ", store_clients)
-    time.sleep(WAIT_TIME)
+    - Saves the basket sizes of the users and the daily sales.
 
-    # Task 2: Fetch all carts for users
-    cart_headers, user_carts = fetch_user_carts()
-    print("")
-    print("Task 2 complited, Found data: ", user_carts)
-    time.sleep(WAIT_TIME)
+    The tasks run as a dependency graph (see pipeline.py): every task starts as soon
+    as the tasks it needs are done, so the scrape and the carts run in parallel and
+    the product details start while the users are still being fetched.
 
-    # Task 3: Fetch extra data for each user
-    user_headers, user_details = fetch_user_details(store_clients)
-    print("")
-    print("Task 3 complited, Found data: ", user_details)
-    time.sleep(WAIT_TIME)
+    The API responses are kept in a persistent response cache, so warm runs only
+    send requests for data that expired or changed. The fetched records are kept in a
+    checkpoint store: if a run dies, the next run resumes it and only fetches what is missing.
+    A run that another live process is still running is not resumed (RunLockedError).
 
-    # Task 4: Fetch product details for products in carts
-    product_headers, product_details = fetch_product_details(user_carts)
-    print("")
-    print("Task 4 complited, Found data: ", product_details)
-    time.sleep(WAIT_TIME)
+    Args:
+        stream_dir (str): If given, the fetched records are streamed to files in this
+            directory instead of being combined into the Excel files (see streaming_stages()).
+        chunk_size (int): Records written per chunk in the streaming mode.
+        incremental (bool): Only fetch users and products that are new since the last
+            successful run, reuse the stored records for the others.
+        checkpoint_path (str): Path of the checkpoint store, None to keep the records of this run
+            in memory only (nothing is resumed or reused).
+        formats (tuple): Output formats of tasks 5 to 7: 'xlsx', 'parquet' and/or 'arrow'.
+        compression (str): Compression of the Parquet and Arrow files.
+        flatten (bool): Split address, name and rating into columns before saving, so
+            final_data_filtering.py does not have to re-read the files.
+        approximate_distinct (bool): Estimate the unique users of every product with HyperLogLog.
+        store_path (str): Build the user and product reports in an analytical store at this path.
+        store_backend (str): 'sqlite' or 'duckdb'.
+        typed (bool): Keep the fetched data as typed records (see models.py).
+        api_url (str): Root URL of the store API, defaults to the Fake Store API. Used to run
+            against the local server of tests/fake_server.py.
+        clients_url (str): The page with the client table.
+        metrics_dir (str): Collect the run metrics (see metrics.py) and write them to this
+            directory as a Prometheus textfile and a JSON run summary, also when the run fails.
+        cache_path (str): Path of the response cache, None to send every request.
 
-    # Task 5: Save user data to Excel
-    save_user_data_to_excel(store_clients, client_headers, user_carts, cart_headers, user_details, user_headers)
+    Returns:
+        - The DagRunner of the run, with the timings and results of every stage
 
-    # Task 6: Save product data to Excel
-    save_product_data_to_excel(user_carts, product_details, product_headers)
+    Raises:
+        RunLockedError: If another process is running on the checkpoint store.
+    """
+    if incremental and checkpoint_path is None:
+        raise ValueError("An incremental run needs the checkpoint store of the previous runs")
+    if api_url:
+        API_CLIENT.base_url = api_url.rstrip('/')
+    API_CLIENT.cache = ResponseCache(cache_path) if cache_path else None
+    if metrics_dir:
+        METRICS.enable()
 
-    print("Data gathering and processing complete. Files saved as 'combined_user_data.xlsx' and 'product_data.xlsx'.")
+    if stream_dir:
+        os.makedirs(stream_dir, exist_ok=True)
+        runner = DagRunner(streaming_stages(stream_dir, chunk_size, clients_url))
+        _run_with_metrics(runner, metrics_dir)
+    else:
+        checkpoint = CheckpointStore(checkpoint_path or ':memory:')
+        run_id = checkpoint.start_run()
+        print(f"{'Resuming' if checkpoint.resumed else 'Starting'} run {run_id}{' (incremental)' if incremental else ''}")
+        runner = DagRunner(build_stages(checkpoint, incremental, formats, compression, flatten, approximate_distinct,
+                                        store_path, store_backend, typed, clients_url))
+        try:
+            _run_with_metrics(runner, metrics_dir)  # If the run dies, it stays open and the next run resumes it
+        finally:
+            checkpoint.flush()
+        checkpoint.finish_run()
+        print("Checkpoint: ", checkpoint.stats())
+        checkpoint.close()
 
-if __name__ == "__main__":
-    main()
+    # Stage timings and the pacing the API requests settled on
+    print("")
+    print(runner.report())
+    print("API pacing: ", API_PACER.stats())
+    if API_CLIENT.cache is not None:
+        print("Response cache: ", API_CLIENT.cache.stats())
+    print("ID lookups: ", LOOKUP_CACHE.stats())
+    if API_CLIENT.failures:
+        print(f"{len(API_CLIENT.failures)} requests failed after {API_CLIENT.retries} retries: ", API_CLIENT.failures)
+
+    if stream_dir:
+        print(f"Data gathering complete. Files saved in '{stream_dir}'.")
+    else:
+        print(f"Data gathering and processing complete. 'combined_user_data', 'product_data', 'user_basket_sizes' and 'daily_sales' saved as {', '.join(formats)}.")
+    return runner
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch the store data and save it to Excel files.")
+    parser.add_argument("--stream", metavar="DIR", help="Stream the fetched records to CSV/JSON Lines files in DIR")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records written per chunk when streaming")
+    parser.add_argument("--incremental", action="store_true", help="Only fetch users and products that are new since the last successful run")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="Path of the checkpoint store")
+    parser.add_argument("--no-checkpoint", action="store_true", help="Do not store the fetched records, nothing is resumed")
+    parser.add_argument("--no-cache", action="store_true", help="Do not keep the API responses in http_cache.sqlite")
+    parser.add_argument("--formats", nargs="+", choices=OUTPUT_FORMATS, default=list(DEFAULT_FORMATS),
+                        help="Output formats of the combined user data and the product data")
+    parser.add_argument("--compression", choices=PARQUET_COMPRESSIONS, default=DEFAULT_COMPRESSION,
+                        help="Compression of the Parquet and Arrow files")
+    parser.add_argument("--flatten", action="store_true", help="Split address, name and rating into columns before saving")
+    parser.add_argument("--store", metavar="PATH", help="Build the reports in an analytical database at PATH")
+    parser.add_argument("--store-backend", choices=BACKENDS, default="sqlite", help="Database of --store")
+    parser.add_argument("--typed", action="store_true", help="Decode the fetched data into typed, validated records")
+    parser.add_argument("--api-url", help="Root URL of the store API, e.g. the local server of tests/fake_server.py")
+    parser.add_argument("--clients-url", default=STORE_CLIENTS_URL, help="The page with the client table")
+    parser.add_argument("--metrics", metavar="DIR", help="Write the run metrics to DIR (Prometheus textfile and JSON)")
+    parser.add_argument("--approx-distinct", action="store_true", help="Estimate the unique users of every product (for very large inputs)")
+    args = parser.parse_args()
+    if args.incremental and args.no_checkpoint:
+        parser.error("--incremental needs the checkpoint store, it cannot be used with --no-checkpoint")
+    try:
+        main(stream_dir=args.stream, chunk_size=args.chunk_size, incremental=args.incremental,
+             checkpoint_path=None if args.no_checkpoint else args.checkpoint,
+             formats=tuple(args.formats), compression=args.compression, flatten=args.flatten,
+             approximate_distinct=args.approx_distinct, store_path=args.store, store_backend=args.store_backend,
+             typed=args.typed, api_url=args.api_url, clients_url=args.clients_url,
+             metrics_dir=args.metrics, cache_path=None if args.no_cache else DEFAULT_CACHE_PATH)
+    except RunLockedError as error:
+        parser.exit(1, f"{error}\n")
@@ -0,0 +1,275 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains the run metrics of the pipeline: counters, gauges and
+histograms with labels, collected by the HTTP client (requests, latency, bytes, retries,
+cache lookups), lookup_cache (ID lookups), data_fetcher (records fetched), save_data (rows written),
+final_data_filtering (rows flattened) and main.py (stage wall times).
+
+The metrics are collected in one process-wide registry, METRICS. It is disabled by
+default, so the instrumented code pays only one attribute check per call; main.py
+enables it with --metrics DIR and writes at the end of the run:
+- DIR/scrape_metrics.prom: the Prometheus text format, for the textfile collector of
+  the node exporter (the file is replaced atomically).
+- DIR/run_summary.json: the same values as a JSON run summary.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Constants
+METRIC_PREFIX = 'scrape_'
+PROMETHEUS_FILE = 'scrape_metrics.prom'
+SUMMARY_FILE = 'run_summary.json'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+# Help text and type of every metric, in the order they are exported
+DEFINITIONS = {
+    'run_start_timestamp_seconds': ('gauge', 'Unix time the run started.'),
+    'run_duration_seconds': ('gauge', 'Wall time of the run.'),
+    'stage_duration_seconds': ('gauge', 'Wall time of every pipeline stage.'),
+    'http_requests_total': ('counter', 'HTTP requests sent, by endpoint and status code.'),
+    'http_request_duration_seconds': ('histogram', 'Latency of the HTTP requests, by endpoint.'),
+    'http_response_bytes_total': ('counter', 'Bytes of the HTTP response bodies, by endpoint.'),
+    'http_retries_total': ('counter', 'Retried HTTP requests, by endpoint.'),
+    'http_failures_total': ('counter', 'HTTP requests that failed after all retries, by endpoint.'),
+    'cache_lookups_total': ('counter', 'Response cache lookups by result, a revalidated lookup is also a miss.'),
+    'id_lookups_total': ('counter', 'In-process ID lookups by result: hit, miss or coalesced into a request in flight.'),
+    'id_lookup_evictions_total': ('counter', 'ID lookup results evicted from the in-process memo.'),
+    'records_fetched_total': ('counter', 'Records fetched, by kind and source (api, checkpoint, html, feed, selenium).'),
+    'malformed_records_total': ('counter', 'Records of a list response skipped because they did not match their model, by kind.'),
+    'table_pages_total': ('counter', 'Pages of the client table by result: extracted, or skipped because they did not change.'),
+    'rows_processed_total': ('counter', 'Rows written or transformed, by step and dataset.'),
+    'peak_rss_bytes': ('gauge', 'Peak resident memory of the process.'),
+}
+
+
+def endpoint_of(path):
+    """
+    Returns the endpoint label of a request path or URL: the path without the query and
+    with the numeric IDs replaced, e.g. '/users/7' -> '/users/{id}'.
+    """
+    path = re.sub(r'^https?://[^/]+', '', path).split('?')[0] or '/'
+    return _ID_SEGMENT.sub('/{id}', path)
+
+
+def peak_rss_bytes():
+    """
+    Returns the peak resident memory of the process in bytes, or None if it cannot be read.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024  # kB on Linux, bytes on macOS
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """
+    Thread-safe registry of labelled counters, gauges and histograms.
+
+    While the registry is disabled every call returns immediately.
+
+    Args:
+        enabled (bool): Collect the metrics.
+        buckets (tuple): Upper bounds of the histogram buckets, in seconds.
+    """
+
+    def __init__(self, enabled=False, buckets=LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self._values = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> _Histogram
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """
+        Starts collecting, from a clean registry.
+        """
+        with self._lock:
+            self._values.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+            self.enabled = True
+
+    def inc(self, name, value=1, **labels):
+        """
+        Adds `value` to a counter.
+        """
+        if not self.enabled:
+            return
+        key = (name, _key(labels))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """
+        Sets a gauge.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._values[(name, _key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        """
+        Adds one observation (e.g. a latency in seconds) to a histogram.
+        """
+        if not self.enabled:
+            return
+        key = (name, _key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram.counts[index] += 1
+                    break
+            histogram.sum += value
+            histogram.count += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Sets the gauge `name` to the seconds the with block took.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.set(name, time.perf_counter() - start, **labels)
+
+    def value(self, name, **labels):
+        """
+        Returns the value of a counter or gauge, 0 if it was never set.
+        """
+        with self._lock:
+            return self._values.get((name, _key(labels)), 0)
+
+    def _finish(self):
+        self.set('run_start_timestamp_seconds', round(self.started_at, 3))
+        self.set('run_duration_seconds', round(time.time() - self.started_at, 3))
+        rss = peak_rss_bytes()
+        if rss is not None:
+            self.set('peak_rss_bytes', rss)
+
+    def to_prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        self._finish()
+        with self._lock:
+            values = dict(self._values)
+            histograms = dict(self._histograms)
+
+        lines = []
+        names = list(DEFINITIONS) + sorted({name for name, _ in list(values) + list(histograms)} - set(DEFINITIONS))
+        for name in names:
+            kind, text = DEFINITIONS.get(name, ('untyped', name))
+            samples = sorted((labels, value) for (metric, labels), value in values.items() if metric == name)
+            series = sorted((labels, histogram) for (metric, labels), histogram in histograms.items() if metric == name)
+            if not samples and not series:
+                continue
+            full_name = METRIC_PREFIX + name
+            lines.append(f"# HELP {full_name} {text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+            for labels, histogram in series:
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        Returns the metrics as a JSON-serializable run summary: every metric maps to a
+        list of {labels, value} entries, histograms to {labels, count, sum, buckets}.
+        """
+        self._finish()
+        with self._lock:
+            values = dict(self._values)
+            histograms = dict(self._histograms)
+
+        metrics = {}
+        for (name, labels), value in sorted(values.items()):
+            metrics.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        for (name, labels), histogram in sorted(histograms.items(), key=lambda item: item[0]):
+            metrics.setdefault(name, []).append({
+                'labels': dict(labels),
+                'count': histogram.count,
+                'sum': round(histogram.sum, 6),
+                'buckets': dict(zip([str(bound) for bound in self.buckets], histogram.counts)),
+            })
+        return {'started_at': round(self.started_at, 3), 'metrics': metrics}
+
+    def write(self, directory):
+        """
+        Writes the Prometheus textfile and the JSON run summary to `directory`.
+
+        Returns:
+            - The paths of the two files
+        """
+        os.makedirs(directory, exist_ok=True)
+        prometheus_path = os.path.join(directory, PROMETHEUS_FILE)
+        summary_path = os.path.join(directory, SUMMARY_FILE)
+        _write_atomic(prometheus_path, self.to_prometheus())
+        _write_atomic(summary_path, json.dumps(self.summary(), indent=2))
+        return prometheus_path, summary_path
+
+
+def _key(labels):
+    """
+    Label values are exported as strings, so they are stored as strings.
+    """
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _write_atomic(path, text):
+    """
+    Writes a file through a temporary file, so a scraper never reads a half written file.
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+
+# Registry used by the whole pipeline, enabled by main.py --metrics
+METRICS = Metrics()
@@ -0,0 +1,362 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains typed record models for the store data: Client, User,
+Cart / CartLine and Product, with their nested parts (Address, Geolocation, Name, Rating).
+
+The models use __slots__, so a record needs much less memory than a dict of dicts, and
+they are decoded directly from the response bytes with a fixed schema (decode()). The
+bytes are parsed with orjson when it is installed (json otherwise), and the type checks
+of every field are resolved once per model. Validating every field still costs time:
+decoding records is slower than parsing the JSON alone. A record with a missing or
+wrongly typed field raises RecordError when it is decoded, not later when it is saved;
+in a list of records only the malformed records are skipped (and counted in the run
+metrics). HEADERS gives a stable column order that does not depend on the first record.
+
+For the code that reads the API dicts, records support record['field'], record.get()
+and record[0] (the first field), and to_dict() returns the API structure again.
+to_frame() converts records to a DataFrame with downcast integer and categorical columns
+(pandas is only imported there).
+"""
+
+import json
+from metrics import METRICS
+
+try:
+    from orjson import loads as json_loads  # About twice as fast as the json module
+except ImportError:
+    json_loads = json.loads
+
+# Constants
+CURRENCY_SYMBOLS = '$€£'  # Removed from the number cells of the client table, e.g. '$2,340.50'
+
+
+class RecordError(ValueError):
+    """
+    Raised when a record does not match the schema of its model.
+    """
+
+
+class Field:
+    """
+    One field of a model.
+
+    Args:
+        name (str): Attribute name.
+        key (str): Key in the JSON record, defaults to the name.
+        kind: int, float, str, a Record subclass, or a list [Record subclass] for a list of records.
+        required (bool): If False, a missing key becomes None.
+        category (bool): Stored as a pandas categorical column by to_frame().
+    """
+    __slots__ = ('name', 'key', 'kind', 'required', 'category')
+
+    def __init__(self, name, kind, key=None, required=True, category=False):
+        self.name = name
+        self.key = key or name
+        self.kind = kind
+        self.required = required
+        self.category = category
+
+
+def _converter(model, field):
+    """
+    Returns the function that converts a JSON value to the type of a field, or raises RecordError.
+
+    The type checks of a field are resolved once per model instead of for every value.
+    """
+    kind = field.kind
+    where = f"{model.__name__}.{field.key}"
+
+    def missing():
+        if field.required:
+            raise RecordError(f"{where} is missing")
+        return None
+
+    def wrong(value, expected):
+        return RecordError(f"{where} must be {expected}, got {type(value).__name__}")
+
+    if isinstance(kind, list):
+        item_from_dict = kind[0].from_dict
+
+        def convert(value):
+            if type(value) is list:
+                return tuple(map(item_from_dict, value))
+            if value is None:
+                return missing()
+            raise wrong(value, 'a list')
+    elif isinstance(kind, type) and issubclass(kind, Record):
+        record_from_dict = kind.from_dict
+
+        def convert(value):
+            return missing() if value is None else record_from_dict(value)
+    elif kind is float:
+        def convert(value):
+            value_type = type(value)
+            if value_type is float:
+                return value
+            if value_type is int:
+                return float(value)
+            if value is None:
+                return missing()
+            raise wrong(value, 'float')
+    else:
+        def convert(value):
+            if type(value) is kind:
+                return value
+            if value is None:
+                return missing()
+            raise wrong(value, kind.__name__)
+    return convert
+
+
+class Record:
+    """
+    Base class of the models. Subclasses define FIELDS and matching __slots__.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.FIELDS, values):
+            setattr(self, field.name, value)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.HEADERS = [field.key for field in cls.FIELDS]
+        cls._BY_KEY = {field.key: field for field in cls.FIELDS}
+        # (attribute, JSON key, converter) of every field, see from_dict()
+        cls._DECODERS = tuple((field.name, field.key, _converter(cls, field)) for field in cls.FIELDS)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a record from a decoded JSON object.
+
+        Raises:
+            RecordError: If the object does not match the schema.
+        """
+        if type(data) is not dict:
+            raise RecordError(f"{cls.__name__} must be an object, got {type(data).__name__}")
+        record = cls.__new__(cls)
+        get = data.get
+        for name, key, convert in cls._DECODERS:
+            setattr(record, name, convert(get(key)))
+        return record
+
+    def to_dict(self):
+        """
+        Returns the record in the structure of the API.
+        """
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field.name)
+            if isinstance(value, Record):
+                value = value.to_dict()
+            elif isinstance(value, tuple):
+                value = [item.to_dict() for item in value]
+            data[field.key] = value
+        return data
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return getattr(self, self.FIELDS[key].name)
+        try:
+            return getattr(self, self._BY_KEY[key].name)
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        field = self._BY_KEY.get(key)
+        return getattr(self, field.name) if field is not None else default
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, field.name) == getattr(other, field.name) for field in self.FIELDS
+        )
+
+    # Records are compared by value but can be changed, so they are not hashable (like dicts)
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f"{field.name}={getattr(self, field.name)!r}" for field in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+
+class Geolocation(Record):
+    __slots__ = ('lat', 'long')
+    FIELDS = (Field('lat', str), Field('long', str))
+
+
+class Address(Record):
+    __slots__ = ('geolocation', 'city', 'street', 'number', 'zipcode')
+    FIELDS = (Field('geolocation', Geolocation, required=False), Field('city', str), Field('street', str),
+              Field('number', int), Field('zipcode', str))
+
+
+class Name(Record):
+    __slots__ = ('firstname', 'lastname')
+    FIELDS = (Field('firstname', str), Field('lastname', str))
+
+
+class User(Record):
+    """
+    A user of the /users endpoint.
+    """
+    __slots__ = ('address', 'id', 'email', 'username', 'password', 'name', 'phone', 'v')
+    FIELDS = (Field('address', Address), Field('id', int), Field('email', str), Field('username', str),
+              Field('password', str), Field('name', Name), Field('phone', str), Field('v', int, key='__v', required=False))
+
+
+class Rating(Record):
+    __slots__ = ('rate', 'count')
+    FIELDS = (Field('rate', float), Field('count', int))
+
+
+class Product(Record):
+    """
+    A product of the /products endpoint.
+    """
+    __slots__ = ('id', 'title', 'price', 'description', 'category', 'image', 'rating')
+    FIELDS = (Field('id', int), Field('title', str), Field('price', float), Field('description', str),
+              Field('category', str, category=True), Field('image', str), Field('rating', Rating, required=False))
+
+
+class CartLine(Record):
+    __slots__ = ('productId', 'quantity')
+    FIELDS = (Field('productId', int), Field('quantity', int))
+
+
+class Cart(Record):
+    """
+    A cart of the /carts endpoint with its lines.
+    """
+    __slots__ = ('id', 'userId', 'date', 'products', 'v')
+    FIELDS = (Field('id', int), Field('userId', int), Field('date', str), Field('products', [CartLine]),
+              Field('v', int, key='__v', required=False))
+
+
+class Client(Record):
+    """
+    A row of the scraped client table. The cells are converted from text with from_row().
+    """
+    __slots__ = ('id', 'age', 'occupation', 'account_status', 'last_login', 'account_balance')
+    FIELDS = (Field('id', int, key='ID'), Field('age', int, key='Age'),
+              Field('occupation', str, key='Occupation', category=True),
+              Field('account_status', str, key='Account Status', category=True),
+              Field('last_login', str, key='Last Login'), Field('account_balance', float, key='Account Balance'))
+
+    @classmethod
+    def from_row(cls, row, headers=None):
+        """
+        Builds a client from the text cells of a table row.
+
+        Args:
+            row (list): The cells.
+            headers (list): The table headers, defaults to HEADERS.
+
+        Raises:
+            RecordError: If a column is missing or a number cannot be parsed.
+        """
+        cells = dict(zip(headers or cls.HEADERS, row))
+        values = []
+        for field in cls.FIELDS:
+            text = cells.get(field.key)
+            if text is None:
+                raise RecordError(f"Client.{field.key} is missing")
+            try:
+                values.append(field.kind(_number_text(text)) if field.kind is not str else text)
+            except ValueError:
+                raise RecordError(f"Client.{field.key} is not a valid {field.kind.__name__}: {text!r}") from None
+        return cls(*values)
+
+
+def _number_text(text):
+    """
+    Removes the currency symbol and the thousands separators of a number cell, e.g. '$2,340.50' -> '2340.50'.
+    """
+    text = text.strip().replace(',', '')
+    sign = ''
+    if text[:1] in ('-', '+'):
+        sign, text = text[0], text[1:]  # '-$5.00'
+    return sign + text.lstrip(CURRENCY_SYMBOLS).strip()
+
+
+def decode(model, payload):
+    """
+    Decodes a JSON response body into records of a model.
+
+    In a list, a record that does not match the schema is skipped and counted in
+    malformed_records_total, the other records are still returned.
+
+    Args:
+        model (type): A Record subclass.
+        payload (bytes or str): The response body, a JSON object or a list of objects.
+
+    Returns:
+        - A record, or a list of the valid records
+
+    Raises:
+        RecordError: If the body is not valid JSON, or a single record does not match the schema.
+    """
+    try:
+        data = json_loads(payload)
+    except ValueError as error:
+        raise RecordError(f"Invalid JSON for {model.__name__}: {error}") from error
+    if not isinstance(data, list):
+        return model.from_dict(data)
+
+    records = []
+    for item in data:
+        try:
+            records.append(model.from_dict(item))
+        except RecordError:
+            METRICS.inc('malformed_records_total', kind=model.__name__.lower())
+    return records
+
+
+def clients_from_rows(headers, rows):
+    """
+    Converts the scraped client rows into Client records.
+    """
+    return [Client.from_row(row, headers) for row in rows]
+
+
+def to_frame(records, model=None, downcast_floats=False):
+    """
+    Converts records into a DataFrame with the columns of model.HEADERS.
+
+    Integer columns are downcast to the smallest integer type and the category fields
+    become categoricals. Nested records stay nested (as dicts). Floats keep float64
+    unless `downcast_floats` is set, so prices are not rounded.
+    """
+    import pandas as pd
+
+    model = model or (type(records[0]) if records else None)
+    if model is None:
+        return pd.DataFrame()
+    columns = {}
+    for field in model.FIELDS:
+        values = [getattr(record, field.name) for record in records]
+        if isinstance(field.kind, list) or (isinstance(field.kind, type) and issubclass(field.kind, Record)):
+            values = [_plain(value) for value in values]
+            columns[field.key] = pd.Series(values, dtype=object)
+        elif field.kind is int:
+            series = pd.Series(values)
+            columns[field.key] = pd.to_numeric(series, downcast='integer') if series.notna().all() else series
+        elif field.kind is float:
+            series = pd.Series(values, dtype='float64')
+            columns[field.key] = pd.to_numeric(series, downcast='float') if downcast_floats else series
+        elif field.category:
+            columns[field.key] = pd.Series(values, dtype='category')
+        else:
+            columns[field.key] = pd.Series(values, dtype=object)
+    return pd.DataFrame(columns)
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [item.to_dict() for item in value]
+    return value
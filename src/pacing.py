@@ -0,0 +1,198 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains the pacing primitives used by the data fetchers to
+control how fast requests are sent to the upstream services.
+
+- TokenBucket: a global requests-per-second budget that can be shared by threads
+  and asyncio tasks, so concurrent fetchers never exceed the configured rate.
+- AdaptiveRateController: a token bucket whose rate adapts to the responses (AIMD).
+  It backs off on 429/5xx responses and Retry-After headers and ramps up while the
+  latency stays stable.
+"""
+
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Latency increases smaller than this (in seconds) are treated as noise, not as a spike
+MIN_LATENCY_SPIKE = 0.05
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the number of requests per second.
+
+    Every caller reserves the next free slot in the budget and waits until that
+    slot is reached. The same bucket can be used from plain threads (acquire)
+    and from asyncio coroutines (acquire_async).
+
+    Args:
+        rate (float): Allowed requests per second. None or 0 disables the limit.
+        burst (int): Number of requests that can be sent back to back before pacing starts.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, int(burst))
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def reserve(self):
+        """
+        Reserves one request slot and returns how many seconds the caller has to wait for it.
+        """
+        if not self.rate:
+            return 0.0
+
+        interval = 1.0 / self.rate
+        with self._lock:
+            now = time.monotonic()
+            # Unused slots can pile up to the burst size, but not more
+            earliest = now - interval * (self.burst - 1)
+            slot = max(self._next_slot, earliest)
+            self._next_slot = slot + interval
+        return max(0.0, slot - now)
+
+    def acquire(self):
+        """
+        Blocks the calling thread until a request slot is available.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """
+        Suspends the calling coroutine until a request slot is available.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, status_code, latency, retry_after=None):
+        """
+        Feedback hook called after every response. A fixed budget ignores it.
+        """
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header value into seconds.
+
+    Args:
+        value (str): Either a number of seconds or an HTTP date.
+
+    Returns:
+        - The number of seconds to wait, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveRateController(TokenBucket):
+    """
+    Token bucket with an additive-increase / multiplicative-decrease (AIMD) rate.
+
+    After every response the caller reports the status code and latency through
+    record(). While responses succeed and the latency stays within
+    `latency_tolerance` times its moving average, the rate grows by `increase`
+    requests per second. A 429 or 5xx response, or a latency spike, multiplies the
+    rate by `decrease`. A Retry-After header additionally pauses all callers for the
+    requested time.
+
+    Args:
+        initial_rate (float): Requests per second to start with.
+        min_rate (float): Lowest rate the controller backs off to.
+        max_rate (float): Highest rate the controller ramps up to.
+        increase (float): Requests per second added after every healthy response.
+        decrease (float): Factor applied to the rate when the upstream is throttling.
+        latency_tolerance (float): Latency / average latency ratio treated as a spike.
+    """
+
+    def __init__(self, initial_rate=1.0, min_rate=0.1, max_rate=20.0, increase=0.5, decrease=0.5,
+                 latency_tolerance=2.0):
+        super().__init__(initial_rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.requests = 0
+        self.throttled = 0
+        self._latency_avg = None
+        self._first_request = None
+        self._last_request = None
+
+    def record(self, status_code, latency, retry_after=None):
+        """
+        Adapts the rate to the outcome of one request.
+
+        Args:
+            status_code (int): HTTP status code of the response.
+            latency (float): Seconds the request took.
+            retry_after (str): Value of the Retry-After header, if any.
+        """
+        retry_seconds = parse_retry_after(retry_after)
+        with self._lock:
+            now = time.monotonic()
+            self.requests += 1
+            if self._first_request is None:
+                self._first_request = now - latency
+            self._last_request = now
+
+            if status_code == 429 or status_code >= 500 or retry_seconds is not None:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                if retry_seconds is not None:
+                    # Nobody sends a request before the upstream asked us to
+                    self._next_slot = max(self._next_slot, now + retry_seconds)
+                return
+
+            if self._latency_avg is not None and latency > max(self._latency_avg * self.latency_tolerance,
+                                                               self._latency_avg + MIN_LATENCY_SPIKE):
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+            # Exponentially weighted moving average of the latency
+            if self._latency_avg is None:
+                self._latency_avg = latency
+            else:
+                self._latency_avg = 0.8 * self._latency_avg + 0.2 * latency
+
+    @property
+    def effective_rate(self):
+        """
+        Requests per second actually completed since the first recorded request.
+        """
+        with self._lock:
+            if self.requests < 2 or self._last_request == self._first_request:
+                return 0.0
+            return self.requests / (self._last_request - self._first_request)
+
+    def stats(self):
+        """
+        Returns a summary of the controller state.
+
+        Returns:
+            - A dict with the current rate, the effective rate, the number of requests
+              and how many of them were throttled
+        """
+        return {
+            "rate": round(self.rate, 3),
+            "effective_rate": round(self.effective_rate, 3),
+            "requests": self.requests,
+            "throttled": self.throttled,
+        }
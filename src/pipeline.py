@@ -0,0 +1,163 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains a small dependency-graph (DAG) runner used by main.py.
+
+Every stage names the stages it depends on. A stage starts as soon as all of its
+dependencies have finished, so independent stages (e.g. the scrape and the carts)
+run at the same time in a thread pool. After the run, the runner reports the wall
+time of every stage and the critical path: the chain of dependent stages that
+determined the total run time.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class Stage:
+    """
+    One step of the pipeline.
+
+    Args:
+        name (str): Unique name of the stage.
+        func (callable): Called with the results of the dependencies, in the order of `deps`.
+        deps (list): Names of the stages whose results this stage needs.
+    """
+    __slots__ = ('name', 'func', 'deps')
+
+    def __init__(self, name, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+
+
+class StageTiming:
+    """
+    Start and end of a stage, in seconds since the start of the run.
+    """
+    __slots__ = ('start', 'end')
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+class DagRunner:
+    """
+    Runs stages concurrently as soon as their dependencies are done.
+
+    Args:
+        stages (list): The Stage objects of the pipeline.
+        max_workers (int): Maximum number of stages running at the same time.
+
+    Raises:
+        ValueError: If a dependency is unknown or the stages contain a cycle.
+    """
+
+    def __init__(self, stages, max_workers=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max_workers or len(self.stages) or 1
+        self.results = {}
+        self.timings = {}
+        self.wall_time = 0.0
+        self.started_at = None  # time.perf_counter() at the start of the run, the origin of the timings
+        self._check_graph()
+
+    def _check_graph(self):
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        # Kahn's algorithm, every stage has to be reachable from the roots
+        remaining = {name: len(stage.deps) for name, stage in self.stages.items()}
+        ready = [name for name, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for other in self.stages.values():
+                if name in other.deps:
+                    remaining[other.name] -= 1
+                    if remaining[other.name] == 0:
+                        ready.append(other.name)
+        if visited != len(self.stages):
+            raise ValueError("The stages contain a dependency cycle")
+
+    def run(self):
+        """
+        Runs all stages and returns their results.
+
+        If a stage fails, no new stages are started, the running ones are awaited and
+        the first error is raised.
+
+        Returns:
+            - A dict with the result of every stage by name
+        """
+        run_start = self.started_at = time.perf_counter()
+        pending = dict(self.stages)
+        running = {}
+        error = None
+
+        def call(stage):
+            start = time.perf_counter() - run_start
+            try:
+                return stage.func(*(self.results[dep] for dep in stage.deps))
+            finally:
+                self.timings[stage.name] = StageTiming(start, time.perf_counter() - run_start)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for name, stage in list(pending.items()):
+                        if all(dep in self.results for dep in stage.deps):
+                            running[executor.submit(call, stage)] = name
+                            del pending[name]
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as stage_error:
+                        if error is None:
+                            error = stage_error
+
+        self.wall_time = time.perf_counter() - run_start
+        if error is not None:
+            raise error
+        return self.results
+
+    def critical_path(self):
+        """
+        Returns the names of the stages on the critical path, from the first to the last.
+
+        The path starts at the stage that finished last and follows, for every stage,
+        the dependency that finished last, i.e. the one that held it back.
+        """
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda stage_name: self.timings[stage_name].end)
+        path = [name]
+        while self.stages[name].deps:
+            name = max(self.stages[name].deps, key=lambda dep: self.timings[dep].end)
+            path.append(name)
+        return list(reversed(path))
+
+    def report(self):
+        """
+        Returns a printable summary of the stage timings and the critical path.
+        """
+        lines = [f"{'stage':<16}{'start':>9}{'end':>9}{'seconds':>9}"]
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1].start):
+            lines.append(f"{name:<16}{timing.start:>9.2f}{timing.end:>9.2f}{timing.duration:>9.2f}")
+        lines.append(f"Wall time: {self.wall_time:.2f} s")
+        lines.append("Critical path: " + " -> ".join(self.critical_path()))
+        return "\n".join(lines)
@@ -0,0 +1,210 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains a persistent HTTP response cache backed by SQLite.
+
+The ApiClient (see http_client.py) looks responses up in the cache before sending a
+request. Fresh entries are served without touching the network, stale entries are
+revalidated with If-None-Match / If-Modified-Since, so an unchanged resource only
+costs a 304 response. Every endpoint has its own TTL, e.g. the product catalog
+is kept for a day while carts are always revalidated. The cache is bounded in size
+and evicts the least recently used entries first. The total size of the bodies is
+loaded when the cache is opened and updated by every store, so storing a response
+does not sum the sizes of the whole table.
+
+The entries are keyed by the full URL of the request, so one cache file can be shared
+by runs against different hosts (e.g. the store API and a local test server) without
+mixing their bodies.
+"""
+
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Constants
+DEFAULT_CACHE_PATH = 'http_cache.sqlite'
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_TTL = 3600  # Seconds, used for endpoints without their own TTL
+EVICTION_BATCH = 64  # Least recently used entries read at a time when the cache is full
+
+# TTL in seconds per endpoint, keyed by the first segment of the path
+ENDPOINT_TTLS = {
+    'products': 24 * 3600,  # The catalog almost never changes
+    'users': 3600,
+    'carts': 0,  # Always revalidated
+}
+
+
+class CacheEntry:
+    """
+    A cached response body with its validators.
+    """
+    __slots__ = ('body', 'etag', 'last_modified', 'stored_at', 'fresh')
+
+    def __init__(self, body, etag, last_modified, stored_at, fresh):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.fresh = fresh
+
+    def validators(self):
+        """
+        Returns the conditional request headers that revalidate this entry.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of response bodies stored in a SQLite file.
+
+    Args:
+        path (str): Path of the SQLite file, ':memory:' for a cache that lives only in this process.
+        ttls (dict): TTL in seconds per endpoint, defaults to ENDPOINT_TTLS.
+        default_ttl (float): TTL of endpoints that are not in `ttls`.
+        max_bytes (int): Maximum total size of the cached bodies.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, default_ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.ttls = ENDPOINT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        self._total = self._stored_bytes()  # Kept up to date by store() and _evict()
+
+    def ttl_for(self, path):
+        """
+        Returns the TTL of the endpoint a request path belongs to, e.g. 'products' for '/products/1'.
+
+        Args:
+            path (str): The path below the base URL of the API. For a full URL the first segment
+                of its path is used, so the base path of the API must be removed first.
+        """
+        endpoint = urlsplit(path).path.strip('/').split('/')[0]
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def lookup(self, key, path=None):
+        """
+        Looks up a cached response and counts the hit or miss.
+
+        Args:
+            key (str): The full URL of the request.
+            path (str): The path of the request below the base URL, used to find the TTL
+                (see ttl_for()). Defaults to the key.
+
+        Returns:
+            - A CacheEntry, or None if the key is not cached. Entries older than their
+              TTL are returned with fresh=False so the caller can revalidate them.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            body, etag, last_modified, stored_at = row
+            fresh = now - stored_at < self.ttl_for(path or key)
+            if fresh:
+                self.hits += 1
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            else:
+                self.misses += 1
+        return CacheEntry(body, etag, last_modified, stored_at, fresh)
+
+    def store(self, key, body, etag=None, last_modified=None):
+        """
+        Stores a response body and evicts the least recently used entries if the cache is too big.
+        """
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now, len(body)),
+            )
+            self._total += len(body) - (replaced[0] if replaced else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def mark_revalidated(self, key):
+        """
+        Marks a stale entry as fresh again after the server answered 304 Not Modified.
+        """
+        now = time.time()
+        with self._lock:
+            self.revalidations += 1
+            self._conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self._conn.commit()
+
+    def _stored_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        # Another process using the same file may have evicted entries since the total was loaded
+        self._total = self._stored_bytes()
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT ?", (EVICTION_BATCH,)
+            ).fetchall()
+            for key, size in rows:
+                if self._total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total -= size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total = 0
+
+    def stats(self):
+        """
+        Returns the hit/miss counters of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
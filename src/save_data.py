@@ -5,17 +5,108 @@ Date: 09 / 08 / 2024
 Description: This module contains functions to process and save user and product data into Excel files.
 It utilizes the pandas library to manage and analyze data in DataFrame format.
 
+Every DataFrame is written through save_frame() in one or more output formats:
+- 'xlsx': the Excel file (nested values are written as text), streamed row by row in
+  constant memory and continued on a new sheet past the Excel row limit (sinks.XlsxSink).
+- 'parquet': a Parquet file, nested values (address, name, rating...) stay typed structs.
+- 'arrow': an Arrow IPC file, with the same typed columns.
+The columnar files are partitioned by run date (<output_dir>/<name>/run_date=YYYY-MM-DD/)
+and need the optional pyarrow package.
+
+With flatten=True the nested fields are split into columns before saving, the same way
+final_data_filtering does it for files that were already written.
+
 Tasks:
 - Task 5: Combine user, client, and cart data into a single DataFrame and save to an Excel file.
 - Task 6: Create a DataFrame for product details, calculate sales information, and save to an Excel file.
+- Task 7: Save the basket size of every user and the sales of every day (see cart_metrics).
 """
 
+import os
 import pandas as pd
+from models import Record, to_frame
+from cart_metrics import cart_lines, product_sales, basket_sizes, daily_sales
+from final_data_filtering import flatten_user_frame, flatten_product_frame
+from metrics import METRICS
+from sinks import (ParquetSink, ArrowIpcSink, XlsxSink, partition_path, require_pyarrow, DEFAULT_COMPRESSION,
+                   OUTPUT_FORMATS, DEFAULT_FORMATS)
+
+
+def to_arrow_table(df):
+    """
+    Converts a DataFrame to an Arrow table. Missing values in object columns (e.g. from
+    an outer merge) become nulls so columns of dicts are converted to structs.
+    """
+    pa = require_pyarrow()
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].astype(object).where(df[column].notna(), None)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def records_frame(records, headers):
+    """
+    Builds the DataFrame of fetched records: typed records (see models.py) are converted
+    with downcast and categorical columns, plain dicts and rows are used as they are.
+    """
+    if records and isinstance(records[0], Record):
+        return to_frame(records)
+    return pd.DataFrame(records, columns=headers)
+
+
+def save_frame(df, name, formats=DEFAULT_FORMATS, output_dir='.', compression=DEFAULT_COMPRESSION, run_date=None):
+    """
+    Saves a DataFrame in every requested output format.
+
+    Args:
+        df (DataFrame): The data to save.
+        name (str): Name of the dataset, used for the file names.
+        formats (tuple): Any of OUTPUT_FORMATS.
+        output_dir (str): Directory of the files.
+        compression (str): Compression of the Parquet file ('snappy', 'zstd', 'gzip', ...).
+            The Arrow file uses it too when it supports it ('zstd', 'lz4'), otherwise lz4.
+        run_date (datetime.date): Partition of the columnar files, defaults to today.
+
+    Returns:
+        - The paths of the written files
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    unknown = [output_format for output_format in formats if output_format not in OUTPUT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown output formats {unknown}, use any of {OUTPUT_FORMATS}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    table = None
+    for output_format in formats:
+        if output_format == 'xlsx':
+            path = os.path.join(output_dir, f"{name}.xlsx")
+            with XlsxSink(path) as sink:
+                sink.write_frame(df)
+        else:
+            table = table if table is not None else to_arrow_table(df)
+            if output_format == 'parquet':
+                path = partition_path(output_dir, name, 'parquet', run_date)
+                sink = ParquetSink(path, compression=compression)
+            else:
+                path = partition_path(output_dir, name, 'arrow', run_date)
+                sink = ArrowIpcSink(path, compression=compression if compression in ('zstd', 'lz4', 'none') else 'lz4')
+            with sink:
+                sink.write_table(table)
+        METRICS.inc('rows_processed_total', len(df), step='save', dataset=name, format=output_format)
+        paths.append(path)
+    return paths
+
 
 # Task 5: Combine data into a DataFrame and save to Excel
-def save_user_data_to_excel(client_data, client_headers, cart_data, cart_headers, user_details, user_headers):
+def save_user_data_to_excel(client_data, client_headers, cart_data, cart_headers, user_details, user_headers,
+                            formats=DEFAULT_FORMATS, output_dir='.', compression=DEFAULT_COMPRESSION, run_date=None,
+                            flatten=False):
     """
     Combines client, cart, and user data into a single DataFrame and saves it to an Excel file.
+    The other output formats are passed on to save_frame().
 
     Parameters:
         client_data (list): A list of client data records.
@@ -24,11 +115,13 @@ def save_user_data_to_excel(client_data, client_headers, cart_data, cart_headers
         cart_headers (list): A list of headers for cart data.
         user_details (list): A list of user detail records.
         user_headers (list): A list of headers for user details.
+        formats, output_dir, compression, run_date: See save_frame().
+        flatten (bool): Split the nested fields into columns (see final_data_filtering).
     """
     # Create DataFrames
-    df_clients = pd.DataFrame(client_data, columns=client_headers)
-    df_carts = pd.DataFrame(cart_data, columns=cart_headers)
-    df_users = pd.DataFrame(user_details, columns=user_headers)
+    df_clients = records_frame(client_data, client_headers)
+    df_carts = records_frame(cart_data, cart_headers)
+    df_users = records_frame(user_details, user_headers)
 
     # Convert types if needed
     df_users['id'] = df_users['id'].astype(str)
@@ -51,52 +144,73 @@ def save_user_data_to_excel(client_data, client_headers, cart_data, cart_headers
     # Drop unnecessary columns
     df_combined = df_combined.drop(columns=['ID', 'userId'], errors='ignore')
     
-    # Save to Excel
-    df_combined.to_excel("combined_user_data.xlsx", index=False)
+    # Split address and name into columns
+    if flatten:
+        df_combined = flatten_user_frame(df_combined)
+
+    # Save to Excel and the other formats
+    paths = save_frame(df_combined, "combined_user_data", formats, output_dir, compression, run_date)
 
-    print("User data saved to Excel file: combined_user_data.xlsx")
+    print("User data saved to: " + ", ".join(paths))
 
 
 # Task 6: Create DataFrame for product details and save to Excel
-def save_product_data_to_excel(cart_data, product_details, product_headers):
+def save_product_data_to_excel(cart_data, product_details, product_headers,
+                               formats=DEFAULT_FORMATS, output_dir='.', compression=DEFAULT_COMPRESSION, run_date=None,
+                               flatten=False, lines=None, approximate_distinct=False):
     """
-    Creates a DataFrame for product details, computes total sales and unique user counts, 
-    and saves the information to an Excel file.
+    Creates a DataFrame for product details, computes total sales, unique user counts and revenue,
+    and saves the information to an Excel file. The other output formats are passed on to save_frame().
 
     Parameters:
         cart_data (list): A list of cart data records containing product details.
         product_details (list): A list of product detail records.
         product_headers (list): A list of headers for product data.
+        formats, output_dir, compression, run_date: See save_frame().
+        flatten (bool): Split the nested fields into columns (see final_data_filtering).
+        lines (DataFrame): The carts exploded by cart_metrics.cart_lines(), built from cart_data if not given.
+        approximate_distinct (bool): Estimate unique_users_count with HyperLogLog (for very large inputs).
     """
     # Create DataFrame for products
-    df_products = pd.DataFrame(product_details, columns=product_headers)
+    df_products = records_frame(product_details, product_headers)
 
-    # Count how many items of each product have been sold in total
-    product_sales_count = {}
-    unique_users_count = {}
+    # Count the items sold, the unique users and the revenue of every product
+    lines = cart_lines(cart_data) if lines is None else lines
+    sales = product_sales(lines, prices=df_products.set_index('id')['price'], approximate=approximate_distinct)
 
-    for cart in cart_data:
-        for product in cart['products']:
-            product_id = product['productId']
-            quantity = product['quantity']
+    # Add the counts to the DataFrame
+    df_products['total_sold'] = df_products['id'].map(sales['total_sold'])
+    df_products['unique_users_count'] = df_products['id'].map(sales['unique_users_count']).fillna(0).astype('int64')
+    df_products['revenue'] = df_products['id'].map(sales['revenue']).fillna(0.0)
 
-            # Update total sold count
-            if product_id in product_sales_count:
-                product_sales_count[product_id] += quantity
-            else:
-                product_sales_count[product_id] = quantity
+    # Split rating into rating and votes
+    if flatten:
+        df_products = flatten_product_frame(df_products)
 
-            # Update unique users count
-            if product_id in unique_users_count:
-                unique_users_count[product_id].add(cart['userId'])
-            else:
-                unique_users_count[product_id] = {cart['userId']}
+    # Save to Excel and the other formats
+    paths = save_frame(df_products, "product_data", formats, output_dir, compression, run_date)
 
-    # Add the counts to the DataFrame
-    df_products['total_sold'] = df_products['id'].map(product_sales_count)
-    df_products['unique_users_count'] = df_products['id'].map(lambda x: len(unique_users_count.get(x, set())))
+    print("Product data saved to: " + ", ".join(paths))
+
+
+# Task 7: Save the basket sizes and the daily sales
+def save_cart_metrics(cart_data, product_details, product_headers, formats=DEFAULT_FORMATS, output_dir='.',
+                      compression=DEFAULT_COMPRESSION, run_date=None, lines=None):
+    """
+    Computes the basket size of every user and the sales of every day and saves them
+    as 'user_basket_sizes' and 'daily_sales'.
+
+    Parameters:
+        cart_data (list): A list of cart data records containing product details.
+        product_details (list): A list of product detail records, for the prices.
+        product_headers (list): A list of headers for product data.
+        formats, output_dir, compression, run_date: See save_frame().
+        lines (DataFrame): The carts exploded by cart_metrics.cart_lines(), built from cart_data if not given.
+    """
+    lines = cart_lines(cart_data) if lines is None else lines
+    prices = records_frame(product_details, product_headers).set_index('id')['price']
 
-    # Save to Excel
-    df_products.to_excel("product_data.xlsx", index=False)
+    paths = save_frame(basket_sizes(lines), "user_basket_sizes", formats, output_dir, compression, run_date)
+    paths += save_frame(daily_sales(lines, prices), "daily_sales", formats, output_dir, compression, run_date)
 
-    print("Product data saved to Excel file: product_data.xlsx")
+    print("Cart metrics saved to: " + ", ".join(paths))
@@ -0,0 +1,729 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains incremental writers (sinks) for the records produced by
+the streaming fetchers of data_fetcher (iter_user_details, iter_product_details).
+
+A sink buffers at most `chunk_size` records and appends them to its file whenever the
+buffer is full, so records are written while the fetch is still running and the
+memory used does not depend on the number of records.
+
+- CsvSink: one CSV row per record, nested values (address, name, rating...) as JSON.
+- JsonLinesSink: one JSON document per line, nested values keep their structure.
+- ParquetSink / ArrowIpcSink: columnar files, nested values are kept as typed structs
+  and lists. Every chunk becomes one row group / record batch. These need the optional
+  pyarrow package.
+- XlsxSink: an Excel workbook written row by row in constant memory. A sheet is full at
+  the Excel row limit, the next rows continue on a new sheet.
+
+The matching readers iter_csv_rows(), iter_json_lines() and iter_xlsx_frames() read the
+files back lazily. partition_path() builds the run-date partitioned path of a columnar output.
+
+A large workbook can be read and written by several processes: xlsx_row_ranges() splits its
+rows into ranges, iter_xlsx_range() reads one range without parsing the rows above it, every
+range is written to a part file by an XlsxSink starting at the same row (first_row), and
+merge_xlsx_parts() joins the rows of the parts into one workbook.
+
+pandas, pyarrow, XlsxWriter and openpyxl are imported by the code that needs them, so
+the CSV and JSON Lines sinks can be used without loading them.
+"""
+
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import zipfile
+
+# Constants
+OUTPUT_FORMATS = ('xlsx', 'parquet', 'arrow')  # Formats of the saved reports, see save_data.save_frame()
+DEFAULT_FORMATS = ('xlsx',)
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_COMPRESSION = 'snappy'
+PARQUET_COMPRESSIONS = ('snappy', 'gzip', 'brotli', 'zstd', 'lz4', 'none')
+ARROW_COMPRESSIONS = ('lz4', 'zstd', 'none')
+EXCEL_MAX_ROWS = 1048576  # Rows of an Excel sheet, including the header
+EXCEL_DATE_FORMAT = 'yyyy-mm-dd hh:mm:ss'
+
+
+class ChunkedSink:
+    """
+    Base class of the sinks: buffers records and writes them in chunks.
+
+    Subclasses implement _write_chunk(). Use a sink as a context manager, or call
+    close() at the end so the last partial chunk is written.
+
+    Args:
+        chunk_size (int): Maximum number of records kept in memory before they are written.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = max(1, chunk_size)
+        self.rows_written = 0
+        self.chunks_written = 0
+        self._buffer = []
+
+    def write(self, record):
+        """
+        Adds one record, writing the buffer when it reaches the chunk size.
+        """
+        self._buffer.append(record)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_all(self, records):
+        """
+        Consumes an iterable of records and returns how many were written.
+        """
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def flush(self):
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self.rows_written += len(self._buffer)
+            self.chunks_written += 1
+            self._buffer = []
+
+    def _write_chunk(self, chunk):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(ChunkedSink):
+    """
+    Appends records to a CSV file.
+
+    Args:
+        path (str): The CSV file, it is overwritten.
+        headers (list): Column names, the first row of the file (iter_csv_rows() reads it as
+            the header). For dict records they default to the keys of the first record;
+            list records are written as they are and need them.
+        chunk_size (int): Maximum number of records kept in memory.
+
+    Raises:
+        ValueError: When list records are written without headers.
+    """
+
+    def __init__(self, path, headers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(chunk_size)
+        self.path = path
+        self.headers = list(headers) if headers is not None else None
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._header_written = False
+
+    def _write_chunk(self, chunk):
+        if not self._header_written:
+            if self.headers is None:
+                if not isinstance(chunk[0], dict):
+                    raise ValueError(f"{self.path}: list records need headers, the first row is read as the header")
+                self.headers = list(chunk[0].keys())
+            self._write_header()
+
+        for record in chunk:
+            values = [record.get(header) for header in self.headers] if isinstance(record, dict) else record
+            self._writer.writerow([_csv_value(value) for value in values])
+        self._file.flush()
+
+    def _write_header(self):
+        self._writer.writerow(self.headers)
+        self._header_written = True
+
+    def close(self):
+        try:
+            super().close()
+            if not self._header_written and self.headers is not None:
+                self._write_header()  # An empty result still has its header
+        finally:
+            self._file.close()
+
+
+class JsonLinesSink(ChunkedSink):
+    """
+    Appends records to a JSON Lines file (one JSON document per line).
+
+    Args:
+        path (str): The file, it is overwritten.
+        chunk_size (int): Maximum number of records kept in memory.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(chunk_size)
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write_chunk(self, chunk):
+        self._file.write(''.join(json.dumps(record) + '\n' for record in chunk))
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+def require_pyarrow():
+    """
+    Imports pyarrow, which is only needed for the columnar sinks.
+    """
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError("Parquet and Arrow output need the pyarrow package: pip install pyarrow") from error
+    return pyarrow
+
+
+class _ArrowSink(ChunkedSink):
+    """
+    Base class of the columnar sinks: converts every chunk of dict records into an Arrow table.
+
+    The schema is taken from the first chunk (or given), later chunks are converted to it so
+    the whole file has one stable schema. When a later chunk needs a wider type for a field
+    (a float where the first chunks only had integers, a value where they only had nulls,
+    also inside structs and lists), the schema is widened and the chunks already written are
+    rewritten with it; values are never truncated. Other type conflicts raise an error.
+    """
+
+    def __init__(self, path, schema=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(chunk_size)
+        self.pa = require_pyarrow()
+        self.path = path
+        self.schema = schema
+        self._writer = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _write_chunk(self, chunk):
+        table = self.pa.Table.from_pylist(chunk)
+        if self.schema is not None:
+            self._widen(table.schema)
+            table = self.pa.Table.from_pylist(chunk, schema=self.schema)
+        self._write(table)
+
+    def write_table(self, table):
+        """
+        Writes an Arrow table (e.g. converted from a DataFrame) directly.
+        """
+        self.flush()
+        if self.schema is not None:
+            self._widen(table.schema)
+            table = table.cast(self.schema, safe=True)
+        self._write(table)
+        self.rows_written += table.num_rows
+        self.chunks_written += 1
+
+    def _write(self, table):
+        if self.schema is None:
+            self.schema = table.schema
+        if self._writer is None:
+            self._writer = self._open_writer()
+        self._writer.write_table(table)
+
+    def _widen(self, schema):
+        """
+        Widens the schema to hold the fields of `schema` as well and rewrites the file if it changed.
+        """
+        widened = self.pa.schema([
+            field.with_type(_widen_type(self.pa, field.type, schema.field(field.name).type))
+            if field.name in schema.names else field
+            for field in self.schema
+        ])
+        if widened.equals(self.schema):
+            return
+        self.schema = widened
+        if self._writer is not None:
+            self._writer.close()
+            self._close_file()
+            previous_path = f"{self.path}.narrow"
+            os.replace(self.path, previous_path)
+            self._writer = self._open_writer()
+            for table in self._read_chunks(previous_path):
+                self._writer.write_table(table.cast(self.schema, safe=True))
+            os.remove(previous_path)
+
+    def _open_writer(self):
+        raise NotImplementedError
+
+    def _read_chunks(self, path):
+        """
+        Yields the chunks written to a file of this format as tables, one per row group / record batch.
+        """
+        raise NotImplementedError
+
+    def _close_file(self):
+        pass
+
+    def close(self):
+        super().close()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _widen_type(pa, current, new):
+    """
+    Returns the type that holds the values of both Arrow types: null widens to any type and
+    integers to floats, struct fields and list items are widened field by field. Any other
+    pair keeps `current`, so converting the conflicting values raises an error.
+    """
+    types = pa.types
+    if current.equals(new) or types.is_null(new):
+        return current
+    if types.is_null(current):
+        return new
+    if types.is_integer(current) and types.is_floating(new):
+        return new
+    if types.is_struct(current) and types.is_struct(new):
+        new_fields = {new.field(index).name: new.field(index) for index in range(new.num_fields)}
+        return pa.struct([
+            field.with_type(_widen_type(pa, field.type, new_fields[field.name].type)) if field.name in new_fields else field
+            for field in (current.field(index) for index in range(current.num_fields))
+        ])
+    if types.is_list(current) and types.is_list(new):
+        return pa.list_(_widen_type(pa, current.value_type, new.value_type))
+    return current
+
+
+class ParquetSink(_ArrowSink):
+    """
+    Writes records to a Parquet file, one row group per chunk.
+
+    Args:
+        path (str): The Parquet file, e.g. built with partition_path().
+        schema (pyarrow.Schema): Optional schema, inferred from the first chunk otherwise.
+        compression (str): One of PARQUET_COMPRESSIONS.
+        chunk_size (int): Maximum number of records kept in memory.
+    """
+
+    def __init__(self, path, schema=None, compression=DEFAULT_COMPRESSION, chunk_size=DEFAULT_CHUNK_SIZE):
+        if compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(f"Unknown Parquet compression '{compression}', use one of {PARQUET_COMPRESSIONS}")
+        super().__init__(path, schema, chunk_size)
+        self.compression = compression
+
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+
+    def _read_chunks(self, path):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        for index in range(parquet.metadata.num_row_groups):
+            yield parquet.read_row_group(index)
+
+
+class ArrowIpcSink(_ArrowSink):
+    """
+    Writes records to an Arrow IPC (Feather v2) file, one record batch per chunk.
+
+    Args:
+        path (str): The Arrow file, e.g. built with partition_path().
+        schema (pyarrow.Schema): Optional schema, inferred from the first chunk otherwise.
+        compression (str): One of ARROW_COMPRESSIONS.
+        chunk_size (int): Maximum number of records kept in memory.
+    """
+
+    def __init__(self, path, schema=None, compression='lz4', chunk_size=DEFAULT_CHUNK_SIZE):
+        if compression not in ARROW_COMPRESSIONS:
+            raise ValueError(f"Unknown Arrow compression '{compression}', use one of {ARROW_COMPRESSIONS}")
+        super().__init__(path, schema, chunk_size)
+        self.compression = compression
+
+    def _open_writer(self):
+        options = self.pa.ipc.IpcWriteOptions(compression=None if self.compression == 'none' else self.compression)
+        self._file = self.pa.OSFile(self.path, 'wb')
+        return self.pa.ipc.new_file(self._file, self.schema, options=options)
+
+    def _read_chunks(self, path):
+        with self.pa.OSFile(path, 'rb') as file:
+            reader = self.pa.ipc.open_file(file)
+            for index in range(reader.num_record_batches):
+                yield self.pa.Table.from_batches([reader.get_batch(index)])
+
+    def _close_file(self):
+        self._file.close()
+
+    def close(self):
+        super().close()
+        if self._writer is not None:
+            self._close_file()
+
+
+class XlsxSink(ChunkedSink):
+    """
+    Writes records to an Excel workbook in constant memory.
+
+    The rows are written with XlsxWriter in constant_memory mode: every row is flushed
+    to disk when the next one starts, so the workbook is never built in memory like
+    DataFrame.to_excel() does. When a sheet reaches `max_rows` (the Excel limit by
+    default), the following rows go to a new sheet with the same header:
+    'Sheet1', 'Sheet1_2', 'Sheet1_3', ...
+
+    Nested values (dicts and lists) are written as text, like DataFrame.to_excel() does,
+    missing values as empty cells.
+
+    Args:
+        path (str): The xlsx file, it is overwritten.
+        headers (list): Column names. For dict records they default to the keys of the
+            first record, for write_frame() to the columns of the first frame.
+        sheet_name (str): Name of the first sheet.
+        max_rows (int): Rows per sheet, including the header.
+        chunk_size (int): Maximum number of records kept in memory.
+        first_row (int): Sheet row (0-based) of the first record. The header is only written
+            when the records follow it directly (1); a larger value writes the rows of one
+            part of a sheet, see merge_xlsx_parts().
+    """
+
+    def __init__(self, path, headers=None, sheet_name='Sheet1', max_rows=EXCEL_MAX_ROWS, chunk_size=DEFAULT_CHUNK_SIZE,
+                 first_row=1):
+        super().__init__(chunk_size)
+        import pandas as pd
+        import xlsxwriter
+        self._nat, self._na = pd.NaT, pd.NA  # Resolved once, _excel_value() runs for every cell
+        self.path = path
+        self.headers = list(headers) if headers is not None else None
+        self.sheet_name = sheet_name
+        self.max_rows = max(2, max_rows)
+        self.first_row = first_row
+        self.sheets = []
+        self._workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'strings_to_urls': False,
+            'default_date_format': EXCEL_DATE_FORMAT,
+        })
+        self._sheet = None
+        self._row = 0
+
+    def _write_chunk(self, chunk):
+        if self.headers is None and isinstance(chunk[0], dict):
+            self.headers = list(chunk[0].keys())
+        for record in chunk:
+            values = [record.get(header) for header in self.headers] if isinstance(record, dict) else record
+            self._write_row([_excel_value(value, self._nat, self._na) for value in values])
+
+    def write_frame(self, frame):
+        """
+        Writes the rows of a DataFrame (e.g. one chunk of a report), converted column by column.
+        """
+        self.flush()
+        if self.headers is None:
+            self.headers = [str(column) for column in frame.columns]
+        for row in zip(*(_excel_column(series) for _, series in frame.items())):
+            self._write_row(row)
+        self.rows_written += len(frame)
+        self.chunks_written += 1
+
+    def _write_row(self, values):
+        if self._sheet is None or self._row >= self.max_rows:
+            self._add_sheet()
+        self._sheet.write_row(self._row, 0, values)
+        self._row += 1
+
+    def _add_sheet(self):
+        name = self.sheet_name if not self.sheets else f"{self.sheet_name}_{len(self.sheets) + 1}"
+        self._sheet = self._workbook.add_worksheet(name)
+        self.sheets.append(name)
+        self._row = 0
+        if len(self.sheets) == 1 and self.first_row > 1:
+            self._row = self.first_row  # A part of the sheet, the header is in the first part
+        elif self.headers is not None:
+            self._sheet.write_row(0, 0, self.headers)
+            self._row = 1
+
+    def close(self):
+        super().close()
+        if self._sheet is None:
+            self._add_sheet()  # A workbook needs at least one sheet
+        self._workbook.close()
+
+
+def _excel_value(value, nat, na):
+    """
+    Converts one value for XlsxSink: nested values become text, missing values empty cells.
+
+    Args:
+        value: The value of the cell.
+        nat: pandas.NaT.
+        na: pandas.NA.
+    """
+    if isinstance(value, (dict, list, tuple)):
+        return str(value)
+    if value is None or (isinstance(value, float) and value != value) or value is nat or value is na:
+        return None
+    return value
+
+
+def _excel_column(series):
+    """
+    Converts a DataFrame column into the list of cell values of XlsxSink.
+    """
+    import pandas as pd
+
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        series = series.dt.tz_localize(None)  # Excel has no time zones
+    values = series.astype(object).where(series.notna(), None).tolist()
+    if series.dtype == object:
+        values = [str(value) if isinstance(value, (dict, list, tuple)) else value for value in values]
+    return values
+
+
+def partition_path(output_dir, name, extension, run_date=None):
+    """
+    Returns the path of a columnar output partitioned by run date.
+
+    Example: partition_path('out', 'product_data', 'parquet') ->
+             'out/product_data/run_date=2024-08-09/product_data.parquet'
+
+    Args:
+        output_dir (str): Root directory of the outputs.
+        name (str): Name of the dataset.
+        extension (str): File extension, e.g. 'parquet' or 'arrow'.
+        run_date (datetime.date): Date of the run, defaults to today. False writes the
+            file directly in `output_dir`, without a partition directory.
+    """
+    if run_date is False:
+        return os.path.join(output_dir, f"{name}.{extension}")
+    run_date = run_date or datetime.date.today()
+    return os.path.join(output_dir, name, f"run_date={run_date.isoformat()}", f"{name}.{extension}")
+
+
+def _csv_value(value):
+    """
+    Nested values are written as JSON instead of Python repr strings.
+    """
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def iter_csv_rows(path):
+    """
+    Lazily reads a CSV file written by CsvSink.
+
+    Returns:
+        - The headers of the file
+        - A generator of the rows (lists of strings)
+    """
+    file = open(path, newline='', encoding='utf-8')
+    reader = csv.reader(file)
+    headers = next(reader, [])
+
+    def rows():
+        with file:
+            yield from reader
+
+    return headers, rows()
+
+
+def iter_xlsx_frames(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lazily reads an Excel workbook in DataFrames of at most `chunk_size` rows.
+
+    The workbook is opened in openpyxl's read-only mode, so only the rows of the current
+    chunk are in memory. Every sheet starts with its header; the sheets of a workbook
+    written by XlsxSink (split at the row limit) are read one after the other as one table.
+    """
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            headers = next(rows, None)
+            if headers is None:
+                continue
+            headers = list(headers)
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield pd.DataFrame(chunk, columns=headers)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=headers)
+    finally:
+        workbook.close()
+
+
+def iter_json_lines(path):
+    """
+    Lazily reads the records of a JSON Lines file.
+    """
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def xlsx_row_ranges(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Splits the data rows of every sheet of an Excel workbook into ranges of at most `chunk_size` rows.
+
+    Returns:
+        - A list of (sheet index, first row, last row) with 1-based sheet rows (the header is row 1)
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        ranges = []
+        for index, sheet in enumerate(workbook.worksheets):
+            last_row = sheet.max_row  # From the dimension stored by the writer
+            if last_row is None:
+                last_row = sum(1 for _ in sheet.iter_rows(values_only=True))
+            ranges.extend((index, first, min(first + chunk_size - 1, last_row))
+                          for first in range(2, last_row + 1, chunk_size))
+        return ranges
+    finally:
+        workbook.close()
+
+
+def iter_xlsx_range(path, sheet_index, first_row, last_row, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lazily reads the rows `first_row` to `last_row` of one sheet of an Excel workbook (see
+    xlsx_row_ranges()) in DataFrames of at most `chunk_size` rows, with the header of the sheet.
+
+    openpyxl can only read a sheet from the top, converting every row on the way. Here the
+    sheet XML is only decompressed and scanned for the numbered row elements up to
+    `last_row`, and just the rows of the range are parsed, so the ranges of a large file can
+    be read by several processes at once. A sheet without row numbers is read from the top.
+    """
+    import pandas as pd
+    from openpyxl import load_workbook
+    from openpyxl.worksheet._reader import WorkSheetParser  # Not public, openpyxl has no API for a row range
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_index]
+        headers = list(next(sheet.iter_rows(max_row=1, values_only=True), ()))
+        with workbook._archive.open(sheet._worksheet_path) as source:
+            xml = _xlsx_rows_xml(source, first_row, last_row)
+        if xml is None:
+            rows = sheet.iter_rows(min_row=first_row, max_row=last_row, values_only=True)
+        else:
+            parser = WorkSheetParser(io.BytesIO(xml), sheet._shared_strings, data_only=True, epoch=workbook.epoch,
+                                     date_formats=workbook._date_formats,
+                                     timedelta_formats=workbook._timedelta_formats)
+            rows = (_row_values(cells, len(headers)) for _, cells in parser.parse())
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield pd.DataFrame(chunk, columns=headers)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=headers)
+    finally:
+        workbook.close()
+
+
+def _row_values(cells, width):
+    """
+    Places the parsed cells of a row (empty cells are left out of the XML) in their columns.
+    """
+    values = [None] * width
+    for cell in cells:
+        if cell['column'] <= width:
+            values[cell['column'] - 1] = cell['value']
+    return values
+
+
+def _xlsx_rows_xml(source, first_row, last_row, block_size=1 << 20):
+    """
+    Returns a worksheet document with only the rows `first_row` to `last_row` of the sheet XML
+    read from `source`, or None if the rows of the sheet are not numbered.
+    """
+    start_tag = b'<row r="%d"' % first_row
+    end_tags = (b'<row r="%d"' % (last_row + 1), b'</sheetData>')
+    buffer = b''
+    start = -1
+    while True:
+        block = source.read(block_size)
+        buffer += block
+        if start < 0:
+            start = buffer.find(start_tag)
+            if start < 0:
+                if not block:
+                    return None
+                buffer = buffer[-len(start_tag):]  # The tag may continue in the next block
+                continue
+            buffer = buffer[start:]
+        ends = [end for end in (buffer.find(tag) for tag in end_tags) if end >= 0]
+        if ends or not block:
+            rows = buffer[:min(ends)] if ends else buffer
+            return (b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                    + rows + b'</sheetData></worksheet>')
+
+
+def merge_xlsx_parts(parts, path, sheet_name='Sheet1'):
+    """
+    Joins the part files written by several XlsxSinks (see first_row) into one workbook.
+
+    The parts hold the rows of their range at their final row numbers, so their row
+    elements are copied as they are, without parsing the cells: the rows of the parts of
+    a sheet are concatenated in the order of `parts`. The first part of every sheet holds
+    its header. The sheets are named like XlsxSink names them.
+
+    Args:
+        parts (list): (sheet index, part path) tuples in row order.
+        path (str): The merged workbook, it is overwritten.
+        sheet_name (str): Name of the first sheet.
+    """
+    import xlsxwriter
+
+    sheets = max((sheet_index for sheet_index, _ in parts), default=0) + 1
+    skeleton = io.BytesIO()
+    workbook = xlsxwriter.Workbook(skeleton, {'in_memory': True})
+    for index in range(sheets):
+        workbook.add_worksheet(sheet_name if index == 0 else f"{sheet_name}_{index + 1}")
+    workbook.close()
+
+    # All parts use the same cell formats, but a part only lists the ones its cells use
+    styles = max((_read_zip_entry(part, 'xl/styles.xml') for _, part in parts), key=len, default=None)
+    with zipfile.ZipFile(skeleton) as template, zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as merged:
+        for entry in template.infolist():
+            match = re.fullmatch(r'xl/worksheets/sheet(\d+)\.xml', entry.filename)
+            if match is None:
+                data = styles if entry.filename == 'xl/styles.xml' and styles else template.read(entry)
+                merged.writestr(entry, data)
+                continue
+            sheet_parts = [part for sheet_index, part in parts if sheet_index == int(match.group(1)) - 1]
+            head, tail = template.read(entry).split(b'<sheetData/>')
+            with merged.open(entry.filename, 'w') as sheet_file:
+                sheet_file.write(head.replace(b'<dimension ref="A1"/>', _merged_dimension(sheet_parts)) + b'<sheetData>')
+                for part in sheet_parts:
+                    xml = _read_zip_entry(part, 'xl/worksheets/sheet1.xml')
+                    start, end = xml.find(b'<sheetData>'), xml.rfind(b'</sheetData>')
+                    if start >= 0 and end >= 0:
+                        sheet_file.write(xml[start + len(b'<sheetData>'):end])
+                sheet_file.write(b'</sheetData>' + tail)
+
+
+def _read_zip_entry(path, name):
+    with zipfile.ZipFile(path) as archive:
+        return archive.read(name)
+
+
+def _merged_dimension(parts):
+    """
+    Returns the dimension element of a sheet made of `parts`: from A1 to the last cell of the last part.
+    """
+    for part in reversed(parts):
+        match = re.search(rb'<dimension ref="[A-Z]+\d+:([A-Z]+\d+)"/>', _read_zip_entry(part, 'xl/worksheets/sheet1.xml'))
+        if match is not None:
+            return b'<dimension ref="A1:' + match.group(1) + b'"/>'
+    return b'<dimension ref="A1"/>'
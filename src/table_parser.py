@@ -0,0 +1,214 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module extracts the client table (#userTable) of the store page in a
+single step instead of one WebDriver round-trip per row and cell.
+
+- TABLE_EXTRACT_SCRIPT: JavaScript that reads the whole table inside the browser and
+  returns it as JSON from one execute_script() call.
+- parse_user_table(): parses the table out of an HTML document (e.g. driver.page_source)
+  with the standard library HTML parser.
+- parse_pagination_links(): returns the href of every page link in #pagination.
+- TABLE_FINGERPRINT_SCRIPT: JavaScript that returns only the row IDs and a 64-bit hash of the
+  cells of the table, so an unchanged page can be recognised without sending its cells back to Python.
+
+Both return the same (headers, rows) as reading the table cell by cell: the headers are
+the <th> cells of the first row and every following row with <td> cells is a data row.
+"""
+
+import re
+from html.parser import HTMLParser
+
+# Constants
+TABLE_ID = 'userTable'
+PAGINATION_ID = 'pagination'
+
+# Returns {headers: [...], rows: [[...], ...]} for the table with the id given as first argument
+TABLE_EXTRACT_SCRIPT = """
+const table = document.getElementById(arguments[0]);
+if (!table) { return null; }
+const text = (cell) => (cell.innerText || '').trim();
+const rows = Array.from(table.rows);
+if (rows.length === 0) { return {headers: [], rows: []}; }
+const headers = Array.from(rows[0].querySelectorAll('th')).map(text);
+const data = [];
+for (const row of rows.slice(1)) {
+    const cells = row.querySelectorAll('td');
+    if (cells.length) { data.push(Array.from(cells).map(text)); }
+}
+return {headers: headers, rows: data};
+"""
+
+# Returns a quick fingerprint of the table with the id given as first argument: the IDs of the
+# data rows (first column), a 64-bit FNV-1a hash of the text of every cell and the length of that
+# text, e.g. '["1","2"]:9b1c2f3a04d5e6f7:1234'. A page only matches a stored fingerprint if it holds
+# the same clients, so a hash collision cannot hand back the rows of other clients.
+TABLE_FINGERPRINT_SCRIPT = """
+const table = document.getElementById(arguments[0]);
+if (!table) { return null; }
+const prime = 0x100000001b3n;
+let hash = 0xcbf29ce484222325n;
+let length = 0;
+const ids = [];
+for (const row of Array.from(table.rows)) {
+    const cells = Array.from(row.querySelectorAll('th, td')).map((cell) => (cell.innerText || '').trim());
+    if (row.querySelector('td')) { ids.push(cells[0]); }
+    const text = cells.join('\\u001f') + '\\u001e';
+    length += text.length;
+    for (let i = 0; i < text.length; i++) {
+        hash = BigInt.asUintN(64, (hash ^ BigInt(text.charCodeAt(i))) * prime);
+    }
+}
+return JSON.stringify(ids) + ':' + hash.toString(16).padStart(16, '0') + ':' + length;
+"""
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class _UserTableParser(HTMLParser):
+    """
+    Collects the rows of one table as lists of (tag, text) cells.
+    """
+
+    def __init__(self, table_id):
+        super().__init__(convert_charrefs=True)
+        self.table_id = table_id
+        self.found = False
+        self.rows = []
+        self._depth = 0  # Nesting depth of <table> tags inside the wanted table
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._depth == 0:
+            if tag == 'table' and dict(attrs).get('id') == self.table_id:
+                self.found = True
+                self._depth = 1
+            return
+
+        if tag == 'table':
+            self._depth += 1
+        elif self._depth == 1 and tag == 'tr':
+            self._close_row()  # A missing </tr> is closed by the next row
+            self._row = []
+        elif self._depth == 1 and tag in ('th', 'td') and self._row is not None:
+            self._close_cell()  # A missing </td> is closed by the next cell
+            self._cell = [tag, []]
+        elif tag == 'br' and self._cell is not None:
+            self._cell[1].append(' ')
+
+    def handle_endtag(self, tag):
+        if self._depth == 0:
+            return
+
+        if tag == 'table':
+            if self._depth == 1:
+                self._close_row()
+            self._depth -= 1
+        elif self._depth == 1 and tag in ('th', 'td'):
+            self._close_cell()
+        elif self._depth == 1 and tag == 'tr':
+            self._close_row()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell[1].append(data)
+
+    def _close_row(self):
+        if self._row is not None:
+            self._close_cell()
+            self.rows.append(self._row)
+            self._row = None
+
+    def _close_cell(self):
+        if self._cell is not None:
+            tag, parts = self._cell
+            self._row.append((tag, _WHITESPACE.sub(' ', ''.join(parts)).strip()))
+            self._cell = None
+
+
+def parse_user_table(html, table_id=TABLE_ID):
+    """
+    Parses the client table out of an HTML document.
+
+    Args:
+        html (str): The HTML document, e.g. driver.page_source.
+        table_id (str): The id attribute of the table.
+
+    Returns:
+        - Headers of the table
+        - The data rows
+
+    Raises:
+        ValueError: If the document contains no table with the given id.
+    """
+    parser = _UserTableParser(table_id)
+    parser.feed(html)
+    parser.close()
+    if not parser.found:
+        raise ValueError(f"No table with id '{table_id}' in the document")
+
+    if not parser.rows:
+        return [], []
+    headers = [text for tag, text in parser.rows[0] if tag == 'th']
+    rows = []
+    for row in parser.rows[1:]:
+        cells = [text for tag, text in row if tag == 'td']
+        if cells:  # Only add rows with data
+            rows.append(cells)
+    return headers, rows
+
+
+class _PaginationParser(HTMLParser):
+    """
+    Collects the href attribute of every link inside the pagination element.
+    """
+
+    def __init__(self, pagination_id):
+        super().__init__(convert_charrefs=True)
+        self.pagination_id = pagination_id
+        self.found = False
+        self.links = []
+        self._stack = []  # Open tags inside the pagination element
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if not self._stack:
+            if attrs.get('id') == self.pagination_id:
+                self.found = True
+                self._stack.append(tag)
+            return
+        if tag == 'a':
+            self.links.append(attrs.get('href'))
+        if tag not in ('a', 'br', 'img', 'input'):  # Void and inline tags do not nest content we need
+            self._stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if self._stack and self._stack[-1] == tag:
+            self._stack.pop()
+
+
+def parse_pagination_links(html, pagination_id=PAGINATION_ID):
+    """
+    Returns the href of every link in the pagination element, in page order.
+
+    Links without an href are returned as None. If the document has no pagination
+    element, an empty list is returned.
+    """
+    parser = _PaginationParser(pagination_id)
+    parser.feed(html)
+    parser.close()
+    return parser.links
+
+
+def result_from_script(result):
+    """
+    Converts the JSON returned by TABLE_EXTRACT_SCRIPT into (headers, rows).
+
+    Raises:
+        ValueError: If the script did not find the table.
+    """
+    if result is None:
+        raise ValueError("The client table was not found on the page")
+    return result['headers'], result['rows']
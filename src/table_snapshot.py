@@ -0,0 +1,170 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains the change detection of the incremental scrape of the
+paginated client table.
+
+- page_fingerprint(): the fingerprint of a page, the IDs of its rows and a hash of its content.
+- diff_rows(): the row-level diff of two scrapes, by client ID: added, removed and changed rows.
+- TableSnapshot: compares the pages of the current scrape with the pages the last successful
+  run stored in the checkpoint store. A scraper asks it for the stored rows of a page whose
+  quick fingerprint did not change (the ETag of the page over HTTP, or the row IDs and a hash
+  of the cells computed in the browser, see table_parser.TABLE_FINGERPRINT_SCRIPT) and skips the full
+  extraction of that page; every other page is extracted and recorded.
+
+The diff tells the later stages which client IDs are new or changed, so an incremental run
+fetches the details of those clients only.
+"""
+
+from checkpoint import content_hash
+from metrics import METRICS
+
+# Constants
+ID_COLUMN = 0  # Column of the client ID in the rows of the table
+
+
+def page_fingerprint(rows, id_column=ID_COLUMN):
+    """
+    Returns the fingerprint of a page of the table.
+
+    Args:
+        rows (list): The data rows of the page.
+        id_column (int): Column of the row ID.
+
+    Returns:
+        - The row IDs of the page, in page order
+        - A hash of the content of the rows
+    """
+    return [row[id_column] for row in rows], content_hash(rows)
+
+
+def diff_rows(previous, current, id_column=ID_COLUMN):
+    """
+    Compares two scrapes of the table row by row, matching the rows by ID.
+
+    Args:
+        previous (list): The rows of the earlier scrape.
+        current (list): The rows of the new scrape.
+        id_column (int): Column of the row ID.
+
+    Returns:
+        - {'added': [...], 'removed': [...], 'changed': [...], 'unchanged': n}, the IDs in table order
+    """
+    old = {row[id_column]: row for row in previous}
+    new = {row[id_column]: row for row in current}
+    changed = [row_id for row_id, row in new.items() if row_id in old and old[row_id] != row]
+    added = [row_id for row_id in new if row_id not in old]
+    return {
+        'added': added,
+        'removed': [row_id for row_id in old if row_id not in new],
+        'changed': changed,
+        'unchanged': len(new) - len(added) - len(changed),
+    }
+
+
+class TableSnapshot:
+    """
+    Tracks the pages of one scrape of a table against the last successful scrape of the same table.
+
+    Creating a snapshot deletes the pages stored by older runs and by the current run,
+    the pages of the last successful run are kept as the baseline. The methods are
+    thread-safe as long as every page index is recorded by one thread.
+
+    Args:
+        checkpoint (CheckpointStore): The store of the current run.
+        url (str): The page with the table.
+        id_column (int): Column of the row ID.
+    """
+
+    def __init__(self, checkpoint, url, id_column=ID_COLUMN):
+        self.checkpoint = checkpoint
+        self.url = url
+        self.id_column = id_column
+        self.skipped = 0  # Pages whose rows were reused from the baseline
+        self.extracted = 0  # Pages that were read completely
+        self.baseline_run = checkpoint.last_table_run(url)
+        self.baseline = checkpoint.table_pages(url, self.baseline_run) if self.baseline_run is not None else {}
+        checkpoint.reset_table_pages(url, keep_run_id=self.baseline_run)
+        self._pages = {}  # page index -> page recorded by this scrape
+
+    def validator(self, page_index):
+        """
+        Returns the quick fingerprint the baseline stored for a page, or None.
+        """
+        page = self.baseline.get(page_index)
+        return page['quick'] if page is not None else None
+
+    def reuse(self, page_index, quick):
+        """
+        Returns the stored headers and rows of a page if its quick fingerprint did not change.
+
+        A page that is reused is recorded for this scrape, the caller does not have to extract it.
+        The rows are a new list the caller may extend.
+
+        Args:
+            page_index (int): Index of the page in the pagination, from 0.
+            quick (str): The quick fingerprint of the page as it is now, None if there is none.
+
+        Returns:
+            - (headers, rows), or None if the page has to be extracted
+        """
+        page = self.baseline.get(page_index)
+        if quick is None or page is None or page['quick'] != quick:
+            return None
+        self._save(page_index, dict(page))
+        self.skipped += 1
+        METRICS.inc('table_pages_total', result='skipped')
+        return page['headers'], list(page['rows'])
+
+    def record(self, page_index, headers, rows, quick=None):
+        """
+        Records a page that was extracted completely.
+
+        Args:
+            page_index (int): Index of the page in the pagination, from 0.
+            headers (list): Headers of the table.
+            rows (list): The data rows of the page.
+            quick (str): The quick fingerprint of the page, if the scraper has one.
+        """
+        ids, digest = page_fingerprint(rows, self.id_column)
+        self._save(page_index, {'headers': headers, 'rows': list(rows), 'ids': ids, 'hash': digest, 'quick': quick})
+        self.extracted += 1
+        METRICS.inc('table_pages_total', result='extracted')
+
+    @property
+    def recorded(self):
+        """
+        True if at least one page of this scrape was recorded.
+        """
+        return bool(self._pages)
+
+    def discard(self):
+        """
+        Forgets the pages recorded so far and their counts, e.g. when the scraper gives up and
+        another one starts over.
+        """
+        self._pages.clear()
+        self.skipped = self.extracted = 0
+        self.checkpoint.reset_table_pages(self.url, keep_run_id=self.baseline_run)
+
+    def _save(self, page_index, page):
+        self._pages[page_index] = page
+        self.checkpoint.save_table_page(self.url, page_index, page)
+
+    def diff(self):
+        """
+        Returns the row-level diff of this scrape against the baseline, see diff_rows().
+
+        Without a baseline every row is added.
+        """
+        previous = [row for _, page in sorted(self.baseline.items()) for row in page['rows']]
+        current = [row for _, page in sorted(self._pages.items()) for row in page['rows']]
+        return diff_rows(previous, current, self.id_column)
+
+    def changed_ids(self):
+        """
+        Returns the IDs of the rows that are new or changed since the baseline.
+        """
+        diff = self.diff()
+        return diff['added'] + diff['changed']
@@ -0,0 +1,262 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains a durable work queue for the distributed fetch mode, backed by SQLite.
+
+A coordinator enqueues one task per user or product ID. Worker processes claim tasks
+in batches under a lease: a claimed task belongs to its worker until the lease expires.
+If a worker dies, its tasks are claimed again by another worker once the lease has
+expired, up to `max_attempts` claims per task. The fetched records are written back
+to the queue, where the merge step reads them.
+
+Workers on this host or on other hosts can share the queue file. It uses SQLite's
+rollback journal (journal_mode=DELETE) instead of WAL, whose shared-memory index only
+works between the processes of one host, so every access is coordinated by the locks
+of the file itself and every claim runs in an immediate transaction. A file system
+shared by several hosts must support these locks (e.g. NFSv4 or SMB with locking
+enabled), and the clocks of the hosts must be in sync because the leases use wall time.
+
+The coordinator also stores the inputs the merge step needs (the scraped clients and
+the carts) in the queue, so every step only needs the path of the queue file.
+
+Task states:
+- pending: waiting to be claimed (again).
+- leased: claimed by a worker until `lease_expires`.
+- done: the record was fetched and stored in `result`.
+- failed: the record could not be fetched in `max_attempts` claims.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+# Constants
+DEFAULT_QUEUE_PATH = 'work_queue.sqlite'
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BATCH_SIZE = 20
+
+# Task states
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+STATES = (PENDING, LEASED, DONE, FAILED)
+
+
+class WorkQueue:
+    """
+    Stores tasks by kind ('user', 'product') and ID and hands them out to workers under leases.
+
+    Every process, on this host or on another one, opens its own WorkQueue on the same
+    file. The claims run in an immediate transaction, so two workers never lease the
+    same task.
+
+    Args:
+        path (str): Path of the SQLite file.
+        lease_seconds (float): How long a claimed task belongs to its worker.
+        max_attempts (int): How many times a task is claimed before it is marked as failed.
+        timeout (float): Seconds to wait for the lock of another process on the file.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 timeout=30):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=DELETE")  # WAL needs the shared memory of one host
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                kind TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_expires REAL,
+                result TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, task_id)
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS inputs (
+                name TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            """
+        )
+
+    def enqueue(self, kind, task_ids):
+        """
+        Adds a pending task for every ID that is not in the queue yet, so enqueueing
+        twice (e.g. a restarted coordinator) does not fetch anything twice.
+
+        Returns:
+            - The number of tasks added
+        """
+        now = time.time()
+        rows = [(kind, str(task_id), PENDING, now) for task_id in dict.fromkeys(task_ids)]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks (kind, task_id, status, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute("COMMIT")
+        return added
+
+    def claim(self, worker, batch_size=DEFAULT_BATCH_SIZE, kind=None):
+        """
+        Leases up to `batch_size` tasks to `worker`: pending tasks first, then tasks whose
+        lease expired. Expired tasks that were already claimed `max_attempts` times are
+        marked as failed instead.
+
+        Args:
+            worker (str): ID of the claiming worker.
+            batch_size (int): Maximum number of tasks to lease.
+            kind (str): Only claim tasks of this kind.
+
+        Returns:
+            - A list of (kind, task_id) tuples, empty if nothing can be claimed right now
+        """
+        now = time.time()
+        kind_filter, kind_args = ("AND kind = ?", (kind,)) if kind else ("", ())
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    f"UPDATE tasks SET status = ?, worker = NULL, lease_expires = NULL, updated_at = ?, "
+                    f"error = COALESCE(error, 'Lease expired') "
+                    f"WHERE status = ? AND lease_expires < ? AND attempts >= ? {kind_filter}",
+                    (FAILED, now, LEASED, now, self.max_attempts) + kind_args,
+                )
+                rows = self._conn.execute(
+                    f"SELECT kind, task_id FROM tasks "
+                    f"WHERE (status = ? OR (status = ? AND lease_expires < ?)) {kind_filter} "
+                    f"ORDER BY status != ?, updated_at LIMIT ?",
+                    (PENDING, LEASED, now) + kind_args + (PENDING, batch_size),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE kind = ? AND task_id = ?",
+                    [(LEASED, worker, now + self.lease_seconds, now, row[0], row[1]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def complete(self, kind, task_id, worker, record):
+        """
+        Stores the fetched record of a leased task and marks it as done.
+
+        Returns:
+            - False if the task is no longer leased to `worker` (its lease expired and
+              another worker claimed it), in which case nothing is stored
+        """
+        with self._lock:
+            return self._finish(kind, task_id, worker, DONE, result=json.dumps(record))
+
+    def fail(self, kind, task_id, worker, error):
+        """
+        Releases a leased task that could not be fetched. It is claimed again, or marked
+        as failed once it was claimed `max_attempts` times.
+
+        The attempts are read and the task is updated in one immediate transaction, so no
+        other worker can claim the task in between.
+
+        Returns:
+            - False if the task is no longer leased to `worker`
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT attempts FROM tasks WHERE kind = ? AND task_id = ?", (kind, str(task_id))
+                ).fetchone()
+                status = FAILED if row is not None and row[0] >= self.max_attempts else PENDING
+                finished = self._finish(kind, task_id, worker, status, error=str(error))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return finished
+
+    def _finish(self, kind, task_id, worker, status, result=None, error=None):
+        """
+        Moves a task leased to `worker` to `status`; the caller holds the lock.
+        """
+        cursor = self._conn.execute(
+            "UPDATE tasks SET status = ?, result = COALESCE(?, result), error = ?, worker = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE kind = ? AND task_id = ? AND status = ? AND worker = ?",
+            (status, result, error, time.time(), kind, str(task_id), LEASED, worker),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self):
+        """
+        Returns the number of tasks of every kind in every state.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status").fetchall()
+        summary = {}
+        for kind, status, count in rows:
+            summary.setdefault(kind, dict.fromkeys(STATES, 0))[status] = count
+        return summary
+
+    def unfinished(self):
+        """
+        Returns the number of tasks that are pending or leased.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()
+        return row[0]
+
+    def results(self, kind):
+        """
+        Returns the fetched records of a kind, in the order the tasks were enqueued.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM tasks WHERE kind = ? AND status = ? ORDER BY rowid", (kind, DONE)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def failures(self):
+        """
+        Returns the failed tasks as dicts with kind, task_id, attempts and error.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, task_id, attempts, error FROM tasks WHERE status = ? ORDER BY rowid", (FAILED,)
+            ).fetchall()
+        return [{'kind': kind, 'task_id': task_id, 'attempts': attempts, 'error': error}
+                for kind, task_id, attempts, error in rows]
+
+    def put_input(self, name, value):
+        """
+        Stores a JSON serialisable input of the merge step, e.g. the scraped clients.
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO inputs (name, data) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def get_input(self, name):
+        """
+        Returns a stored input, or None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM inputs WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
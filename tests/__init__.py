@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The modules in src import each other by their plain names, as main.py does when run
+# from src. The tests import them the same way (`from data_fetcher import ...`, never
+# `src.data_fetcher`), so every module and its singletons (API_CLIENT, METRICS,
+# LOOKUP_CACHE) is loaded once.
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
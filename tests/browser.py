@@ -0,0 +1,28 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: Helpers for the tests that need a real headless Chrome. When Chrome or its
+driver is not installed, the tests using them are skipped instead of failing.
+"""
+
+import unittest
+
+
+def start_headless_chrome():
+    """
+    Starts a headless Chrome WebDriver.
+
+    Raises:
+        unittest.SkipTest: If Chrome or chromedriver is not available on this machine.
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    try:
+        return webdriver.Chrome(options=chrome_options)
+    except WebDriverException as error:
+        raise unittest.SkipTest(f"Headless Chrome is not available: {error.msg}")
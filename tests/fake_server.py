@@ -0,0 +1,347 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: A small local stand-in for the Fake Store API, used by the tests and the
+benchmarks so they can run offline. It serves the /carts, /users, /users/{id},
+/products and /products/{id} endpoints from a generated dataset and can add a
+fixed latency to every response. The client table is served as paginated HTML on
+/clients?page=N (or as a JSON feed on /clients/feed). Responses carry an ETag and conditional requests
+with a matching If-None-Match are answered with 304 Not Modified.
+
+To test the retry and pacing paths it can fail a random share of the requests with
+500 (`error_rate`) and throttle the clients like a rate limited API: requests above
+`throttle_rate` per second are answered with 429 and a Retry-After header.
+
+The server can also run on its own, e.g. for main.py --api-url / --clients-url:
+- python -m tests.fake_server --port 8000 --users 1000 --products 200 --carts 5000
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def make_user(user_id):
+    """
+    Builds a user record with the same structure as the Fake Store API.
+    """
+    return {
+        "address": {
+            "geolocation": {"lat": "-37.3159", "long": "81.1496"},
+            "city": "kilcoole",
+            "street": "new road",
+            "number": 7682 + user_id,
+            "zipcode": "12926-3874",
+        },
+        "id": user_id,
+        "email": f"user{user_id}@gmail.com",
+        "username": f"user{user_id}",
+        "password": "m38rmF$",
+        "name": {"firstname": f"first{user_id}", "lastname": f"last{user_id}"},
+        "phone": "1-570-236-7033",
+        "__v": 0,
+    }
+
+
+def make_product(product_id):
+    """
+    Builds a product record with the same structure as the Fake Store API.
+    """
+    return {
+        "id": product_id,
+        "title": f"Product {product_id}",
+        "price": round(9.99 + product_id, 2),
+        "description": f"Description of product {product_id}",
+        "category": "electronics" if product_id % 2 else "jewelery",
+        "image": f"https://fakestoreapi.com/img/{product_id}.jpg",
+        "rating": {"rate": round(1 + (product_id % 40) / 10, 1), "count": 100 + product_id},
+    }
+
+
+def make_cart(cart_id, users, products):
+    """
+    Builds a cart record with the same structure as the Fake Store API.
+    """
+    return {
+        "id": cart_id,
+        "userId": (cart_id - 1) % users + 1,
+        "date": f"2020-03-{(cart_id - 1) % 28 + 1:02d}T00:00:00.000Z",
+        "products": [
+            {"productId": (cart_id + offset) % products + 1, "quantity": offset + 1}
+            for offset in range(3)
+        ],
+        "__v": 0,
+    }
+
+
+CLIENT_HEADERS = ["ID", "Age", "Occupation", "Account Status", "Last Login", "Account Balance"]
+OCCUPATIONS = ["Engineer", "Teacher", "Doctor", "Artist", "Lawyer", "Nurse"]
+
+
+def make_client(client_id):
+    """
+    Builds a row of the client table, with the same columns and formats as the store page
+    (the balance is shown like '$2,340.50').
+    """
+    return [
+        str(client_id),
+        str(20 + client_id % 50),
+        OCCUPATIONS[client_id % len(OCCUPATIONS)],
+        "Active" if client_id % 3 else "Inactive",
+        f"2024-{client_id % 12 + 1:02d}-{client_id % 28 + 1:02d} 10:{client_id % 60:02d}:00",
+        f"${1000 + client_id * 37.5:,.2f}",
+    ]
+
+
+def render_clients_page(clients, page_count=1, current_page=1):
+    """
+    Renders a static HTML page with the client table and its pagination links.
+    """
+    header_cells = "".join(f"<th>{html.escape(header)}</th>" for header in CLIENT_HEADERS)
+    body_rows = "\n".join(
+        "      <tr>" + "".join(f"<td>{html.escape(value)}</td>" for value in client) + "</tr>"
+        for client in clients
+    )
+    links = " ".join(
+        f'<a href="?page={page}" class="{"active" if page == current_page else ""}">{page}</a>'
+        for page in range(1, page_count + 1)
+    )
+    return (
+        "<!DOCTYPE html>\n<html>\n<head><title>Clients</title></head>\n<body>\n"
+        '  <table id="userTable">\n'
+        f"    <thead><tr>{header_cells}</tr></thead>\n"
+        f"    <tbody>\n{body_rows}\n    </tbody>\n"
+        "  </table>\n"
+        f'  <div id="pagination">{links}</div>\n'
+        "</body>\n</html>\n"
+    )
+
+
+# A page whose table is only created by JavaScript, like a single page application
+SCRIPT_RENDERED_PAGE = (
+    "<!DOCTYPE html>\n<html>\n<body>\n  <div id=\"app\">Loading...</div>\n"
+    "  <script src=\"/static/app.js\"></script>\n</body>\n</html>\n"
+)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FakeStoreServer:
+    """
+    Serves a generated Fake Store dataset on a local port in a background thread.
+
+    Use it as a context manager; the root URL of the API is available as `base_url`.
+
+    Args:
+        users (int): Number of users in the dataset.
+        products (int): Number of products in the dataset.
+        carts (int): Number of carts in the dataset.
+        latency (float): Seconds added to every response.
+        flaky_paths (dict): Path -> number of 503 responses served for it before it succeeds.
+        clients (int): Number of rows of the client table served as HTML on /clients.
+        page_size (int): Rows per page of the client table, the page is chosen with ?page=N.
+        clients_mode (str): 'html' serves the table in the HTML, 'script' serves a page that
+            renders the table with JavaScript (no table in the HTML).
+        error_rate (float): Share of the requests (0 to 1) answered with 500.
+        throttle_rate (float): Requests per second served before the server answers 429 with
+            a Retry-After header, None for no throttling.
+        throttle_burst (int): Requests that can be served at once before the throttling starts.
+        seed (int): Seed of the random errors, so a run can be repeated.
+        port (int): Port to listen on, 0 picks a free one.
+    """
+
+    def __init__(self, users=10, products=20, carts=20, latency=0.0, flaky_paths=None, clients=30, page_size=10,
+                 clients_mode="html", error_rate=0.0, throttle_rate=None, throttle_burst=10, seed=0, port=0):
+        self.clients = clients
+        self.clients_mode = clients_mode
+        self.page_size = page_size
+        self.users = users
+        self.products = products
+        self.carts = carts
+        self.latency = latency
+        self.flaky_paths = dict(flaky_paths or {})
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.throttle_burst = max(1, throttle_burst)
+        self.port = port
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.error_count = 0
+        self.throttled_count = 0
+        self._random = random.Random(seed)
+        self._tokens = float(self.throttle_burst)
+        self._refilled_at = time.monotonic()
+        self.client_addresses = set()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def clients_url(self):
+        return f"{self.base_url}/clients"
+
+    def client_rows(self):
+        return [make_client(client_id) for client_id in range(1, self.clients + 1)]
+
+    def stats(self):
+        """
+        Returns the request counters of the server.
+        """
+        with self._lock:
+            return {"requests": self.request_count, "not_modified": self.not_modified_count,
+                    "errors": self.error_count, "throttled": self.throttled_count}
+
+    def _throttle(self):
+        """
+        Takes a token of the throttling bucket. Must be called with the lock held.
+
+        Returns:
+            - None if the request can be served, otherwise the seconds until the next token
+        """
+        if self.throttle_rate is None:
+            return None
+        now = time.monotonic()
+        self._tokens = min(self.throttle_burst, self._tokens + (now - self._refilled_at) * self.throttle_rate)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        return (1 - self._tokens) / self.throttle_rate
+
+    def route(self, path):
+        """
+        Returns the status code and body for the requested path. Lists and dicts are
+        served as JSON, strings as HTML.
+        """
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["clients", "feed"]:
+            return 200, [dict(zip(CLIENT_HEADERS, row)) for row in self.client_rows()]
+        if parts == ["clients"] and self.clients_mode == "script":
+            return 200, SCRIPT_RENDERED_PAGE
+        if parts == ["clients"]:
+            query = parse_qs(urlsplit(path).query)
+            page_count = max(1, -(-self.clients // self.page_size))
+            page = min(max(1, int(query.get("page", ["1"])[0])), page_count)
+            rows = self.client_rows()[(page - 1) * self.page_size:page * self.page_size]
+            return 200, render_clients_page(rows, page_count, page)
+        if parts == ["carts"]:
+            return 200, [make_cart(cart_id, self.users, self.products) for cart_id in range(1, self.carts + 1)]
+        if parts == ["users"]:
+            return 200, [make_user(user_id) for user_id in range(1, self.users + 1)]
+        if parts == ["products"]:
+            return 200, [make_product(product_id) for product_id in range(1, self.products + 1)]
+        if len(parts) == 2 and parts[1].isdigit():
+            record_id = int(parts[1])
+            if parts[0] == "users" and 1 <= record_id <= self.users:
+                return 200, make_user(record_id)
+            if parts[0] == "products" and 1 <= record_id <= self.products:
+                return 200, make_product(record_id)
+        return 404, {"error": "not found"}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+                    server.client_addresses.add(self.client_address)
+                    flaky = server.flaky_paths.get(self.path, 0) > 0
+                    if flaky:
+                        server.flaky_paths[self.path] -= 1
+                    retry_after = server._throttle()
+                    failed = retry_after is None and server._random.random() < server.error_rate
+                    server.throttled_count += retry_after is not None
+                    server.error_count += failed
+                if server.latency:
+                    time.sleep(server.latency)
+                if flaky:
+                    status, body = 503, {"error": "unavailable"}
+                elif retry_after is not None:
+                    status, body = 429, {"error": "too many requests"}
+                elif failed:
+                    status, body = 500, {"error": "internal server error"}
+                else:
+                    status, body = server.route(self.path)
+                if isinstance(body, str):
+                    payload, content_type = body.encode(), "text/html; charset=utf-8"
+                else:
+                    payload, content_type = json.dumps(body).encode(), "application/json"
+                etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified_count += 1
+                    status, payload = 304, b""
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("ETag", etag)
+                if retry_after is not None:
+                    self.send_header("Retry-After", f"{retry_after:.3f}")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = _Server(("127.0.0.1", self.port), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a generated Fake Store dataset locally.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--carts", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=30)
+    parser.add_argument("--page-size", type=int, default=10, help="Rows per page of the client table")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of the requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=None, help="Requests per second before 429 responses")
+    args = parser.parse_args()
+
+    server = FakeStoreServer(users=args.users, products=args.products, carts=args.carts, latency=args.latency,
+                             clients=args.clients, page_size=args.page_size, error_rate=args.error_rate,
+                             throttle_rate=args.throttle_rate, port=args.port)
+    with server:
+        print(f"API on {server.base_url}, client table on {server.clients_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("Requests: ", server.stats())
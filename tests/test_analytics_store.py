@@ -0,0 +1,124 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the analytics_store module. The report views
+are compared with the metrics computed by cart_metrics on the same data.
+"""
+
+import os
+import tempfile
+import unittest
+from analytics_store import AnalyticsStore
+from cart_metrics import cart_lines, product_sales
+from tests.fake_server import make_cart, make_client, make_product, make_user, CLIENT_HEADERS
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+USERS = [make_user(user_id) for user_id in range(1, 9)]
+PRODUCTS = [make_product(product_id) for product_id in range(1, 12)]
+CARTS = [make_cart(cart_id, users=6, products=10) for cart_id in range(1, 31)]
+CLIENTS = [make_client(client_id) for client_id in range(3, 13)]  # Clients 9 to 12 have no user
+
+
+def load(store, chunk_size=4):
+    store.load_clients(CLIENT_HEADERS, CLIENTS, chunk_size=chunk_size)
+    store.load_users(list(USERS[0]), USERS, chunk_size=chunk_size)
+    store.load_carts(iter(CARTS), chunk_size=chunk_size)
+    store.load_products(list(PRODUCTS[0]), PRODUCTS, chunk_size=chunk_size)
+    store.create_views()
+    return store
+
+
+class TestAnalyticsStore(unittest.TestCase):
+    """
+    Test suite for AnalyticsStore with the SQLite backend.
+
+    """
+    def setUp(self):
+        self.store = load(AnalyticsStore(':memory:'))
+        self.addCleanup(self.store.close)
+
+    def test_cart_lines_are_loaded(self):
+        count = self.store.query("SELECT COUNT(*) AS lines FROM cart_lines")['lines'][0]
+        self.assertEqual(count, sum(len(cart['products']) for cart in CARTS))
+
+    def test_combined_user_data(self):
+        """
+        Test the outer join of users and clients and the cart counts.
+
+        """
+        combined = self.store.query("SELECT * FROM combined_user_data").set_index('id')
+
+        self.assertEqual(len(combined), 12)  # 8 users and 4 clients without a user
+        self.assertEqual(combined.loc['1', 'cart_count'], 5)
+        self.assertEqual(combined.loc['7', 'cart_count'], 0)
+        self.assertEqual(combined.loc['3', 'Occupation'], make_client(3)[2])
+        self.assertEqual(combined.loc['12', 'Age'], make_client(12)[1])
+        self.assertEqual(combined.loc['2', 'address'], USERS[1]['address'])  # Decoded from JSON
+        self.assertNotIn('ID', combined.columns)
+
+    def test_product_data_matches_cart_metrics(self):
+        products = self.store.query("SELECT * FROM product_data").set_index('id')
+        prices = products['price']
+        expected = product_sales(cart_lines(CARTS), prices=prices)
+
+        sold = products.loc[expected.index]
+        self.assertEqual(sold['total_sold'].tolist(), expected['total_sold'].tolist())
+        self.assertEqual(sold['unique_users_count'].tolist(), expected['unique_users_count'].tolist())
+        self.assertEqual(sold['revenue'].tolist(), expected['revenue'].tolist())
+        self.assertEqual(products.loc[11, 'unique_users_count'], 0)  # Never sold
+        self.assertEqual(products.loc[1, 'rating'], PRODUCTS[0]['rating'])
+
+    def test_ad_hoc_query(self):
+        rows = self.store.query(
+            "SELECT userId, SUM(quantity) AS items FROM cart_lines WHERE userId = ? GROUP BY userId", (2,)
+        )
+        self.assertEqual(rows['items'][0], sum(6 for cart in CARTS if cart['userId'] == 2))
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_export_in_chunks(self):
+        """
+        Test that the view is written to Parquet in chunks, with the nested fields typed.
+
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path, = self.store.export_view("product_data", formats=('parquet',), output_dir=directory,
+                                           run_date=False, chunk_size=4)
+            parquet = pq.ParquetFile(path)
+            self.assertEqual(parquet.metadata.num_row_groups, 3)
+            self.assertEqual(parquet.read().column('rating').to_pylist(), [product['rating'] for product in PRODUCTS])
+
+    def test_store_file_is_reopened(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "analytics.sqlite")
+            load(AnalyticsStore(path)).close()
+            with AnalyticsStore(path) as store:
+                users = store.query("SELECT * FROM users ORDER BY id")
+            self.assertEqual(users['name'][0], USERS[0]['name'])
+
+
+@unittest.skipIf(duckdb is None, "duckdb is not installed")
+class TestDuckDbBackend(unittest.TestCase):
+    """
+    Test suite for AnalyticsStore with the DuckDB backend.
+
+    """
+    def test_same_reports_as_sqlite(self):
+        with AnalyticsStore(':memory:') as sqlite_store, AnalyticsStore(':memory:', backend='duckdb') as duckdb_store:
+            for store in (sqlite_store, duckdb_store):
+                load(store)
+            query = "SELECT id, cart_count FROM combined_user_data ORDER BY id"
+            self.assertEqual(sqlite_store.query(query).values.tolist(), duckdb_store.query(query).values.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the async fetch mode of the data_fetcher
+module and the TokenBucket used to pace it. The tests run against the local
+FakeStoreServer so they do not need network access.
+"""
+
+import asyncio
+import time
+import unittest
+from data_fetcher import fetch_user_details_async, fetch_product_details_async, fetch_user_details
+from pacing import TokenBucket
+from http_client import ApiClient
+from models import Product, User
+from tests.fake_server import FakeStoreServer
+
+
+class TestTokenBucket(unittest.TestCase):
+    """
+    Test suite for the TokenBucket class.
+
+    """
+    def test_rate_is_respected(self):
+        """
+        Test that 11 acquisitions at 100 requests per second take at least 0.1 seconds.
+
+        """
+        bucket = TokenBucket(rate=100)
+        start = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_no_rate_means_no_wait(self):
+        """
+        Test that a bucket without a rate never asks the caller to wait.
+
+        """
+        bucket = TokenBucket(rate=None)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+
+
+class TestFetchDetailsAsync(unittest.TestCase):
+    """
+    Test suite for fetch_user_details_async and fetch_product_details_async.
+
+    """
+    def test_user_details_keep_input_order(self):
+        """
+        Test that users are returned in the input order, skipping unknown IDs.
+
+        """
+        users = [[5], [2], [99], [7], [1]]
+        with FakeStoreServer(users=10, latency=0.01) as server:
+            headers, user_details = asyncio.run(
+                fetch_user_details_async(users, concurrency=4, client=ApiClient(server.base_url), bulk_threshold=None)
+            )
+
+        self.assertEqual([user["id"] for user in user_details], [5, 2, 7, 1])
+        self.assertIn("id", headers)
+        self.assertIn("name", headers)
+
+    def test_same_shape_as_sync_fetch(self):
+        """
+        Test that the async fetch returns exactly what the sync fetch returns.
+
+        """
+        users = [[3], [1], [2]]
+        with FakeStoreServer(users=5) as server:
+            async_result = asyncio.run(fetch_user_details_async(users, client=ApiClient(server.base_url), bulk_threshold=None))
+            sync_result = fetch_user_details(users, client=ApiClient(server.base_url), bulk_threshold=None)
+
+        self.assertEqual(async_result, sync_result)
+
+    def test_product_details(self):
+        """
+        Test that every unique product of the carts is fetched once.
+
+        """
+        carts = [
+            {'products': [{'productId': 1}, {'productId': 2}]},
+            {'products': [{'productId': 2}, {'productId': 3}]}
+        ]
+        with FakeStoreServer(products=5) as server:
+            headers, product_details = asyncio.run(
+                fetch_product_details_async(carts, client=ApiClient(server.base_url), bulk_threshold=None)
+            )
+            self.assertEqual(server.request_count, 3)
+
+        self.assertEqual(sorted(product["id"] for product in product_details), [1, 2, 3])
+        self.assertIn("title", headers)
+
+    def test_rate_limits_the_fetch(self):
+        """
+        Test that 11 requests at 100 requests per second take at least 0.1 seconds, even with a free client.
+
+        """
+        users = [[user_id] for user_id in range(1, 12)]
+        with FakeStoreServer(users=11) as server:
+            start = time.monotonic()
+            _, user_details = asyncio.run(
+                fetch_user_details_async(users, concurrency=4, rate=100, client=ApiClient(server.base_url),
+                                         bulk_threshold=None)
+            )
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(len(user_details), 11)
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_typed_records(self):
+        """
+        Test that typed=True returns the same records as the sync fetch, on the per-ID and the bulk path.
+
+        """
+        users = [[2], [1]]
+        carts = [{'products': [{'productId': 1}, {'productId': 3}]}]
+        with FakeStoreServer(users=5, products=5) as server:
+            for bulk_threshold in (None, 1):
+                client = ApiClient(server.base_url)
+                headers, user_details = asyncio.run(
+                    fetch_user_details_async(users, client=client, bulk_threshold=bulk_threshold, typed=True)
+                )
+                self.assertEqual(headers, list(User.HEADERS))
+                self.assertEqual([user.id for user in user_details], [2, 1])
+                self.assertEqual((headers, user_details),
+                                 fetch_user_details(users, client=client, bulk_threshold=bulk_threshold, typed=True))
+
+                _, product_details = asyncio.run(
+                    fetch_product_details_async(carts, client=client, bulk_threshold=bulk_threshold, typed=True)
+                )
+                self.assertTrue(all(isinstance(product, Product) for product in product_details))
+                self.assertEqual(sorted(product.id for product in product_details), [1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
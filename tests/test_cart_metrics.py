@@ -0,0 +1,96 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the cart_metrics module (cart_lines,
+product_sales, approx_distinct_counts, basket_sizes, daily_sales).
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from cart_metrics import cart_lines, product_sales, approx_distinct_counts, basket_sizes, daily_sales
+from tests.fake_server import make_cart
+
+CARTS = [
+    {'id': 1, 'userId': 1, 'date': '2020-03-02T00:00:00.000Z',
+     'products': [{'productId': 1, 'quantity': 4}, {'productId': 2, 'quantity': 1}]},
+    {'id': 2, 'userId': 1, 'date': '2020-03-02T10:00:00.000Z',
+     'products': [{'productId': 1, 'quantity': 2}]},
+    {'id': 3, 'userId': 2, 'date': '2020-03-05T00:00:00.000Z',
+     'products': [{'productId': 1, 'quantity': 1}, {'productId': 3, 'quantity': 6}]},
+    {'id': 4, 'userId': 3, 'date': '2020-03-05T00:00:00.000Z', 'products': []},
+]
+PRICES = pd.Series({1: 10.0, 2: 2.5, 3: 1.25})
+
+
+def loop_sales(cart_data):
+    """
+    The loop based counts that save_product_data_to_excel used before cart_metrics.
+    """
+    sold, users = {}, {}
+    for cart in cart_data:
+        for product in cart['products']:
+            sold[product['productId']] = sold.get(product['productId'], 0) + product['quantity']
+            users.setdefault(product['productId'], set()).add(cart['userId'])
+    return sold, {product_id: len(user_ids) for product_id, user_ids in users.items()}
+
+
+class TestCartMetrics(unittest.TestCase):
+    """
+    Test suite for the cart metrics.
+
+    """
+    def test_cart_lines(self):
+        lines = cart_lines(CARTS)
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines['productId'].tolist(), [1, 2, 1, 1, 3])
+        self.assertEqual(lines['cart_id'].tolist(), [1, 1, 2, 3, 3])
+
+    def test_product_sales_match_the_loops(self):
+        """
+        Test that the grouped metrics are the same as the old loops, on a larger set of carts.
+
+        """
+        carts = [make_cart(cart_id, users=17, products=23) for cart_id in range(1, 500)]
+        sold, unique_users = loop_sales(carts)
+
+        sales = product_sales(cart_lines(carts))
+        self.assertEqual(sales['total_sold'].to_dict(), sold)
+        self.assertEqual(sales['unique_users_count'].to_dict(), unique_users)
+
+    def test_revenue(self):
+        sales = product_sales(cart_lines(CARTS), prices=PRICES)
+        self.assertEqual(sales['revenue'].to_dict(), {1: 70.0, 2: 2.5, 3: 7.5})
+
+    def test_approximate_distinct_counts(self):
+        """
+        Test that the HyperLogLog estimate is exact for small counts and close for large ones.
+
+        """
+        self.assertEqual(product_sales(cart_lines(CARTS), approximate=True)['unique_users_count'].to_dict(),
+                         {1: 2, 2: 1, 3: 1})
+
+        rng = np.random.default_rng(7)
+        keys = rng.integers(0, 3, 300_000)
+        values = rng.integers(0, 50_000, 300_000)
+        exact = pd.Series(values).groupby(keys).nunique()
+        estimate = approx_distinct_counts(pd.Series(keys), pd.Series(values))
+        self.assertLess(((estimate - exact).abs() / exact).max(), 0.05)
+
+    def test_basket_sizes(self):
+        baskets = basket_sizes(cart_lines(CARTS)).set_index('userId')
+        self.assertEqual(baskets.loc[1].tolist(), [2, 7, 3.5])
+        self.assertEqual(baskets.loc[2].tolist(), [1, 7, 7.0])
+        self.assertNotIn(3, baskets.index)  # Empty carts have no lines
+
+    def test_daily_sales(self):
+        daily = daily_sales(cart_lines(CARTS), prices=PRICES)
+        self.assertEqual([str(day.date()) for day in daily['date']], ['2020-03-02', '2020-03-05'])
+        self.assertEqual(daily['carts'].tolist(), [2, 1])
+        self.assertEqual(daily['items'].tolist(), [7, 7])
+        self.assertEqual(daily['revenue'].tolist(), [62.5, 17.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
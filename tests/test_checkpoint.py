@@ -0,0 +1,162 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the CheckpointStore of the checkpoint module
+and the checkpointed fetchers of the data_fetcher module. The fetcher tests run against
+the local FakeStoreServer.
+"""
+
+import os
+import tempfile
+import unittest
+from checkpoint import CheckpointStore, RunLockedError, NEW, CHANGED, UNCHANGED
+from data_fetcher import fetch_user_details_checkpointed, fetch_product_details_checkpointed
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer
+
+
+class TestCheckpointStore(unittest.TestCase):
+    """
+    Test suite for the CheckpointStore class.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "checkpoint.sqlite")
+
+    def test_content_hash_detects_changes(self):
+        """
+        Test that saving reports whether a record is new, changed or unchanged.
+
+        """
+        store = CheckpointStore(self.path)
+        store.start_run()
+        self.assertEqual(store.save("user", 1, {"id": 1, "email": "a"}), NEW)
+        self.assertEqual(store.save("user", "1", {"email": "a", "id": 1}), UNCHANGED)
+        self.assertEqual(store.save("user", 1, {"id": 1, "email": "b"}), CHANGED)
+        self.assertEqual(store.get("user", 1), {"id": 1, "email": "b"})
+        self.assertEqual(store.stats(), {"user": {NEW: 1, CHANGED: 1, UNCHANGED: 1}})
+
+    def test_unfinished_run_is_resumed(self):
+        """
+        Test that a run that did not finish is resumed by the next store, a finished one is not.
+
+        """
+        crashed = CheckpointStore(self.path)
+        run_id = crashed.start_run()
+        crashed.save("user", 1, {"id": 1})
+        crashed.close()
+
+        resumed = CheckpointStore(self.path)
+        self.assertEqual(resumed.start_run(), run_id)
+        self.assertTrue(resumed.resumed)
+        self.assertEqual(resumed.ids_to_skip("user"), {"1"})
+        resumed.finish_run()
+
+        next_run = CheckpointStore(self.path)
+        self.assertNotEqual(next_run.start_run(), run_id)
+        self.assertFalse(next_run.resumed)
+        self.assertEqual(next_run.ids_to_skip("user"), set())
+        self.assertEqual(next_run.ids_to_skip("user", incremental=True), {"1"})
+
+    def test_run_of_a_live_process_is_not_resumed(self):
+        """
+        Test that a run is not resumed while its store is held, and is once the holder is gone.
+
+        """
+        running = CheckpointStore(self.path)
+        run_id = running.start_run()
+        other = CheckpointStore(self.path)
+        self.addCleanup(other.close)
+        with self.assertRaises(RunLockedError) as raised:
+            other.start_run()
+        self.assertIn(str(os.getpid()), str(raised.exception))
+
+        running.close()  # Like a process that died: the lock is released, the run stays open
+        self.assertEqual(other.start_run(), run_id)
+        self.assertTrue(other.resumed)
+
+    def test_saves_are_committed_in_batches(self):
+        """
+        Test that saved records are committed every batch_size records and on flush().
+
+        """
+        store = CheckpointStore(self.path, batch_size=3)
+        store.start_run()
+        reader = CheckpointStore(self.path)
+        self.addCleanup(reader.close)
+        for user_id in (1, 2):
+            store.save("user", user_id, {"id": user_id})
+        self.assertEqual(store.get("user", 2), {"id": 2})  # The writer sees its own batch
+        self.assertIsNone(reader.get("user", 1))
+
+        store.save("user", 3, {"id": 3})
+        store.save("user", 4, {"id": 4})
+        self.assertEqual(reader.get("user", 3), {"id": 3})
+        self.assertIsNone(reader.get("user", 4))
+        store.flush()
+        self.assertEqual(reader.get("user", 4), {"id": 4})
+        store.close()
+
+
+class TestCheckpointedFetchers(unittest.TestCase):
+    """
+    Test suite for fetch_user_details_checkpointed and fetch_product_details_checkpointed.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "checkpoint.sqlite")
+
+    def test_resume_after_crash(self):
+        """
+        Test that a resumed run only fetches the users the crashed run did not store.
+
+        """
+        users = [[str(user_id)] for user_id in range(1, 7)]
+        with FakeStoreServer(users=10) as server:
+            client = ApiClient(server.base_url)
+
+            crashed = CheckpointStore(self.path)
+            crashed.start_run()
+            fetch_user_details_checkpointed(users[:4], crashed, client=client)
+            crashed.close()
+            requests_before = server.request_count
+
+            resumed = CheckpointStore(self.path)
+            resumed.start_run()
+            headers, user_details = fetch_user_details_checkpointed(users, resumed, client=client)
+            self.assertEqual(server.request_count - requests_before, 2)
+
+        self.assertEqual([user["id"] for user in user_details], [1, 2, 3, 4, 5, 6])
+        self.assertIn("address", headers)
+
+    def test_incremental_only_fetches_new_ids(self):
+        """
+        Test that an incremental run only fetches product IDs that are new since the last successful run.
+
+        """
+        first_carts = [{'products': [{'productId': 1}, {'productId': 2}]}]
+        second_carts = [{'products': [{'productId': 2}, {'productId': 3}]}]
+        with FakeStoreServer(products=5) as server:
+            client = ApiClient(server.base_url)
+
+            first = CheckpointStore(self.path)
+            first.start_run()
+            fetch_product_details_checkpointed(first_carts, first, client=client)
+            first.finish_run()
+            requests_before = server.request_count
+
+            second = CheckpointStore(self.path)
+            second.start_run()
+            _, products = fetch_product_details_checkpointed(second_carts, second, incremental=True, client=client)
+            self.assertEqual(server.request_count - requests_before, 1)
+
+        self.assertEqual(sorted(product["id"] for product in products), [2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the columnar sinks of the sinks module
+(ParquetSink, ArrowIpcSink) and the output formats of save_data. They are skipped when
+the optional pyarrow package is not installed.
+"""
+
+import datetime
+import os
+import tempfile
+import unittest
+from sinks import ParquetSink, ArrowIpcSink, partition_path
+from save_data import save_frame, save_product_data_to_excel
+from tests.fake_server import make_product, make_user
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestColumnarSinks(unittest.TestCase):
+    """
+    Test suite for ParquetSink and ArrowIpcSink.
+
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_parquet_keeps_nested_values_typed(self):
+        """
+        Test that nested dicts are written as structs and read back unchanged.
+
+        """
+        users = [make_user(user_id) for user_id in range(1, 8)]
+        path = os.path.join(self.tmp.name, "users.parquet")
+        with ParquetSink(path, chunk_size=3, compression='zstd') as sink:
+            sink.write_all(users)
+
+        table = pq.read_table(path)
+        self.assertTrue(pa.types.is_struct(table.schema.field('address').type))
+        self.assertEqual(table.to_pylist(), users)
+        self.assertEqual(pq.ParquetFile(path).metadata.num_row_groups, 3)
+        self.assertEqual(pq.ParquetFile(path).metadata.row_group(0).column(0).compression, 'ZSTD')
+
+    def test_arrow_ipc_round_trip(self):
+        """
+        Test that the Arrow file contains one record batch per chunk and the same records.
+
+        """
+        products = [make_product(product_id) for product_id in range(1, 6)]
+        path = os.path.join(self.tmp.name, "products.arrow")
+        with ArrowIpcSink(path, chunk_size=2) as sink:
+            sink.write_all(products)
+
+        with pa.OSFile(path, 'rb') as file:
+            reader = pa.ipc.open_file(file)
+            self.assertEqual(reader.num_record_batches, 3)
+            self.assertEqual(reader.read_all().to_pylist(), products)
+
+    def test_integers_widen_to_floats(self):
+        """
+        Test that a float after chunks of integers widens the schema instead of being truncated, in both formats.
+
+        """
+        records = [{"price": 695, "rating": {"rate": 3, "count": 10}, "note": None},
+                   {"price": 109.95, "rating": {"rate": 3.5, "count": 12}, "note": "new"},
+                   {"price": 22, "rating": {"rate": 4, "count": 1}, "note": None}]
+        parquet_path = os.path.join(self.tmp.name, "products.parquet")
+        arrow_path = os.path.join(self.tmp.name, "products.arrow")
+        for sink in (ParquetSink(parquet_path, chunk_size=1), ArrowIpcSink(arrow_path, chunk_size=1)):
+            with sink:
+                sink.write_all(records)
+            self.assertTrue(pa.types.is_floating(sink.schema.field("price").type))
+
+        self.assertEqual(pq.read_table(parquet_path).to_pylist(), records)
+        self.assertEqual(pq.ParquetFile(parquet_path).metadata.num_row_groups, 3)
+        with pa.OSFile(arrow_path, 'rb') as file:
+            self.assertEqual(pa.ipc.open_file(file).read_all().to_pylist(), records)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["products.arrow", "products.parquet"])
+
+    def test_conflicting_types_are_rejected(self):
+        """
+        Test that a value that does not fit the schema raises instead of being converted.
+
+        """
+        with self.assertRaises(pa.ArrowInvalid):
+            with ParquetSink(os.path.join(self.tmp.name, "x.parquet"), chunk_size=1) as sink:
+                sink.write_all([{"price": 1}, {"price": "free"}])
+
+    def test_unknown_compression_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ParquetSink(os.path.join(self.tmp.name, "x.parquet"), compression='rar')
+
+    def test_partition_path(self):
+        path = partition_path("out", "product_data", "parquet", datetime.date(2024, 8, 9))
+        self.assertEqual(path, os.path.join("out", "product_data", "run_date=2024-08-09", "product_data.parquet"))
+        self.assertEqual(partition_path("out", "x", "arrow", False), os.path.join("out", "x.arrow"))
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestSaveFormats(unittest.TestCase):
+    """
+    Test suite for the output formats of save_data.
+
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_product_data_as_parquet_and_arrow(self):
+        """
+        Test that the product data is written partitioned by run date, with a typed rating.
+
+        """
+        products = [make_product(product_id) for product_id in (1, 2, 3)]
+        headers = list(products[0].keys())
+        carts = [{'userId': 1, 'products': [{'productId': 1, 'quantity': 2}, {'productId': 3, 'quantity': 1}]},
+                 {'userId': 2, 'products': [{'productId': 1, 'quantity': 1}]}]
+        run_date = datetime.date(2024, 8, 9)
+
+        save_product_data_to_excel(carts, [list(product.values()) for product in products], headers,
+                                   formats=('parquet', 'arrow'), output_dir=self.tmp.name, run_date=run_date)
+
+        partition = os.path.join(self.tmp.name, "product_data", "run_date=2024-08-09")
+        table = pq.read_table(os.path.join(partition, "product_data.parquet"))
+        self.assertTrue(pa.types.is_struct(table.schema.field('rating').type))
+        rows = {row['id']: row for row in table.to_pylist()}
+        self.assertEqual(rows[1]['total_sold'], 3)
+        self.assertEqual(rows[1]['unique_users_count'], 2)
+        self.assertEqual(rows[2]['rating'], products[1]['rating'])
+        self.assertTrue(os.path.exists(os.path.join(partition, "product_data.arrow")))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "product_data.xlsx")))
+
+    def test_missing_nested_values_become_nulls(self):
+        """
+        Test that missing values of a column of dicts (e.g. after an outer merge) are written as nulls.
+
+        """
+        import pandas as pd
+        df = pd.DataFrame({'id': ['1', '2'], 'address': [{'city': 'kilcoole'}, float('nan')]})
+        path, = save_frame(df, "users", formats=('parquet',), output_dir=self.tmp.name, run_date=False)
+
+        self.assertEqual(pq.read_table(path).column('address').to_pylist(), [{'city': 'kilcoole'}, None])
+
+    def test_unknown_format_is_rejected(self):
+        import pandas as pd
+        with self.assertRaises(ValueError):
+            save_frame(pd.DataFrame({'id': [1]}), "x", formats=('csv',), output_dir=self.tmp.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
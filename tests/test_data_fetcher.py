@@ -5,22 +5,61 @@ Date: 09 / 08 / 2024
 Description: This module contains unit tests for the data fetching functions defined in the 
 data_fetcher module. Each test class corresponds to a function being tested and ensures 
 that the returned data adheres to the expected structure and format.
+
+The tests run against the local FakeStoreServer (tests/fake_server.py) instead of the live
+store page and API, so they are fast and work offline. The Selenium test is skipped when
+headless Chrome is not available.
 """
 
 import unittest
-from src.data_fetcher import fetch_store_clients, fetch_user_carts, fetch_user_details, fetch_product_details 
-class TestFetchStoreClients(unittest.TestCase):
+from data_fetcher import fetch_store_clients, fetch_user_carts, fetch_user_details, fetch_product_details 
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer
+from tests.browser import start_headless_chrome
+
+
+class FakeServerTestCase(unittest.TestCase):
+    """
+    Starts one FakeStoreServer per test class and gives every test its own API client.
+
+    """
+    server_options = {}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeStoreServer(**cls.server_options).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.client = ApiClient(self.server.base_url)
+
+    def tearDown(self):
+        self.client.close()
+
+
+class TestFetchStoreClients(FakeServerTestCase):
     """
     Test suite for the fetch_store_clients function.
     
     """
+    server_options = {"clients": 25, "page_size": 10}
+
+    @classmethod
+    def setUpClass(cls):
+        # Skip the suite when no browser is available
+        start_headless_chrome().quit()
+        super().setUpClass()
+
     def test_fetch_store_clients(self):
         """
         Test the fetch_store_clients function to ensure it returns valid data.
         
         """
         # Run the function to fetch store clients
-        headers, clients = fetch_store_clients()
+        headers, clients = fetch_store_clients(self.server.clients_url)
 
         # Check that headers and clients are not empty
         self.assertIsNotNone(headers)
@@ -36,9 +75,10 @@ class TestFetchStoreClients(unittest.TestCase):
         # Check that clients contain data in the expected format
         for client in clients:
             self.assertEqual(len(client), len(headers))  # Each client row should have the same number of columns as headers
+        self.assertEqual(len(clients), 25)  # Rows of every page
 
 
-class TestFetchUserCarts(unittest.TestCase):
+class TestFetchUserCarts(FakeServerTestCase):
     """
     Test suite for the fetch_user_carts function.
     
@@ -49,7 +89,7 @@ class TestFetchUserCarts(unittest.TestCase):
        
         """
         # Run the function to fetch user carts
-        headers, carts = fetch_user_carts()
+        headers, carts = fetch_user_carts(client=self.client)
 
         # Check that headers and carts are not empty
         self.assertIsNotNone(headers)
@@ -67,7 +107,44 @@ class TestFetchUserCarts(unittest.TestCase):
             self.assertEqual(len(cart), len(headers) + 1)  # Each cart should have the same number of columns as headers
 
 
-class TestFetchUserDetails(unittest.TestCase):
+    def test_fetch_user_carts_retries_server_errors(self):
+        """
+        Test that 500 responses are retried until the carts are served.
+
+        """
+        with FakeStoreServer(carts=5, error_rate=0.5, seed=3) as server:
+            client = ApiClient(server.base_url, max_retries=10)
+            client._backoff = lambda attempt: 0.01
+            for _ in range(5):
+                _, carts = fetch_user_carts(client=client)
+                self.assertEqual(len(carts), 5)
+            stats = server.stats()
+
+        self.assertGreater(stats["errors"], 0)
+        self.assertEqual(client.retries, stats["errors"])
+        self.assertEqual(client.failures, [])
+
+    def test_fetch_user_carts_when_throttled(self):
+        """
+        Test that requests above the throttle rate get 429 with a Retry-After header and are retried.
+
+        """
+        with FakeStoreServer(carts=5, throttle_rate=5, throttle_burst=1) as server:
+            client = ApiClient(server.base_url, max_retries=10)
+            client._backoff = lambda attempt: 0.3
+            first = client.get('/carts')
+            throttled = client.session.get(f"{server.base_url}/carts")
+            _, carts = fetch_user_carts(client=client)
+            stats = server.stats()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(throttled.status_code, 429)
+        self.assertGreater(float(throttled.headers["Retry-After"]), 0)
+        self.assertEqual(len(carts), 5)
+        self.assertGreaterEqual(stats["throttled"], 1)
+
+
+class TestFetchUserDetails(FakeServerTestCase):
     """
     Test suite for the fetch_user_details function.
     
@@ -81,7 +158,7 @@ class TestFetchUserDetails(unittest.TestCase):
         users = [[1], [2], [3]]  # small sample testing
         
         # Run the function to fetch user details
-        headers, user_details = fetch_user_details(users)
+        headers, user_details = fetch_user_details(users, client=self.client)
 
         # Check that headers and user details are not empty
         self.assertIsNotNone(headers)
@@ -95,7 +172,7 @@ class TestFetchUserDetails(unittest.TestCase):
             self.assertIn("name", user)
 
 
-class TestFetchProductDetails(unittest.TestCase):
+class TestFetchProductDetails(FakeServerTestCase):
     """
     Test suite for the fetch_product_details function.
     
@@ -112,7 +189,7 @@ class TestFetchProductDetails(unittest.TestCase):
         ]
         
         # Run the function to fetch product details
-        headers, product_details = fetch_product_details(carts)
+        headers, product_details = fetch_product_details(carts, client=self.client)
 
         # Check that headers and product details are not empty
         self.assertIsNotNone(headers)
@@ -0,0 +1,163 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the constant-memory Excel writer XlsxSink,
+the chunked reader iter_xlsx_frames and the row range reader and part merge of the sinks
+module, and for the chunked processing of the Excel files by final_data_filtering.
+"""
+
+import datetime
+import os
+import tempfile
+import unittest
+import pandas as pd
+from openpyxl import load_workbook
+from sinks import XlsxSink, iter_xlsx_frames, iter_xlsx_range, merge_xlsx_parts, xlsx_row_ranges
+from final_data_filtering import process_product_data, process_user_data, flatten_product_frame, flatten_user_frame
+from tests.fake_server import make_product, make_user
+
+
+class TestXlsxSink(unittest.TestCase):
+    """
+    Test suite for XlsxSink and iter_xlsx_frames.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "report.xlsx")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_rows_continue_on_new_sheets(self):
+        """
+        Test that a full sheet is continued on a new sheet with the same header and read back as one table.
+
+        """
+        with XlsxSink(self.path, headers=["id", "value"], max_rows=4, chunk_size=2) as sink:
+            sink.write_all([[row_id, f"v{row_id}"] for row_id in range(1, 8)])
+
+        workbook = load_workbook(self.path, read_only=True)
+        self.assertEqual(workbook.sheetnames, ["Sheet1", "Sheet1_2", "Sheet1_3"])
+        self.assertEqual(next(workbook["Sheet1_2"].iter_rows(values_only=True)), ("id", "value"))
+        workbook.close()
+
+        frames = list(iter_xlsx_frames(self.path, chunk_size=2))
+        self.assertTrue(all(len(frame) <= 2 for frame in frames))
+        read = pd.concat(frames, ignore_index=True)
+        self.assertEqual(read["id"].tolist(), list(range(1, 8)))
+        self.assertEqual(read["value"].tolist(), [f"v{row_id}" for row_id in range(1, 8)])
+
+    def test_row_ranges_are_read_and_merged(self):
+        """
+        Test that the row ranges of a workbook read separately and written to parts at their rows merge
+        back into the same table, also across sheets and with dates and text.
+
+        """
+        rows = [[row_id, f"v&<{row_id}>", datetime.datetime(2024, 8, row_id)] for row_id in range(1, 12)]
+        with XlsxSink(self.path, headers=["id", "value", "seen"], max_rows=5) as sink:
+            sink.write_all(rows)
+
+        ranges = xlsx_row_ranges(self.path, chunk_size=3)
+        self.assertEqual(ranges, [(0, 2, 4), (0, 5, 5), (1, 2, 4), (1, 5, 5), (2, 2, 4)])
+        self.assertEqual(next(iter_xlsx_range(self.path, 1, 5, 5)).values.tolist(),
+                         [[8, "v&<8>", pd.Timestamp(2024, 8, 8)]])
+
+        parts = []
+        for index, (sheet_index, first_row, last_row) in reversed(list(enumerate(ranges))):
+            part = os.path.join(self.directory.name, f"part{index}.xlsx")
+            with XlsxSink(part, first_row=first_row - 1) as sink:
+                for frame in iter_xlsx_range(self.path, sheet_index, first_row, last_row, chunk_size=2):
+                    sink.write_frame(frame)
+            parts.insert(0, (sheet_index, part))
+        merged = os.path.join(self.directory.name, "merged.xlsx")
+        merge_xlsx_parts(parts, merged)
+
+        self.assertEqual(load_workbook(merged, read_only=True).sheetnames, ["Sheet1", "Sheet1_2", "Sheet1_3"])
+        read = pd.concat(iter_xlsx_frames(merged), ignore_index=True)
+        self.assertEqual(read.values.tolist(), pd.concat(iter_xlsx_frames(self.path), ignore_index=True).values.tolist())
+        self.assertEqual(read["seen"].tolist(), [pd.Timestamp(row[2]) for row in rows])
+
+    def test_frame_values(self):
+        """
+        Test that nested values are written as text, missing values as empty cells and dates as dates.
+
+        """
+        frame = pd.DataFrame({
+            "id": pd.array([1, 2], dtype="Int64"),
+            "votes": pd.array([None, 5], dtype="Int64"),
+            "price": [1.5, float("nan")],
+            "rating": [{"rate": 3.9, "count": 120}, None],
+            "date": pd.to_datetime(["2020-03-02T00:00:00Z", None], utc=True),
+        })
+        with XlsxSink(self.path) as sink:
+            sink.write_frame(frame)
+
+        read = pd.read_excel(self.path)
+        self.assertEqual(read["id"].tolist(), [1, 2])
+        self.assertTrue(read.iloc[1].drop(["id", "votes"]).isna().all())
+        self.assertTrue(pd.isna(read["votes"][0]))
+        self.assertEqual(read["rating"][0], "{'rate': 3.9, 'count': 120}")
+        self.assertEqual(read["date"][0], datetime.datetime(2020, 3, 2))
+
+    def test_missing_values_of_records(self):
+        with XlsxSink(self.path, headers=["id", "date", "votes"]) as sink:
+            sink.write_all([{"id": 1, "date": pd.NaT, "votes": pd.NA}, {"id": 2, "date": None, "votes": 5}])
+
+        read = pd.read_excel(self.path)
+        self.assertEqual(read["id"].tolist(), [1, 2])
+        self.assertTrue(read[["date"]].isna().all().all())
+        self.assertTrue(pd.isna(read["votes"][0]))
+
+    def test_same_file_as_to_excel(self):
+        """
+        Test that the streamed workbook reads back like the one of DataFrame.to_excel().
+
+        """
+        products = pd.DataFrame([make_product(product_id) for product_id in range(1, 6)])
+        expected_path = os.path.join(self.directory.name, "expected.xlsx")
+        products.to_excel(expected_path, index=False)
+        with XlsxSink(self.path) as sink:
+            sink.write_frame(products)
+
+        pd.testing.assert_frame_equal(pd.read_excel(self.path), pd.read_excel(expected_path))
+
+
+class TestChunkedProcessing(unittest.TestCase):
+    """
+    Test suite for process_product_data and process_user_data in small chunks.
+
+    """
+    def test_chunks_give_the_whole_file_result(self):
+        """
+        Test that processing the files in chunks gives the same result as flattening them at once.
+
+        """
+        products = pd.DataFrame([make_product(product_id) for product_id in range(1, 12)])
+        users = pd.DataFrame([make_user(user_id) for user_id in range(1, 12)])
+        users["Last Login"] = "2024-08-01 10:00:00"
+        with tempfile.TemporaryDirectory() as directory:
+            product_file = os.path.join(directory, "product_data.xlsx")
+            user_file = os.path.join(directory, "combined_user_data.xlsx")
+            products.to_excel(product_file, index=False)
+            users.to_excel(user_file, index=False)
+            expected_products = flatten_product_frame(pd.read_excel(product_file))
+            expected_users = flatten_user_frame(pd.read_excel(user_file))
+
+            process_product_data(product_file, chunk_size=4)
+            process_user_data(user_file, chunk_size=4)
+
+            processed_products = pd.read_excel(product_file)
+            processed_users = pd.read_excel(user_file)
+            self.assertEqual(sorted(os.listdir(directory)), ["combined_user_data.xlsx", "product_data.xlsx"])
+
+        self.assertEqual(processed_products["votes"].tolist(), expected_products["votes"].tolist())
+        self.assertEqual(processed_products["rating"].tolist(), expected_products["rating"].tolist())
+        self.assertEqual(list(processed_users.columns), list(expected_users.columns))
+        self.assertEqual(processed_users["full_name"].tolist(), expected_users["full_name"].tolist())
+        self.assertEqual(processed_users["Last Login"].tolist(), expected_users["Last Login"].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
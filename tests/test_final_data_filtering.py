@@ -0,0 +1,209 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the flattening of the final_data_filtering
+module (parse_literal, flatten_product_frame, flatten_user_frame) and for the Excel files
+it processes.
+"""
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+from save_data import save_product_data_to_excel
+from unittest import mock
+from final_data_filtering import (parse_literal, flatten_product_frame, flatten_user_frame,
+                                      process_product_data, process_user_data, find_report_files, process_files)
+from tests.fake_server import make_product, make_user
+
+
+class TestParseLiteral(unittest.TestCase):
+    """
+    Test suite for parse_literal.
+
+    """
+    def test_python_and_json_literals(self):
+        self.assertEqual(parse_literal("{'rate': 3.9, 'count': 120}"), {'rate': 3.9, 'count': 120})
+        self.assertEqual(parse_literal('{"rate": 3.9, "count": 120}'), {'rate': 3.9, 'count': 120})
+        self.assertEqual(parse_literal({'rate': 1}), {'rate': 1})
+        self.assertIsNone(parse_literal(float('nan')))
+
+    def test_reprs_that_are_not_plain_json(self):
+        """
+        Test values that cannot be read by only swapping the quotes of the repr.
+
+        """
+        self.assertEqual(parse_literal("{'a': None, 'b': 'x, None}'}"), {'a': None, 'b': 'x, None}'})
+        self.assertEqual(parse_literal("{'name': \"O'Brien\"}"), {'name': "O'Brien"})
+        self.assertEqual(parse_literal("{1: (2, 3)}"), {1: (2, 3)})
+
+    def test_code_is_not_executed(self):
+        """
+        Test that an expression is rejected instead of being evaluated like eval() did.
+
+        """
+        with self.assertRaises(ValueError):
+            parse_literal("__import__('os').getcwd()")
+
+
+class TestFlattening(unittest.TestCase):
+    """
+    Test suite for flatten_product_frame and flatten_user_frame.
+
+    """
+    def test_products_from_dicts_and_strings(self):
+        """
+        Test that in-memory dicts and their repr strings are flattened the same way.
+
+        """
+        products = pd.DataFrame([make_product(product_id) for product_id in (1, 2, 3)])
+        as_text = products.assign(rating=products['rating'].map(str))
+
+        flat = flatten_product_frame(products)
+        pd.testing.assert_frame_equal(flat, flatten_product_frame(as_text))
+        self.assertEqual(flat['votes'].tolist(), [101, 102, 103])
+        self.assertEqual(flat['rating'].tolist(), [1.1, 1.2, 1.3])
+
+    def test_users(self):
+        """
+        Test the address columns and the full name, and that users without details are kept.
+
+        """
+        users = pd.DataFrame([make_user(user_id) for user_id in (1, 2)] + [{'id': '7'}])
+        users['Last Login'] = ['2024-08-01 10:00', '2024-08-02 11:30', None]
+
+        flat = flatten_user_frame(users)
+        self.assertNotIn('address', flat)
+        self.assertNotIn('name', flat)
+        self.assertEqual(flat['Address-city'].tolist()[:2], ['kilcoole', 'kilcoole'])
+        self.assertEqual(flat['Address-latitude'].tolist()[:2], [-37.3159, -37.3159])
+        self.assertEqual(flat['street-number'].tolist()[:2], [7683, 7684])
+        self.assertEqual(flat['full_name'].tolist()[:2], [f"{users['name'][0]['firstname']} {users['name'][0]['lastname']}",
+                                                          f"{users['name'][1]['firstname']} {users['name'][1]['lastname']}"])
+        self.assertTrue(pd.isna(flat['full_name'][2]))
+        self.assertEqual(flat['id'].tolist(), [1, 2, 7])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(flat['Last Login']))
+
+
+    def test_flatten_at_save_time(self):
+        """
+        Test that save_product_data_to_excel(flatten=True) writes the same columns as process_product_data.
+
+        """
+        products = [make_product(product_id) for product_id in (1, 2)]
+        carts = [{'userId': 1, 'products': [{'productId': 2, 'quantity': 4}]}]
+        with tempfile.TemporaryDirectory() as directory:
+            save_product_data_to_excel(carts, [list(product.values()) for product in products], list(products[0]),
+                                       output_dir=directory, flatten=True)
+            saved = pd.read_excel(os.path.join(directory, "product_data.xlsx"))
+
+        self.assertEqual(saved['votes'].tolist(), [101, 102])
+        self.assertEqual(saved['total_sold'].fillna(0).tolist(), [0, 4])
+
+
+class TestProcessExcelFiles(unittest.TestCase):
+    """
+    Test suite for process_product_data and process_user_data on written Excel files.
+
+    """
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            product_file = os.path.join(directory, "product_data.xlsx")
+            user_file = os.path.join(directory, "combined_user_data.xlsx")
+            pd.DataFrame([make_product(product_id) for product_id in (1, 2)]).to_excel(product_file, index=False)
+            pd.DataFrame([make_user(user_id) for user_id in (1, 2)]).to_excel(user_file, index=False)
+
+            process_product_data(product_file)
+            process_user_data(user_file)
+
+            products = pd.read_excel(product_file)
+            users = pd.read_excel(user_file)
+
+        self.assertEqual(products['votes'].tolist(), [101, 102])
+        self.assertEqual(users['Address-zipcode'].tolist(), ['12926-3874', '12926-3874'])
+
+
+
+class TestProcessFiles(unittest.TestCase):
+    """
+    Test suite for process_files on many report files.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.products = pd.DataFrame([make_product(product_id) for product_id in range(1, 26)])
+        self.users = pd.DataFrame([make_user(user_id) for user_id in range(1, 26)])
+
+    def write(self, relative_path, frame):
+        path = os.path.join(self.directory.name, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame.to_excel(path, index=False)
+        return path
+
+    def test_find_report_files(self):
+        """
+        Test that directories are searched recursively, globs are expanded and other files are left out.
+
+        """
+        dated = self.write(os.path.join("runs", "2024-08-09", "product_data.xlsx"), self.products.head(1))
+        suffixed = self.write("combined_user_data_2024-08-10.xlsx", self.users.head(1))
+        self.write("daily_sales.xlsx", pd.DataFrame({"date": [1]}))
+
+        self.assertEqual(find_report_files([self.directory.name]), sorted([dated, suffixed]))
+        self.assertEqual(find_report_files([os.path.join(self.directory.name, "*.xlsx")]), [suffixed])
+
+    def test_files_in_parallel(self):
+        """
+        Test that the reports of several runs are flattened by the worker processes and not twice.
+
+        """
+        paths = [self.write(os.path.join(run, "product_data.xlsx"), self.products) for run in ("run1", "run2")]
+        paths += [self.write(os.path.join(run, "combined_user_data.xlsx"), self.users) for run in ("run1", "run2")]
+        expected_products = flatten_product_frame(pd.read_excel(paths[0]))
+        expected_users = flatten_user_frame(pd.read_excel(paths[2]))
+
+        with mock.patch("builtins.print"):
+            self.assertEqual(process_files([self.directory.name], workers=2), dict.fromkeys(paths, 25))
+            self.assertEqual(process_files([self.directory.name], workers=1), dict.fromkeys(paths, 0))
+
+        for path in paths[:2]:
+            self.assertEqual(pd.read_excel(path)["votes"].tolist(), expected_products["votes"].tolist())
+        for path in paths[2:]:
+            self.assertEqual(pd.read_excel(path)["full_name"].tolist(), expected_users["full_name"].tolist())
+
+    def test_chunks_of_one_file_in_parallel(self):
+        """
+        Test that the chunks of a single file flattened by the worker processes are written back in order.
+
+        """
+        path = self.write("product_data.xlsx", self.products)
+        with mock.patch("builtins.print"):
+            self.assertEqual(process_files([path], workers=2, chunk_size=4), {path: 25})
+
+        processed = pd.read_excel(path)
+        self.assertEqual(processed["id"].tolist(), list(range(1, 26)))
+        self.assertEqual(processed["votes"].tolist(), flatten_product_frame(self.products)["votes"].tolist())
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["product_data.xlsx"])  # The parts are gone
+
+    def test_chunks_of_many_files_match_the_serial_result(self):
+        """
+        Test that with several files every file is split in chunks too, with the same result as one process.
+
+        """
+        users = self.users.assign(**{"Last Login": "2024-08-01 10:00:00"})
+        parallel = [self.write(os.path.join("parallel", run, "combined_user_data.xlsx"), users) for run in ("a", "b")]
+        serial = self.write(os.path.join("serial", "combined_user_data.xlsx"), users)
+        with mock.patch("builtins.print"):
+            self.assertEqual(process_files([os.path.join(self.directory.name, "parallel")], workers=2, chunk_size=7),
+                             dict.fromkeys(parallel, 25))
+            process_files([serial], workers=1)
+
+        expected = pd.read_excel(serial)
+        for path in parallel:
+            pd.testing.assert_frame_equal(pd.read_excel(path), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
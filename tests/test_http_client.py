@@ -0,0 +1,114 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the ApiClient of the http_client module
+and the bulk mode of the data fetchers. The tests run against the local FakeStoreServer.
+"""
+
+import unittest
+from unittest import mock
+from http_client import ApiClient, FetchError
+from data_fetcher import fetch_user_carts, fetch_user_details, fetch_product_details
+from tests.fake_server import FakeStoreServer
+
+
+class TestApiClient(unittest.TestCase):
+    """
+    Test suite for the ApiClient class.
+
+    """
+    def setUp(self):
+        # No real backoff delays in the tests
+        patcher = mock.patch.object(ApiClient, "_backoff", staticmethod(lambda attempt: 0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_retries_until_success(self):
+        """
+        Test that retryable errors are retried and the final response is returned.
+
+        """
+        with FakeStoreServer(flaky_paths={"/users/2": 2}) as server:
+            client = ApiClient(server.base_url, max_retries=3)
+            user = client.get_json("/users/2")
+
+        self.assertEqual(user["id"], 2)
+        self.assertEqual(client.retries, 2)
+        self.assertEqual(client.failures, [])
+
+    def test_failures_are_recorded(self):
+        """
+        Test that requests failing after all retries are recorded instead of dropped silently.
+
+        """
+        with FakeStoreServer(users=3, flaky_paths={"/users/1": 5}) as server:
+            client = ApiClient(server.base_url, max_retries=1)
+            self.assertIsNone(client.get_json("/users/1"))
+            self.assertIsNone(client.get_json("/users/42"))
+
+        self.assertEqual([failure["status"] for failure in client.failures], [503, 404])
+        self.assertEqual(client.failures[1]["path"], "/users/42")
+
+    def test_fetch_user_carts_failure(self):
+        """
+        Test that a failed carts request raises a FetchError with its own status code.
+
+        """
+        with FakeStoreServer(flaky_paths={"/carts": 1}) as server:
+            client = ApiClient(server.base_url, max_retries=0)
+            with self.assertRaises(FetchError) as raised:
+                fetch_user_carts(client=client)
+
+        self.assertEqual(raised.exception.status, 503)
+        self.assertEqual(client.failures, [raised.exception.failure])
+
+    def test_connections_are_reused(self):
+        """
+        Test that consecutive requests go through the same pooled connection.
+
+        """
+        with FakeStoreServer() as server:
+            with ApiClient(server.base_url) as client:
+                for user_id in range(1, 6):
+                    client.get_json(f"/users/{user_id}")
+            self.assertEqual(server.request_count, 5)
+            self.assertEqual(len(server.client_addresses), 1)
+
+
+class TestBulkMode(unittest.TestCase):
+    """
+    Test suite for the bulk mode of fetch_user_details and fetch_product_details.
+
+    """
+    def test_bulk_users_single_request(self):
+        """
+        Test that a large ID set is served from one request to the collection endpoint.
+
+        """
+        users = [[str(user_id)] for user_id in (4, 1, 3, 2, 12)]
+        with FakeStoreServer(users=10) as server:
+            client = ApiClient(server.base_url)
+            headers, user_details = fetch_user_details(users, client=client, bulk_threshold=3)
+            self.assertEqual(server.request_count, 1)
+
+        self.assertEqual([user["id"] for user in user_details], [4, 1, 3, 2])
+        self.assertIn("name", headers)
+        self.assertEqual(client.failures[0]["path"], "/users/12")
+
+    def test_bulk_matches_point_lookups(self):
+        """
+        Test that bulk mode returns the same products as one request per product.
+
+        """
+        carts = [{'products': [{'productId': product_id} for product_id in range(1, 8)]}]
+        with FakeStoreServer(products=10) as server:
+            client = ApiClient(server.base_url)
+            bulk = fetch_product_details(carts, client=client, bulk_threshold=5)
+            single = fetch_product_details(carts, client=client, bulk_threshold=None)
+
+        self.assertEqual(bulk, single)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the browserless scraping mode
+fetch_store_clients_lightweight of the data_fetcher module. The tests run against the
+client table served by the local FakeStoreServer, the Selenium fallback is replaced by a stub.
+"""
+
+import unittest
+from data_fetcher import fetch_store_clients_lightweight
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer, CLIENT_HEADERS
+
+
+class TestFetchStoreClientsLightweight(unittest.TestCase):
+    """
+    Test suite for the fetch_store_clients_lightweight function.
+
+    """
+    def setUp(self):
+        self.fallback_calls = []
+
+    def fallback(self, url):
+        self.fallback_calls.append(url)
+        return ["ID"], [["selenium"]]
+
+    def test_html_path_follows_pagination(self):
+        """
+        Test that every page is fetched over HTTP when the table is in the HTML.
+
+        """
+        with FakeStoreServer(clients=25, page_size=10) as server:
+            headers, clients, path = fetch_store_clients_lightweight(
+                server.clients_url, client=ApiClient(server.base_url), fallback=self.fallback
+            )
+            expected = server.client_rows()
+
+        self.assertEqual(path, "html")
+        self.assertEqual(headers, CLIENT_HEADERS)
+        self.assertEqual(clients, expected)
+        self.assertEqual(self.fallback_calls, [])
+
+    def test_feed_path(self):
+        """
+        Test that the JSON feed is preferred when it is given.
+
+        """
+        with FakeStoreServer(clients=12) as server:
+            headers, clients, path = fetch_store_clients_lightweight(
+                server.clients_url, feed_url=f"{server.base_url}/clients/feed",
+                client=ApiClient(server.base_url), fallback=self.fallback
+            )
+            expected = server.client_rows()
+
+        self.assertEqual(path, "feed")
+        self.assertEqual(headers, CLIENT_HEADERS)
+        self.assertEqual(clients, expected)
+
+    def test_falls_back_to_selenium(self):
+        """
+        Test that the browser fallback is used when the table is rendered by JavaScript.
+
+        """
+        with FakeStoreServer(clients_mode="script") as server:
+            headers, clients, path = fetch_store_clients_lightweight(
+                server.clients_url, client=ApiClient(server.base_url), fallback=self.fallback
+            )
+
+        self.assertEqual(path, "selenium")
+        self.assertEqual(clients, [["selenium"]])
+        self.assertEqual(self.fallback_calls, [server.clients_url])
+
+
+if __name__ == '__main__':
+    unittest.main()
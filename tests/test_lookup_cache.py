@@ -0,0 +1,158 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the LookupCache of the lookup_cache module
+and for the deduplicated, memoized ID lookups of the data_fetcher module. The fetcher
+tests run against the local FakeStoreServer.
+"""
+
+import threading
+import unittest
+from unittest import mock
+from lookup_cache import LookupCache
+from checkpoint import CheckpointStore
+from data_fetcher import fetch_user_details, fetch_user_details_checkpointed, iter_user_details
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer
+
+
+class TestLookupCache(unittest.TestCase):
+    """
+    Test suite for the LookupCache class.
+
+    """
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used result is evicted when the memo is full.
+
+        """
+        cache = LookupCache(max_entries=2)
+        cache.get("a", lambda: 1)
+        cache.get("b", lambda: 2)
+        cache.get("a", lambda: None)  # Makes "b" the least recently used result
+        cache.get("c", lambda: 3)
+
+        self.assertEqual(cache.get("a", lambda: None), 1)
+        self.assertEqual(cache.get("b", lambda: 20), 20)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 4, "coalesced": 0, "evictions": 2, "expirations": 0,
+                                         "size": 2, "hit_ratio": 0.3333})
+
+    def test_ttl_and_failures(self):
+        """
+        Test that expired and failed lookups are loaded again.
+
+        """
+        cache = LookupCache(ttl=10)
+        with mock.patch("lookup_cache.time.monotonic", side_effect=[0, 5, 20, 20]):
+            self.assertEqual(cache.get("a", lambda: 1), 1)
+            self.assertEqual(cache.get("a", lambda: 2), 1)
+            self.assertEqual(cache.get("a", lambda: 3), 3)
+        self.assertIsNone(cache.get("b", lambda: None))
+        self.assertEqual(cache.get("b", lambda: 4), 4)
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_concurrent_lookups_are_coalesced(self):
+        """
+        Test that threads asking for a key that is being loaded wait for that load.
+
+        """
+        cache = LookupCache()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "record"
+
+        leader = threading.Thread(target=cache.get, args=("a", load))
+        leader.start()
+        started.wait(5)
+        results = []
+        followers = [threading.Thread(target=lambda: results.append(cache.get("a", load))) for _ in range(4)]
+        for follower in followers:
+            follower.start()
+        while cache.stats()["coalesced"] < 4:
+            pass
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["record"] * 4)
+        self.assertEqual(cache.stats()["hit_ratio"], 0.8)
+
+    def test_load_error_reaches_the_waiters(self):
+        """
+        Test that an exception of the load is raised to the caller and the next lookup loads again.
+
+        """
+        cache = LookupCache()
+        with self.assertRaises(RuntimeError):
+            cache.get("a", mock.Mock(side_effect=RuntimeError("down")))
+        self.assertEqual(cache.get("a", lambda: 1), 1)
+
+
+class TestMemoizedLookups(unittest.TestCase):
+    """
+    Test suite for the ID lookups of data_fetcher through LOOKUP_CACHE.
+
+    """
+    def setUp(self):
+        patcher = mock.patch("data_fetcher.LOOKUP_CACHE", LookupCache())
+        self.cache = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_duplicate_ids_are_fetched_once(self):
+        """
+        Test that duplicate client rows cost one request and a repeated run none.
+
+        """
+        users = [["1"], ["2"], ["1"], ["1"]]
+        with FakeStoreServer(users=3) as server:
+            client = ApiClient(server.base_url)
+            _, first = fetch_user_details(users, client=client, bulk_threshold=None)
+            self.assertEqual(server.request_count, 2)
+            _, second = fetch_user_details(users, client=client, bulk_threshold=None)
+            self.assertEqual(server.request_count, 2)
+
+        self.assertEqual([user["id"] for user in first], [1, 2, 1, 1])
+        self.assertEqual(first, second)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_streaming_requests_in_flight_are_coalesced(self):
+        """
+        Test that the streaming fetcher sends one request for an ID repeated while it is in flight.
+
+        """
+        with FakeStoreServer(users=3, latency=0.2) as server:
+            records = list(iter_user_details([["1"]] * 8, concurrency=8, client=ApiClient(server.base_url)))
+            self.assertEqual(server.request_count, 1)
+
+        self.assertEqual(len(records), 8)
+        self.assertEqual(self.cache.stats()["coalesced"], 7)
+
+
+    def test_checkpointed_fetch_does_not_use_kept_records(self):
+        """
+        Test that the IDs a checkpointed run fetches (e.g. refetched changed clients) are requested again.
+
+        """
+        users = [["1"], ["2"]]
+        with FakeStoreServer(users=3) as server:
+            client = ApiClient(server.base_url)
+            fetch_user_details(users, client=client, bulk_threshold=None)
+            self.assertEqual(server.request_count, 2)
+
+            store = CheckpointStore(":memory:")
+            store.start_run()
+            _, records = fetch_user_details_checkpointed(users, store, client=client)
+            self.assertEqual(server.request_count, 4)
+
+        self.assertEqual([user["id"] for user in records], [1, 2])
+        self.assertEqual(self.cache.stats()["size"], 2)  # The fresh records replace the kept ones
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains an end-to-end test of main.main(). The whole pipeline
+runs against the local FakeStoreServer in a temporary directory, so it needs no
+network access and leaves no files behind.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from main import main, API_CLIENT, METRICS
+from pacing import TokenBucket
+from tests.fake_server import FakeStoreServer
+
+
+class TestMain(unittest.TestCase):
+    """
+    Test suite for the main function.
+
+    """
+    def test_main_against_fake_server(self):
+        """
+        Test that every stage runs, every output file is written and the run metrics are exported.
+
+        """
+        previous_dir = os.getcwd()
+        with FakeStoreServer(users=12, products=8, carts=20, clients=12, page_size=5) as server, \
+                tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(API_CLIENT, "base_url", API_CLIENT.base_url), \
+                mock.patch.object(API_CLIENT, "pacer", TokenBucket(None)), \
+                mock.patch.object(API_CLIENT, "cache", None), \
+                mock.patch("builtins.print"):
+            os.chdir(directory)
+            try:
+                runner = main(api_url=server.base_url, clients_url=server.clients_url, metrics_dir="metrics")
+                API_CLIENT.cache.close()
+                written = set(os.listdir(directory))
+                with open(os.path.join("metrics", "scrape_metrics.prom"), encoding="utf-8") as file:
+                    prometheus = file.read()
+            finally:
+                os.chdir(previous_dir)
+                METRICS.enabled = False
+
+        self.assertEqual(set(runner.timings), {"scrape", "carts", "users", "products", "lines", "save_metrics",
+                                               "save_users", "save_products"})
+        self.assertEqual(len(runner.results["scrape"][1]), 12)
+        self.assertEqual(len(runner.results["users"][1]), 12)
+        self.assertEqual(len(runner.results["products"][1]), 8)
+        for name in ("combined_user_data", "product_data", "user_basket_sizes", "daily_sales"):
+            self.assertIn(f"{name}.xlsx", written)
+        for stage in runner.timings:
+            self.assertIn(f'scrape_stage_duration_seconds{{stage="{stage}"}}', prometheus)
+        self.assertIn('scrape_records_fetched_total{kind="user",source="api"} 12', prometheus)
+        self.assertIn('scrape_rows_processed_total{dataset="product_data",format="xlsx",step="save"} 8', prometheus)
+
+    def test_main_without_checkpoint_and_cache(self):
+        """
+        Test that --no-checkpoint and --no-cache runs leave no store or cache file behind.
+
+        """
+        previous_dir = os.getcwd()
+        with FakeStoreServer(users=4, products=3, carts=5, clients=4, page_size=5) as server, \
+                tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(API_CLIENT, "base_url", API_CLIENT.base_url), \
+                mock.patch.object(API_CLIENT, "pacer", TokenBucket(None)), \
+                mock.patch.object(API_CLIENT, "cache", None), \
+                mock.patch("builtins.print"):
+            os.chdir(directory)
+            try:
+                runner = main(api_url=server.base_url, clients_url=server.clients_url, checkpoint_path=None,
+                              cache_path=None)
+                cache = API_CLIENT.cache
+                written = set(os.listdir(directory))
+                with self.assertRaises(ValueError):
+                    main(incremental=True, checkpoint_path=None)
+            finally:
+                os.chdir(previous_dir)
+
+        self.assertIsNone(cache)
+        self.assertEqual(len(runner.results["users"][1]), 4)
+        self.assertFalse({"checkpoint.sqlite", "http_cache.sqlite"} & written)
+        self.assertIn("product_data.xlsx", written)
+
+
+if __name__ == '__main__':
+    unittest.main()
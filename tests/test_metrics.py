@@ -0,0 +1,114 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the run metrics of the metrics module:
+the registry, the Prometheus and JSON exports, and the request metrics collected by the
+ApiClient against the local FakeStoreServer.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from metrics import METRICS, Metrics, endpoint_of, PROMETHEUS_FILE, SUMMARY_FILE
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test suite for the Metrics class.
+
+    """
+    def test_disabled_registry_records_nothing(self):
+        """
+        Test that a disabled registry ignores every call.
+
+        """
+        metrics = Metrics()
+        metrics.inc("http_requests_total", endpoint="/carts")
+        metrics.observe("http_request_duration_seconds", 0.1, endpoint="/carts")
+        self.assertEqual(metrics.value("http_requests_total", endpoint="/carts"), 0)
+        self.assertEqual(metrics.summary()["metrics"], {})
+
+    def test_prometheus_format(self):
+        """
+        Test the counters, gauges and cumulative histogram buckets of the Prometheus export.
+
+        """
+        metrics = Metrics(enabled=True, buckets=(0.1, 1.0))
+        metrics.inc("http_requests_total", endpoint="/carts", status=200)
+        metrics.inc("http_requests_total", endpoint="/carts", status=200)
+        metrics.set("stage_duration_seconds", 1.5, stage="carts")
+        for latency in (0.05, 0.5, 5.0):
+            metrics.observe("http_request_duration_seconds", latency, endpoint="/carts")
+
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE scrape_http_requests_total counter", text)
+        self.assertIn('scrape_http_requests_total{endpoint="/carts",status="200"} 2', text)
+        self.assertIn('scrape_stage_duration_seconds{stage="carts"} 1.5', text)
+        self.assertIn('scrape_http_request_duration_seconds_bucket{endpoint="/carts",le="0.1"} 1', text)
+        self.assertIn('scrape_http_request_duration_seconds_bucket{endpoint="/carts",le="1.0"} 2', text)
+        self.assertIn('scrape_http_request_duration_seconds_bucket{endpoint="/carts",le="+Inf"} 3', text)
+        self.assertIn('scrape_http_request_duration_seconds_count{endpoint="/carts"} 3', text)
+        self.assertIn("scrape_run_duration_seconds", text)
+
+    def test_write_files(self):
+        """
+        Test that the textfile and the JSON run summary are written.
+
+        """
+        metrics = Metrics(enabled=True)
+        metrics.inc("rows_processed_total", 10, step="save", dataset="product_data")
+        with tempfile.TemporaryDirectory() as directory:
+            prometheus_path, summary_path = metrics.write(directory)
+            self.assertEqual(sorted(os.listdir(directory)), sorted([PROMETHEUS_FILE, SUMMARY_FILE]))
+            with open(summary_path, encoding="utf-8") as file:
+                summary = json.load(file)
+
+        self.assertEqual(summary["metrics"]["rows_processed_total"],
+                         [{"labels": {"dataset": "product_data", "step": "save"}, "value": 10}])
+
+    def test_endpoint_of(self):
+        """
+        Test that the IDs and queries are removed from the endpoint labels.
+
+        """
+        self.assertEqual(endpoint_of("/users/7"), "/users/{id}")
+        self.assertEqual(endpoint_of("http://127.0.0.1:8000/clients?page=2"), "/clients")
+        self.assertEqual(endpoint_of("/carts"), "/carts")
+
+
+class TestRequestMetrics(unittest.TestCase):
+    """
+    Test suite for the metrics collected by the ApiClient.
+
+    """
+    def setUp(self):
+        METRICS.enable()
+
+    def tearDown(self):
+        METRICS.enabled = False
+
+    def test_requests_retries_and_bytes(self):
+        """
+        Test that every request, retry and response body is counted per endpoint.
+
+        """
+        with FakeStoreServer(users=3, flaky_paths={"/users/2": 1}) as server:
+            client = ApiClient(server.base_url)
+            client._backoff = lambda attempt: 0
+            for user_id in (1, 2, 3):
+                client.get_json(f"/users/{user_id}")
+
+        self.assertEqual(METRICS.value("http_requests_total", endpoint="/users/{id}", status="200"), 3)
+        self.assertEqual(METRICS.value("http_requests_total", endpoint="/users/{id}", status="503"), 1)
+        self.assertEqual(METRICS.value("http_retries_total", endpoint="/users/{id}"), 1)
+        self.assertGreater(METRICS.value("http_response_bytes_total", endpoint="/users/{id}"), 0)
+        latency = METRICS.summary()["metrics"]["http_request_duration_seconds"][0]
+        self.assertEqual(latency["count"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
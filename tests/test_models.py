@@ -0,0 +1,142 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the typed record models of the models module
+and for the typed fetch mode of data_fetcher. The fetch tests run against the local FakeStoreServer.
+"""
+
+import json
+import tracemalloc
+import unittest
+from unittest import mock
+from functools import partial
+from data_fetcher import fetch_user_details, fetch_product_details, fetch_user_carts
+from http_client import ApiClient
+from models import Cart, Client, Product, User, RecordError, decode, clients_from_rows, to_frame
+from tests.fake_server import FakeStoreServer, make_cart, make_client, make_product, make_user, CLIENT_HEADERS
+
+
+class TestModels(unittest.TestCase):
+    """
+    Test suite for the record models and decode().
+
+    """
+    def test_round_trip(self):
+        """
+        Test that decoded records give the API structure back.
+
+        """
+        for model, record in ((User, make_user(3)), (Product, make_product(4)), (Cart, make_cart(5, 10, 20))):
+            decoded = decode(model, json.dumps(record).encode())
+            self.assertEqual(decoded.to_dict(), record)
+
+    def test_dict_style_access(self):
+        cart = decode(Cart, json.dumps(make_cart(5, 10, 20)))
+        self.assertEqual(cart['userId'], 5)
+        self.assertEqual(cart[0], 5)
+        self.assertEqual(cart.get('products')[0]['quantity'], 1)
+        self.assertIsNone(cart.get('unknown'))
+        with self.assertRaises(KeyError):
+            cart['unknown']
+
+    def test_malformed_records_are_rejected(self):
+        product = make_product(1)
+        missing = {key: value for key, value in product.items() if key != 'title'}
+        wrong_type = dict(product, price="9.99")
+        for record in (missing, wrong_type, [product]):
+            with self.assertRaises(RecordError):
+                Product.from_dict(record)
+        with self.assertRaises(RecordError):
+            decode(Product, b'{"id": 1,')
+
+    def test_decode_without_orjson(self):
+        """
+        Test that decode() falls back to the json module, with the same errors.
+
+        """
+        with mock.patch('models.json_loads', json.loads):
+            self.assertEqual(decode(User, json.dumps([make_user(3)])).pop().to_dict(), make_user(3))
+            with self.assertRaises(RecordError):
+                decode(Product, b'{"id": 1,')
+
+    def test_records_are_not_hashable(self):
+        user = decode(User, json.dumps(make_user(3)))
+        self.assertEqual(user, decode(User, json.dumps(make_user(3))))
+        with self.assertRaises(TypeError):
+            hash(user)
+
+    def test_clients_from_rows(self):
+        clients = clients_from_rows(CLIENT_HEADERS, [make_client(client_id) for client_id in (1, 2)])
+        self.assertEqual(clients[1].id, 2)
+        self.assertEqual(clients[1].account_balance, 1075.0)
+        with self.assertRaises(RecordError):
+            Client.from_row(['x'] + make_client(1)[1:], CLIENT_HEADERS)
+
+    def test_client_balance_in_the_format_of_the_page(self):
+        row = ['1', '28', 'Software Engineer', 'Active', '2024-07-21', '$2,340.50']
+        self.assertEqual(Client.from_row(row, CLIENT_HEADERS).account_balance, 2340.5)
+        self.assertEqual(Client.from_row(row[:5] + ['-$1,000.25'], CLIENT_HEADERS).account_balance, -1000.25)
+        with self.assertRaises(RecordError):
+            Client.from_row(row[:5] + ['$'], CLIENT_HEADERS)
+
+    def test_malformed_records_of_a_list_are_skipped(self):
+        products = [make_product(1), dict(make_product(2), price="9.99"), make_product(3)]
+        with mock.patch("models.METRICS") as metrics:
+            decoded = decode(Product, json.dumps(products))
+        self.assertEqual([product.id for product in decoded], [1, 3])
+        metrics.inc.assert_called_once_with('malformed_records_total', kind='product')
+
+    def test_to_frame_downcasts(self):
+        frame = to_frame([decode(Product, json.dumps(make_product(product_id))) for product_id in range(1, 6)])
+        self.assertEqual(list(frame.columns), Product.HEADERS)
+        self.assertEqual(str(frame['id'].dtype), 'int8')
+        self.assertEqual(str(frame['category'].dtype), 'category')
+        self.assertEqual(str(frame['price'].dtype), 'float64')
+        self.assertEqual(frame['rating'][0], make_product(1)['rating'])
+
+    def test_records_use_less_memory_than_dicts(self):
+        payload = json.dumps([make_user(user_id) for user_id in range(2000)]).encode()
+
+        def peak(function):
+            tracemalloc.start()
+            result = function()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del result
+            return size
+
+        self.assertLess(peak(lambda: decode(User, payload)), peak(lambda: json.loads(payload)))
+
+
+class TestTypedFetch(unittest.TestCase):
+    """
+    Test suite for the typed mode of the fetchers.
+
+    """
+    def test_typed_fetchers(self):
+        with FakeStoreServer(users=5, products=8, carts=6) as server:
+            client = ApiClient(server.base_url)
+            cart_headers, carts = fetch_user_carts(client, typed=True)
+            user_headers, users = fetch_user_details([['2'], ['4']], client=client, typed=True)
+            product_headers, products = fetch_product_details(carts, client=client, typed=True)
+
+        self.assertEqual(cart_headers, Cart.HEADERS)
+        self.assertEqual(user_headers, User.HEADERS)
+        self.assertEqual(product_headers, Product.HEADERS)
+        self.assertEqual([user.id for user in users], [2, 4])
+        product_ids = {line.productId for cart in carts for line in cart.products}
+        self.assertEqual({product.id for product in products}, product_ids)
+
+    def test_malformed_response_is_a_failure(self):
+        with FakeStoreServer(users=2) as server:
+            client = ApiClient(server.base_url)
+            result = client.get_json('/users/1', decoder=partial(decode, Product))
+
+        self.assertIsNone(result)
+        self.assertEqual(client.failures[0]['path'], '/users/1')
+        self.assertIn('Malformed response', client.failures[0]['reason'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the AdaptiveRateController of the pacing
+module. They check that the controller ramps up on healthy responses, backs off on
+throttling and honours Retry-After headers.
+"""
+
+import time
+import unittest
+from pacing import AdaptiveRateController, parse_retry_after
+from data_fetcher import fetch_user_details
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer
+
+
+class TestAdaptiveRateController(unittest.TestCase):
+    """
+    Test suite for the AdaptiveRateController class.
+
+    """
+    def test_ramps_up_while_healthy(self):
+        """
+        Test that successful responses with a stable latency increase the rate up to max_rate.
+
+        """
+        controller = AdaptiveRateController(initial_rate=1.0, max_rate=3.0, increase=0.5)
+        for _ in range(10):
+            controller.record(200, 0.1)
+        self.assertEqual(controller.rate, 3.0)
+
+    def test_backs_off_on_throttling(self):
+        """
+        Test that 429 and 5xx responses halve the rate without going below min_rate.
+
+        """
+        controller = AdaptiveRateController(initial_rate=8.0, min_rate=1.5)
+        controller.record(429, 0.1)
+        self.assertEqual(controller.rate, 4.0)
+        controller.record(503, 0.1)
+        self.assertEqual(controller.rate, 2.0)
+        controller.record(500, 0.1)
+        self.assertEqual(controller.rate, 1.5)
+        self.assertEqual(controller.stats()["throttled"], 3)
+
+    def test_backs_off_on_latency_spike(self):
+        """
+        Test that a response much slower than the average latency lowers the rate.
+
+        """
+        controller = AdaptiveRateController(initial_rate=4.0, increase=0.5)
+        controller.record(200, 0.1)
+        self.assertEqual(controller.rate, 4.5)
+        controller.record(200, 1.0)
+        self.assertEqual(controller.rate, 2.25)
+
+    def test_retry_after_pauses_requests(self):
+        """
+        Test that a Retry-After header delays the next reservation by the requested time.
+
+        """
+        controller = AdaptiveRateController(initial_rate=100.0)
+        controller.record(429, 0.1, retry_after="2")
+        self.assertGreater(controller.reserve(), 1.5)
+
+    def test_parse_retry_after(self):
+        """
+        Test that Retry-After values in seconds and as HTTP dates are parsed.
+
+        """
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        http_date = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60))
+        self.assertAlmostEqual(parse_retry_after(http_date), 60, delta=2)
+
+    def test_fetchers_report_to_the_pacer(self):
+        """
+        Test that every API request of the fetchers goes through the pacer.
+
+        """
+        controller = AdaptiveRateController(initial_rate=50.0, max_rate=100.0)
+        with FakeStoreServer(users=5) as server:
+            fetch_user_details([[1], [2], [3], [4]], client=ApiClient(server.base_url, pacer=controller))
+
+        stats = controller.stats()
+        self.assertEqual(stats["requests"], 4)
+        self.assertGreater(stats["rate"], 50.0)
+        self.assertGreater(stats["effective_rate"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the parallel pagination scraping of the
+data_fetcher module. The browser tests scrape the paginated client table served by the
+local FakeStoreServer and are skipped when headless Chrome is not available.
+"""
+
+import unittest
+from unittest import mock
+import data_fetcher
+from data_fetcher import fetch_store_clients, fetch_store_clients_parallel
+from tests.fake_server import FakeStoreServer, CLIENT_HEADERS
+from tests.browser import start_headless_chrome
+
+
+class FakeDriver:
+    """
+    Stand-in for a WebDriver that only records whether it was closed.
+    """
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+class TestDriverPool(unittest.TestCase):
+    """
+    Test suite for the _DriverPool class.
+
+    """
+    def test_reuse_keeps_one_driver(self):
+        """
+        Test that with reuse a released driver is handed out again.
+
+        """
+        with mock.patch.object(data_fetcher, "_start_driver", side_effect=FakeDriver) as start:
+            pool = data_fetcher._DriverPool(size=2, reuse=True)
+            first = pool.acquire()
+            pool.release(first, "url")
+            second = pool.acquire()
+            self.assertIs(first, second)
+            self.assertEqual(pool.current_url(second), "url")
+            pool.release(second, "url")
+            pool.close()
+
+        self.assertEqual(start.call_count, 1)
+        self.assertTrue(first.closed)
+
+    def test_no_reuse_closes_each_driver(self):
+        """
+        Test that without reuse every page gets a new driver and released drivers are closed.
+
+        """
+        with mock.patch.object(data_fetcher, "_start_driver", side_effect=FakeDriver) as start:
+            pool = data_fetcher._DriverPool(size=1, reuse=False)
+            first = pool.acquire()
+            pool.release(first, "url")
+            second = pool.acquire()
+            pool.release(second, "url")
+
+        self.assertEqual(start.call_count, 2)
+        self.assertTrue(first.closed and second.closed)
+
+
+class TestFetchStoreClientsParallel(unittest.TestCase):
+    """
+    Test suite for fetch_store_clients_parallel against a locally served multi-page table.
+
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Skip the whole suite when no browser is available
+        start_headless_chrome().quit()
+
+    def test_pages_are_merged_in_order(self):
+        """
+        Test that the parallel scrape returns the same rows in the same order as the serial one.
+
+        """
+        with FakeStoreServer(clients=47, page_size=10) as server:
+            expected = (CLIENT_HEADERS, server.client_rows())
+            serial = fetch_store_clients(server.clients_url)
+            for workers, reuse_drivers in [(1, True), (3, True), (3, False)]:
+                with self.subTest(workers=workers, reuse_drivers=reuse_drivers):
+                    parallel = fetch_store_clients_parallel(
+                        server.clients_url, workers=workers, reuse_drivers=reuse_drivers
+                    )
+                    self.assertEqual(parallel, expected)
+
+        self.assertEqual(serial, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the DagRunner of the pipeline module.
+They check that independent stages run concurrently, that results flow along the
+dependencies and that the critical path is reported.
+"""
+
+import threading
+import time
+import unittest
+from pipeline import DagRunner, Stage
+
+
+def sleeper(seconds, value):
+    """
+    Returns a stage function that sleeps and then returns `value` plus the sum of its inputs.
+    """
+    def run(*inputs):
+        time.sleep(seconds)
+        return value + sum(inputs)
+    return run
+
+
+class TestDagRunner(unittest.TestCase):
+    """
+    Test suite for the DagRunner class.
+
+    """
+    def test_results_follow_dependencies(self):
+        """
+        Test that every stage receives the results of its dependencies in order.
+
+        """
+        runner = DagRunner([
+            Stage("a", lambda: 1),
+            Stage("b", lambda: 10),
+            Stage("c", lambda a, b: (a, b), deps=["a", "b"]),
+        ])
+        results = runner.run()
+        self.assertEqual(results["c"], (1, 10))
+
+    def test_independent_stages_run_concurrently(self):
+        """
+        Test that the wall time is close to the slowest chain instead of the sum of all stages.
+
+        """
+        runner = DagRunner([
+            Stage("scrape", sleeper(0.3, 1)),
+            Stage("carts", sleeper(0.1, 2)),
+            Stage("users", sleeper(0.1, 0), deps=["scrape"]),
+            Stage("products", sleeper(0.2, 0), deps=["carts"]),
+            Stage("save", sleeper(0.0, 0), deps=["users", "products"]),
+        ])
+        results = runner.run()
+
+        self.assertEqual(results["save"], 3)
+        self.assertLess(runner.wall_time, 0.6)  # Serial would take 0.7 seconds
+        # products started as soon as carts was done, while scrape was still running
+        self.assertLess(runner.timings["products"].start, runner.timings["scrape"].end)
+        self.assertEqual(runner.critical_path(), ["scrape", "users", "save"])
+        self.assertIn("Critical path: scrape -> users -> save", runner.report())
+
+    def test_failure_stops_dependents(self):
+        """
+        Test that a failing stage raises and its dependents are not started.
+
+        """
+        started = threading.Event()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        runner = DagRunner([
+            Stage("fail", fail),
+            Stage("after", started.set, deps=["fail"]),
+        ])
+        with self.assertRaises(RuntimeError):
+            runner.run()
+        self.assertFalse(started.is_set())
+
+    def test_invalid_graphs(self):
+        """
+        Test that unknown dependencies and cycles are rejected.
+
+        """
+        with self.assertRaises(ValueError):
+            DagRunner([Stage("a", lambda x: x, deps=["missing"])])
+        with self.assertRaises(ValueError):
+            DagRunner([Stage("a", lambda b: b, deps=["b"]), Stage("b", lambda a: a, deps=["a"])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the ResponseCache of the response_cache
+module and its use by the ApiClient. The tests run against the local FakeStoreServer.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from functools import partial
+from models import Product, decode
+from response_cache import ResponseCache
+from http_client import ApiClient
+from data_fetcher import fetch_product_details, LOOKUP_CACHE
+from tests.fake_server import FakeStoreServer
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Test suite for the ResponseCache class.
+
+    """
+    def test_ttl_per_endpoint(self):
+        """
+        Test that entries are fresh within the TTL of their endpoint and stale after it.
+
+        """
+        cache = ResponseCache(":memory:", ttls={"products": 100, "carts": 0})
+        cache.store("/products/1", b"{}")
+        cache.store("/carts", b"[]")
+
+        self.assertTrue(cache.lookup("/products/1").fresh)
+        self.assertFalse(cache.lookup("/carts").fresh)
+        self.assertIsNone(cache.lookup("/users/1"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entries are evicted when the cache is full.
+
+        """
+        cache = ResponseCache(":memory:", max_bytes=25)
+        with mock.patch("response_cache.time.time", side_effect=[1, 2, 3, 4, 5]):
+            cache.store("/users/1", b"x" * 10)
+            cache.store("/users/2", b"x" * 10)
+            cache.lookup("/users/1")  # Makes /users/2 the least recently used entry
+            cache.store("/users/3", b"x" * 10)
+
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.lookup("/users/2"))
+        self.assertIsNotNone(cache.lookup("/users/1"))
+
+    def test_size_total_follows_the_stores(self):
+        """
+        Test that replaced entries do not count twice and that the total is loaded when the file is opened.
+
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+            cache = ResponseCache(path, max_bytes=25)
+            cache.store("/users/1", b"x" * 10)
+            cache.store("/users/1", b"x" * 10)
+            cache.store("/users/2", b"x" * 10)
+            self.assertEqual(cache.stats()["evictions"], 0)
+            cache.close()
+
+            cache = ResponseCache(path, max_bytes=25)
+            cache.store("/users/3", b"x" * 10)
+            self.assertEqual(cache.stats()["evictions"], 1)
+            cache.close()
+
+    def test_ttl_below_the_base_path(self):
+        """
+        Test that the TTL of an API below a base path is found from the path after it.
+
+        """
+        cache = ResponseCache(":memory:", ttls={"products": 100}, default_ttl=0)
+        client = ApiClient("http://host/api", cache=cache)
+        url = client.url_of("/products/1")
+        cache.store(url, b"{}")
+
+        self.assertEqual(client.path_of(url), "/products/1")
+        self.assertEqual(client.path_of("http://other/products/1"), "/products/1")
+        self.assertTrue(cache.lookup(url, client.path_of(url)).fresh)
+        self.assertFalse(cache.lookup(url).fresh)  # 'api' is not an endpoint
+
+
+class TestCachedApiClient(unittest.TestCase):
+    """
+    Test suite for the ApiClient with a ResponseCache attached.
+
+    """
+    def test_warm_run_makes_no_requests(self):
+        """
+        Test that a second run with a persistent cache file is served without any request.
+
+        """
+        carts = [{'products': [{'productId': 1}, {'productId': 2}, {'productId': 3}]}]
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "cache.sqlite")
+            with FakeStoreServer() as server:
+                cold = fetch_product_details(carts, client=ApiClient(server.base_url, cache=ResponseCache(cache_path)))
+                self.assertEqual(server.request_count, 3)
+
+                LOOKUP_CACHE.clear()  # A second run in a new process starts without the in-process memo
+                warm_cache = ResponseCache(cache_path)
+                warm = fetch_product_details(carts, client=ApiClient(server.base_url, cache=warm_cache))
+                self.assertEqual(server.request_count, 3)
+                warm_cache.close()
+
+        self.assertEqual(cold, warm)
+        self.assertEqual(warm_cache.stats()["hits"], 3)
+
+    def test_stale_entries_are_revalidated(self):
+        """
+        Test that stale entries are revalidated with If-None-Match and reused on 304.
+
+        """
+        cache = ResponseCache(":memory:", ttls={"users": 0})
+        with FakeStoreServer() as server:
+            client = ApiClient(server.base_url, cache=cache)
+            first = client.get_json("/users/1")
+            second = client.get_json("/users/1")
+            self.assertEqual(server.not_modified_count, 1)
+
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()["revalidations"], 1)
+
+    def test_hosts_sharing_a_cache_file(self):
+        """
+        Test that the entries of one host are not served to a client of another host.
+
+        """
+        cache = ResponseCache(":memory:")
+        with FakeStoreServer(users=2) as first_server, FakeStoreServer(users=2) as second_server:
+            ApiClient(first_server.base_url, cache=cache).get_json("/users/1")
+            ApiClient(second_server.base_url, cache=cache).get_json("/users/1")
+            self.assertEqual((first_server.request_count, second_server.request_count), (1, 1))
+
+        self.assertIsNotNone(cache.lookup(f"{second_server.base_url}/users/1"))
+        self.assertIsNone(cache.lookup("/users/1"))
+
+    def test_malformed_body_is_not_cached(self):
+        """
+        Test that a body the decoder rejects is not stored, so the next call requests it again.
+
+        """
+        cache = ResponseCache(":memory:")
+        with FakeStoreServer(users=2) as server:
+            client = ApiClient(server.base_url, cache=cache)
+            self.assertIsNone(client.get_json("/users/1", decoder=partial(decode, Product)))
+            self.assertIsNotNone(client.get_json("/users/1"))
+            self.assertEqual(server.request_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
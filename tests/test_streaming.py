@@ -0,0 +1,129 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the streaming fetchers of the data_fetcher
+module (iter_user_details, iter_product_details) and the chunked writers of the sinks module.
+The fetcher tests run against the local FakeStoreServer.
+"""
+
+import itertools
+import json
+import os
+import tempfile
+import unittest
+from data_fetcher import iter_user_details, iter_product_details, fetch_user_details
+from http_client import ApiClient
+from sinks import CsvSink, JsonLinesSink, iter_csv_rows, iter_json_lines
+from tests.fake_server import FakeStoreServer
+
+
+class TestStreamingFetchers(unittest.TestCase):
+    """
+    Test suite for iter_user_details and iter_product_details.
+
+    """
+    def test_same_records_as_fetch_user_details(self):
+        """
+        Test that the streamed users are the same, in the same order, as the list based fetch.
+
+        """
+        users = [[user_id] for user_id in (3, 1, 8, 2, 99, 5)]
+        with FakeStoreServer(users=10) as server:
+            client = ApiClient(server.base_url)
+            streamed = list(iter_user_details(iter(users), concurrency=3, client=client))
+            _, fetched = fetch_user_details(users, client=client, bulk_threshold=None)
+
+        self.assertEqual(streamed, fetched)
+
+    def test_users_are_consumed_lazily(self):
+        """
+        Test that only a bounded window of requests is sent ahead of the consumer.
+
+        """
+        users = ([user_id] for user_id in itertools.count(1))  # Never ends
+        with FakeStoreServer(users=1000) as server:
+            stream = iter_user_details(users, concurrency=2, client=ApiClient(server.base_url))
+            first = list(itertools.islice(stream, 5))
+            stream.close()
+            self.assertLessEqual(server.request_count, 5 + 4)
+
+        self.assertEqual([user["id"] for user in first], [1, 2, 3, 4, 5])
+
+    def test_products_are_fetched_once(self):
+        """
+        Test that every product of the carts is streamed once, in order of first appearance.
+
+        """
+        carts = iter([
+            {'products': [{'productId': 4}, {'productId': 2}]},
+            {'products': [{'productId': 2}, {'productId': 7}]},
+        ])
+        with FakeStoreServer(products=10) as server:
+            products = list(iter_product_details(carts, client=ApiClient(server.base_url)))
+            self.assertEqual(server.request_count, 3)
+
+        self.assertEqual([product["id"] for product in products], [4, 2, 7])
+
+
+class TestSinks(unittest.TestCase):
+    """
+    Test suite for the CsvSink and JsonLinesSink classes.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_chunks_are_written_before_close(self):
+        """
+        Test that full chunks reach the file while the sink is still open.
+
+        """
+        path = os.path.join(self.directory.name, "users.jsonl")
+        sink = JsonLinesSink(path, chunk_size=2)
+        sink.write({"id": 1})
+        self.assertEqual(list(iter_json_lines(path)), [])
+        sink.write({"id": 2})
+        sink.write({"id": 3})
+        self.assertEqual(len(list(iter_json_lines(path))), 2)
+        sink.close()
+
+        self.assertEqual(list(iter_json_lines(path)), [{"id": 1}, {"id": 2}, {"id": 3}])
+        self.assertEqual((sink.rows_written, sink.chunks_written), (3, 2))
+
+    def test_csv_round_trip(self):
+        """
+        Test that CSV rows are read back lazily and nested values are written as JSON.
+
+        """
+        path = os.path.join(self.directory.name, "users.csv")
+        records = [{"id": 1, "name": {"firstname": "john"}}, {"id": 2, "name": {"firstname": "anna"}}]
+        with CsvSink(path, chunk_size=1) as sink:
+            sink.write_all(records)
+
+        headers, rows = iter_csv_rows(path)
+        rows = list(rows)
+        self.assertEqual(headers, ["id", "name"])
+        self.assertEqual(rows[0][0], "1")
+        self.assertEqual(json.loads(rows[1][1]), {"firstname": "anna"})
+
+
+    def test_csv_list_records_need_headers(self):
+        """
+        Test that list records are refused without headers and that an empty result keeps its header.
+
+        """
+        path = os.path.join(self.directory.name, "clients.csv")
+        sink = CsvSink(path)
+        sink.write(["1", "john"])
+        with self.assertRaises(ValueError):
+            sink.close()
+
+        with CsvSink(path, ["id", "name"]):
+            pass
+        headers, rows = iter_csv_rows(path)
+        self.assertEqual((headers, list(rows)), (["id", "name"], []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the single round-trip table extraction of
+the table_parser module. The parser tests use the static fixture tests/fixtures/user_table.html,
+the browser test compares all extraction modes of get_data_from_table in headless Chrome.
+"""
+
+import os
+import unittest
+from table_parser import parse_user_table, parse_pagination_links, result_from_script
+from data_fetcher import get_data_from_table
+from tests.fake_server import CLIENT_HEADERS, make_client
+from tests.browser import start_headless_chrome
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "user_table.html")
+
+
+class TestParseUserTable(unittest.TestCase):
+    """
+    Test suite for the parse_user_table function.
+
+    """
+    def test_fixture_page(self):
+        """
+        Test that the headers and all 50 rows of the fixture page are extracted.
+
+        """
+        with open(FIXTURE_PATH) as file:
+            headers, rows = parse_user_table(file.read())
+
+        self.assertEqual(headers, CLIENT_HEADERS)
+        self.assertEqual(rows, [make_client(client_id) for client_id in range(1, 51)])
+
+    def test_whitespace_entities_and_nested_tags(self):
+        """
+        Test that cell text is normalised like the rendered text WebDriver returns.
+
+        """
+        html = """
+        <table id="other"><tr><th>X</th></tr><tr><td>ignored</td></tr></table>
+        <table id="userTable">
+          <tr><th> ID </th><th>Name</th></tr>
+          <tr><td>1</td><td>  <b>Tom</b> &amp;
+               Jerry </td></tr>
+          <tr></tr>
+          <tr><td>2<td>Anna<br>Smith
+        </table>
+        """
+        headers, rows = parse_user_table(html)
+
+        self.assertEqual(headers, ["ID", "Name"])
+        self.assertEqual(rows, [["1", "Tom & Jerry"], ["2", "Anna Smith"]])
+
+    def test_missing_table(self):
+        """
+        Test that a page without the table raises a ValueError.
+
+        """
+        with self.assertRaises(ValueError):
+            parse_user_table("<html><body><p>Loading...</p></body></html>")
+        with self.assertRaises(ValueError):
+            result_from_script(None)
+
+
+class TestParsePaginationLinks(unittest.TestCase):
+    """
+    Test suite for the parse_pagination_links function.
+
+    """
+    def test_links_in_page_order(self):
+        """
+        Test that the hrefs of the pagination links are returned in order, None for missing hrefs.
+
+        """
+        html = """
+        <a href="/home">Home</a>
+        <ul id="pagination"><li><a href="?page=1">1</a></li><li><a href="#">2</a></li><li><a>3</a></li></ul>
+        """
+        self.assertEqual(parse_pagination_links(html), ["?page=1", "#", None])
+        self.assertEqual(parse_pagination_links("<p>No pages</p>"), [])
+
+
+class TestExtractionModes(unittest.TestCase):
+    """
+    Test suite comparing the extraction modes of get_data_from_table in a real browser.
+
+    """
+    def test_modes_return_identical_output(self):
+        """
+        Test that the script, html and elements modes return the same headers and rows.
+
+        """
+        driver = start_headless_chrome()
+        try:
+            driver.get("file://" + FIXTURE_PATH)
+            results = {mode: get_data_from_table(driver, mode) for mode in ("script", "html", "elements")}
+        finally:
+            driver.quit()
+
+        self.assertEqual(results["script"], results["elements"])
+        self.assertEqual(results["html"], results["elements"])
+        self.assertEqual(len(results["elements"][1]), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the change detection of the table_snapshot
+module and the incremental scrape of the client table. The scrape tests run the HTTP path of
+fetch_store_clients_lightweight against the local FakeStoreServer.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from checkpoint import CheckpointStore
+from lookup_cache import LookupCache
+from table_parser import parse_user_table
+from table_snapshot import TableSnapshot, diff_rows, page_fingerprint
+from data_fetcher import fetch_store_clients_lightweight, fetch_user_details_checkpointed
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer, CLIENT_HEADERS, make_client
+
+HEADERS = ["ID", "Age"]
+
+
+class TestDiffRows(unittest.TestCase):
+    """
+    Test suite for page_fingerprint and diff_rows.
+
+    """
+    def test_row_level_diff(self):
+        """
+        Test that the rows are matched by ID and reported as added, removed or changed.
+
+        """
+        previous = [["1", "21"], ["2", "22"], ["3", "23"]]
+        current = [["1", "21"], ["3", "30"], ["4", "24"]]
+        self.assertEqual(diff_rows(previous, current),
+                         {"added": ["4"], "removed": ["2"], "changed": ["3"], "unchanged": 1})
+
+    def test_page_fingerprint(self):
+        """
+        Test that the fingerprint holds the row IDs and changes with the content.
+
+        """
+        ids, digest = page_fingerprint([["1", "21"], ["2", "22"]])
+        self.assertEqual(ids, ["1", "2"])
+        self.assertNotEqual(digest, page_fingerprint([["1", "21"], ["2", "23"]])[1])
+
+
+class TestTableSnapshot(unittest.TestCase):
+    """
+    Test suite for the TableSnapshot class.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "checkpoint.sqlite")
+
+    def scrape(self, pages, success=True):
+        """
+        Records one scrape of `pages` ({page index: (quick fingerprint, rows)}) as a run and returns its snapshot.
+        """
+        checkpoint = CheckpointStore(self.path)
+        self.addCleanup(checkpoint.close)
+        checkpoint.start_run()
+        snapshot = TableSnapshot(checkpoint, "url")
+        for page_index, (quick, rows) in pages.items():
+            if snapshot.reuse(page_index, quick) is None:
+                snapshot.record(page_index, HEADERS, rows, quick)
+        checkpoint.finish_run(success)
+        return snapshot
+
+    def test_unchanged_pages_are_reused(self):
+        """
+        Test that a page with the same quick fingerprint is served from the last successful scrape.
+
+        """
+        first = self.scrape({0: ("a", [["1", "21"]]), 1: ("b", [["2", "22"]])})
+        self.assertEqual((first.skipped, first.extracted), (0, 2))
+        self.assertEqual(first.changed_ids(), ["1", "2"])
+
+        second = self.scrape({0: ("a", None), 1: ("c", [["2", "99"], ["3", "23"]])})
+        self.assertEqual((second.skipped, second.extracted), (1, 1))
+        self.assertEqual(second.diff(), {"added": ["3"], "removed": [], "changed": ["2"], "unchanged": 1})
+
+    def test_discard_resets_the_counts(self):
+        """
+        Test that discarding a scrape forgets its pages and their counts, so a restart counts its own pages only.
+
+        """
+        self.scrape({0: ("a", [["1", "21"]])})
+        checkpoint = CheckpointStore(self.path)
+        self.addCleanup(checkpoint.close)
+        checkpoint.start_run()
+        snapshot = TableSnapshot(checkpoint, "url")
+        snapshot.reuse(0, "a")
+        snapshot.record(1, HEADERS, [["2", "22"]])
+        snapshot.discard()
+        self.assertEqual((snapshot.skipped, snapshot.extracted, snapshot.recorded), (0, 0, False))
+
+        snapshot.record(0, HEADERS, [["1", "30"]])
+        self.assertEqual((snapshot.skipped, snapshot.extracted), (0, 1))
+        self.assertEqual(snapshot.changed_ids(), ["1"])
+
+    def test_baseline_is_the_last_successful_scrape(self):
+        """
+        Test that a failed run is not a baseline and that only the baseline and the current pages are kept.
+
+        """
+        self.scrape({0: ("a", [["1", "21"]])})
+        failed = self.scrape({0: ("b", [["1", "30"]])}, success=False)
+        self.assertEqual(failed.changed_ids(), ["1"])
+
+        retry = self.scrape({0: ("b", [["1", "30"]])})
+        self.assertEqual(retry.baseline_run, 1)
+        self.assertEqual(retry.changed_ids(), ["1"])  # Still changed, the failed run did not fetch its details
+
+        checkpoint = CheckpointStore(self.path)
+        self.addCleanup(checkpoint.close)
+        self.assertEqual(checkpoint.table_pages("url", 2), {})  # Pages of the failed run
+        self.assertEqual(checkpoint.table_pages("url", 3)[0]["ids"], ["1"])
+        self.assertEqual(checkpoint.last_table_run("url"), 3)
+
+
+class TestIncrementalScrape(unittest.TestCase):
+    """
+    Test suite for the incremental HTTP scrape of the client table and the refetch of changed clients.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "checkpoint.sqlite")
+
+    def run_scrape(self, server, rows=None):
+        checkpoint = CheckpointStore(self.path)
+        self.addCleanup(checkpoint.close)
+        checkpoint.start_run()
+        snapshot = TableSnapshot(checkpoint, server.clients_url)
+        with mock.patch.object(server, "client_rows", return_value=rows or [make_client(i) for i in range(1, 26)]), \
+                mock.patch("data_fetcher.parse_user_table", wraps=parse_user_table) as parse:
+            headers, clients, path = fetch_store_clients_lightweight(
+                server.clients_url, client=ApiClient(server.base_url), snapshot=snapshot
+            )
+        checkpoint.finish_run()
+        self.assertEqual((headers, path), (CLIENT_HEADERS, "html"))
+        return clients, snapshot, parse.call_count
+
+    def test_unchanged_pages_are_not_parsed(self):
+        """
+        Test that a second scrape revalidates the pages with their ETag and parses only the changed page.
+
+        """
+        rows = [make_client(i) for i in range(1, 26)]
+        changed = [list(row) for row in rows] + [make_client(26)]
+        changed[12][2] = "Pilot"
+
+        with FakeStoreServer(page_size=10) as server:
+            first, snapshot, parsed = self.run_scrape(server, rows)
+            self.assertEqual((first, parsed, snapshot.skipped), (rows, 3, 0))
+
+            second, snapshot, parsed = self.run_scrape(server, rows)
+            self.assertEqual((second, parsed, snapshot.skipped), (rows, 0, 3))
+            self.assertEqual(snapshot.changed_ids(), [])
+
+            third, snapshot, parsed = self.run_scrape(server, changed)
+            self.assertEqual((third, parsed, snapshot.skipped), (changed, 2, 1))  # Pages 1 and 2 changed
+            self.assertEqual(snapshot.diff(), {"added": ["26"], "removed": [], "changed": ["13"], "unchanged": 24})
+
+    def test_changed_clients_are_fetched_again(self):
+        """
+        Test that an incremental run fetches the known users in `refetch` again and reuses the others.
+
+        """
+        users = [["1"], ["2"], ["3"]]
+        with FakeStoreServer(users=5) as server, mock.patch("data_fetcher.LOOKUP_CACHE", LookupCache(max_entries=0)):
+            client = ApiClient(server.base_url)
+            checkpoint = CheckpointStore(self.path)
+            self.addCleanup(checkpoint.close)
+            checkpoint.start_run()
+            fetch_user_details_checkpointed(users, checkpoint, client=client)
+            checkpoint.finish_run()
+            first = server.request_count
+
+            checkpoint.start_run()
+            _, details = fetch_user_details_checkpointed(users + [["4"]], checkpoint, incremental=True, client=client,
+                                                         refetch=["2"])
+            self.assertEqual(server.request_count - first, 2)  # User 4 is new, user 2 changed
+            fetch_user_details_checkpointed(users, checkpoint, incremental=True, client=client, refetch=["2"])
+            self.assertEqual(server.request_count - first, 2)  # A resumed stage does not fetch user 2 again
+
+        self.assertEqual([user["id"] for user in details], [1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
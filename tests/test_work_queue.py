@@ -0,0 +1,228 @@
+"""
+Author: Ilias Adamidis
+Date: 16 / 10 / 2026
+
+Description: This module contains unit tests for the WorkQueue of the work_queue module and
+for the coordinator, worker and merge steps of the distributed module. The workers
+fetch from the local FakeStoreServer.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+import pandas as pd
+from work_queue import WorkQueue, PENDING, LEASED, DONE, FAILED
+from distributed import enqueue_tasks, run_worker, run_workers, merge_results
+from http_client import ApiClient
+from tests.fake_server import FakeStoreServer
+
+
+class TestWorkQueue(unittest.TestCase):
+    """
+    Test suite for the WorkQueue class.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "queue.sqlite")
+
+    def open(self, **options):
+        queue = WorkQueue(self.path, **options)
+        self.addCleanup(queue.close)
+        return queue
+
+    def test_enqueue_is_idempotent(self):
+        """
+        Test that IDs already in the queue are not enqueued again.
+
+        """
+        queue = self.open()
+        self.assertEqual(queue.enqueue("user", [1, 2, 2, 3]), 3)
+        self.assertEqual(queue.enqueue("user", ["3", 4]), 1)
+        self.assertEqual(queue.counts(), {"user": {PENDING: 4, LEASED: 0, DONE: 0, FAILED: 0}})
+
+    def test_claims_are_exclusive(self):
+        """
+        Test that two workers on the same file never lease the same task.
+
+        """
+        first, second = self.open(), self.open()
+        first.enqueue("product", range(1, 6))
+        claimed_first = first.claim("a", batch_size=3)
+        claimed_second = second.claim("b", batch_size=3)
+        self.assertEqual(len(claimed_first), 3)
+        self.assertEqual(len(claimed_second), 2)
+        self.assertFalse(set(claimed_first) & set(claimed_second))
+        self.assertEqual(first.claim("a"), [])
+        self.assertEqual(first.unfinished(), 5)
+
+    def test_expired_lease_is_claimed_again(self):
+        """
+        Test that the task of a worker whose lease expired goes to another worker and the
+        late result of the first worker is ignored.
+
+        """
+        queue = self.open(lease_seconds=0.05)
+        queue.enqueue("user", [1])
+        self.assertEqual(queue.claim("dead"), [("user", "1")])
+        self.assertEqual(queue.claim("live"), [])
+        time.sleep(0.1)
+
+        self.assertEqual(queue.claim("live"), [("user", "1")])
+        self.assertFalse(queue.complete("user", "1", "dead", {"id": 1, "from": "dead"}))
+        self.assertTrue(queue.complete("user", "1", "live", {"id": 1, "from": "live"}))
+        self.assertEqual(queue.results("user"), [{"id": 1, "from": "live"}])
+        self.assertEqual(queue.unfinished(), 0)
+
+    def test_task_fails_after_max_attempts(self):
+        """
+        Test that a task is retried until it was claimed max_attempts times, also when its leases expire.
+
+        """
+        queue = self.open(lease_seconds=0.05, max_attempts=2)
+        queue.enqueue("user", [1, 2])
+        for _ in range(2):
+            queue.claim("a", kind="user")
+            self.assertTrue(queue.fail("user", "1", "a", "503: Service Unavailable"))
+            time.sleep(0.1)  # The lease of user 2 expires without a result
+
+        self.assertEqual(queue.claim("a"), [])
+        self.assertEqual(queue.counts()["user"][FAILED], 2)
+        self.assertEqual(queue.failures(), [
+            {"kind": "user", "task_id": "1", "attempts": 2, "error": "503: Service Unavailable"},
+            {"kind": "user", "task_id": "2", "attempts": 2, "error": "Lease expired"},
+        ])
+
+    def test_inputs(self):
+        """
+        Test that the inputs of the merge step are stored as JSON.
+
+        """
+        queue = self.open()
+        queue.put_input("clients", {"headers": ["ID"], "rows": [["1"]]})
+        self.assertEqual(self.open().get_input("clients"), {"headers": ["ID"], "rows": [["1"]]})
+        self.assertIsNone(queue.get_input("carts"))
+
+
+class TestDistributedFetch(unittest.TestCase):
+    """
+    Test suite for the enqueue, work and merge steps.
+
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "queue.sqlite")
+
+    def test_workers_drain_the_queue_and_merge(self):
+        """
+        Test that a batch leased by a dead worker is fetched by the live workers after its
+        lease expired and that the merge saves every record.
+
+        """
+        with FakeStoreServer(users=12, products=8, carts=20, clients=12, page_size=5) as server, \
+                mock.patch("builtins.print"):
+            queue = WorkQueue(self.path, lease_seconds=0.5)
+            self.addCleanup(queue.close)
+            self.assertEqual(enqueue_tasks(queue, server.clients_url, ApiClient(server.base_url)), (12, 8))
+            queue.claim("dead", batch_size=5)
+
+            results = []
+            workers = [threading.Thread(target=lambda name=name: results.append(run_worker(
+                self.path, name, batch_size=3, lease_seconds=0.5, poll_interval=0.05, client=ApiClient(server.base_url))))
+                for name in ("a", "b")]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            self.assertEqual(sum(results), 20)
+            self.assertEqual(queue.counts(), {"user": {PENDING: 0, LEASED: 0, DONE: 12, FAILED: 0},
+                                              "product": {PENDING: 0, LEASED: 0, DONE: 8, FAILED: 0}})
+            self.assertEqual(merge_results(queue, output_dir=self.directory.name), [])
+
+        users = pd.read_excel(os.path.join(self.directory.name, "combined_user_data.xlsx"))
+        products = pd.read_excel(os.path.join(self.directory.name, "product_data.xlsx"))
+        self.assertEqual(sorted(users["id"]), list(range(1, 13)))
+        self.assertEqual(sorted(products["id"]), list(range(1, 9)))
+        self.assertEqual(products["total_sold"].sum(), sum(
+            line["quantity"] for cart in queue.get_input("carts")["rows"] for line in cart["products"]))
+
+    def test_merge_waits_for_the_workers(self):
+        """
+        Test that the merge refuses to run while tasks are unfinished.
+
+        """
+        queue = WorkQueue(self.path)
+        self.addCleanup(queue.close)
+        with self.assertRaises(RuntimeError):
+            merge_results(queue)
+        queue.put_input("clients", {"headers": [], "rows": []})
+        queue.put_input("carts", {"headers": [], "rows": []})
+        queue.enqueue("user", [1])
+        with self.assertRaises(RuntimeError):
+            merge_results(queue)
+
+    def test_worker_processes(self):
+        """
+        Test that spawned worker processes drain the queue.
+
+        """
+        with FakeStoreServer(users=4, products=3, carts=3, clients=4) as server, mock.patch("builtins.print"):
+            queue = WorkQueue(self.path)
+            self.addCleanup(queue.close)
+            queue.enqueue("user", [1, 2, 3, 4])
+            queue.enqueue("product", [1, 2, 3])
+            completed = run_workers(self.path, workers=2, api_url=server.base_url, batch_size=2, poll_interval=0.05)
+
+        self.assertEqual(completed, 7)
+        self.assertEqual([user["id"] for user in queue.results("user")], [1, 2, 3, 4])
+        self.assertEqual(len(queue.results("product")), 3)
+
+    def test_workers_on_separate_handles(self):
+        """
+        Test that worker processes opening the queue file through different paths, like the mounts
+        of the same share on other hosts, drain it without fetching a task twice.
+
+        """
+        mount = os.path.join(self.directory.name, "mount")
+        os.symlink(self.directory.name, mount)
+        with FakeStoreServer(users=6, products=4) as server, mock.patch("builtins.print"):
+            queue = WorkQueue(self.path)
+            self.addCleanup(queue.close)
+            queue.enqueue("user", range(1, 7))
+            queue.enqueue("product", range(1, 5))
+            with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = [pool.submit(run_worker, path, name, api_url=server.base_url, batch_size=2,
+                                       poll_interval=0.05, rate=50)
+                           for name, path in (("host-a", self.path), ("host-b", os.path.join(mount, "queue.sqlite")))]
+                completed = [future.result() for future in futures]
+            self.assertEqual(server.request_count, 10)
+
+        self.assertEqual(sum(completed), 10)
+        self.assertEqual(queue._conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+        self.assertFalse(os.path.exists(self.path + "-wal"))
+        self.assertEqual([user["id"] for user in queue.results("user")], list(range(1, 7)))
+
+    def test_workers_share_the_rate(self):
+        """
+        Test that a worker given a share of the request budget paces its client with an adaptive pacer capped at it.
+
+        """
+        client = ApiClient("http://localhost")
+        queue = WorkQueue(self.path)
+        self.addCleanup(queue.close)
+        with mock.patch("builtins.print"):
+            run_worker(self.path, "a", client=client, rate=2.5)
+        self.assertEqual(client.pacer.max_rate, 2.5)
+        self.assertLessEqual(client.pacer.rate, 2.5)
+
+
+if __name__ == '__main__':
+    unittest.main()